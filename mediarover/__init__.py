@@ -20,14 +20,16 @@ from optparse import OptionParser
 
 from mediarover.command import print_epilog
 from mediarover.command.configuration import configuration
+from mediarover.command.daemon import daemon
 from mediarover.command.episode_sort import episode_sort
 from mediarover.command.migrate_metadata import migrate_metadata
 from mediarover.command.schedule import schedule
 from mediarover.command.set_quality import set_quality
+from mediarover.utils.http import HttpClient
 from mediarover.utils.injection import initialize_broker
 from mediarover.version import __app_version__
 
-from mediarover.constant import CONFIG_DIR, RESOURCES_DIR
+from mediarover.constant import CONFIG_DIR, HTTP_CLIENT_OBJECT, RESOURCES_DIR
 
 def run():
 
@@ -38,6 +40,7 @@ def run():
 	epilog = """
 Available commands are:
    schedule          Process configured sources and schedule nzb's for download
+   daemon            Run in the foreground and schedule nzb's on a regular interval
    episode-sort      Sort downloaded episode
    configuration     Generate default configuration and logging files
    set-quality       Register quality of series episodes on disk
@@ -73,8 +76,13 @@ See 'python mediarover.py COMMAND --help' for more information on a specific com
 	broker.register(CONFIG_DIR, config_dir)
 	broker.register(RESOURCES_DIR, os.path.join(sys.path[0], "resources"))
 
+	# shared http client, reuses connections to remote hosts across requests
+	broker.register(HTTP_CLIENT_OBJECT, HttpClient())
+
 	if command == 'schedule':
 		schedule(broker, args)
+	elif command == 'daemon':
+		daemon(broker, args)
 	elif command == 'episode-sort':
 		episode_sort(broker, args)
 	elif command == 'set-quality':
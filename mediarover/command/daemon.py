@@ -0,0 +1,267 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import errno
+import logging
+import os
+import select
+import signal
+import sys
+import time
+from optparse import OptionParser
+
+from mediarover.command import print_epilog
+from mediarover.command.episode_sort import sort_download, sort_downloads
+from mediarover.command.schedule import initialize_schedule, process_schedule
+from mediarover.episode.parser import save_parse_cache
+from mediarover.error import ConfigurationError, FilesystemError
+from mediarover.filesystem.watcher import LibraryWatcher
+from mediarover.series import build_series_lists
+from mediarover.sort_server import SortServer
+from mediarover.utils.filesystem import FreeSpace
+from mediarover.version import __app_version__
+
+from mediarover.constant import (CONFIG_DIR, CONFIG_OBJECT, FATAL_ERROR_NOTIFICATION, FEED_CACHE_OBJECT, 
+											FREE_SPACE_OBJECT, HTTP_CLIENT_OBJECT, IGNORED_SERIES_LIST, METADATA_OBJECT, NOTIFICATION_OBJECT, 
+											SORT_SERVER_SOCKET, WATCHED_SERIES_LIST)
+
+def daemon(broker, args):
+
+	usage = "%prog daemon [options]"
+	description = "Description: run in the foreground and process configured sources on a regular interval"
+	epilog = """
+Examples:
+   Process configured sources every [schedule] interval minutes:
+     > python mediarover.py daemon
+
+   Same as above, but use non-default config directory:
+     > python mediarover.py daemon --config /path/to/config/dir
+
+   Process configured sources but don't schedule anything for download:
+     > python mediarover.py daemon --dry-run
+"""
+	parser = OptionParser(usage=usage, description=description, epilog=epilog, add_help_option=False)
+
+	parser.add_option("-c", "--config", metavar="/PATH/TO/CONFIG/DIR", help="path to application configuration directory")
+	parser.add_option("-d", "--dry-run", action="store_true", default=False, help="simulate downloading nzb's from configured sources")
+	parser.add_option("-h", "--help", action="callback", callback=print_epilog, help="show this help message and exit")
+
+	(options, args) = parser.parse_args(args)
+
+	if options.config:
+		broker.register(CONFIG_DIR, options.config)
+
+	initialize_schedule(broker)
+
+	logger = logging.getLogger("mediarover")
+	logger.info("--- STARTING DAEMON ---")
+	logger.debug("platform: %s, app version: %s, schema: %d", sys.platform, __app_version__, broker[METADATA_OBJECT].schema_version)
+	logger.debug("using config directory: %s", broker[CONFIG_DIR])
+
+	# exit cleanly when asked to stop
+	def terminate(signum, frame):
+		raise SystemExit(0)
+	signal.signal(signal.SIGTERM, terminate)
+
+	try:
+		try:
+			__daemon(broker, options)
+		except KeyboardInterrupt:
+			pass
+		logger.info("DONE")
+	finally:
+		save_parse_cache(broker[METADATA_OBJECT])
+		broker[METADATA_OBJECT].cleanup()
+		broker[FEED_CACHE_OBJECT].cleanup()
+		broker[NOTIFICATION_OBJECT].cleanup()
+		broker[HTTP_CLIENT_OBJECT].cleanup()
+
+def __daemon(broker, options):
+
+	logger = logging.getLogger("mediarover")
+
+	config = broker[CONFIG_OBJECT]
+	if not len(config['tv']['tv_root']):
+		raise ConfigurationError("You must declare at least one tv_root directory!")
+
+	interval = config['schedule']['interval'] * 60
+
+	# build dicts of watched and ignored series.  The same dict objects are kept for the lifetime 
+	# of the daemon (and updated in place) as they are cached by every object that depends on them
+	(watched, ignored) = build_series_lists(config)
+	logger.info("watching %d tv show(s)", len(watched))
+	broker.register(WATCHED_SERIES_LIST, watched)
+	broker.register(IGNORED_SERIES_LIST, ignored)
+
+	# free space is shared by every sort so that back to back sorts don't probe the same disks
+	broker.register(FREE_SPACE_OBJECT, FreeSpace())
+
+	library = {'watcher': None, 'roots': __root_mtimes(config)}
+	if config['schedule']['watch_library']:
+		library['watcher'] = __start_watcher()
+
+	# sort downloads handed over by the episode-sort command
+	def sort(args, dry_run, batch):
+		__sync_library(config, library, watched, ignored, False)
+		if batch:
+			return sort_downloads(broker, args, dry_run, (watched, ignored))
+		return sort_download(broker, args, dry_run, (watched, ignored))
+
+	server = None
+	if config['schedule']['sort_server']:
+		try:
+			server = SortServer(os.path.join(broker[CONFIG_DIR], SORT_SERVER_SOCKET), sort)
+		except FilesystemError, (e):
+			logger.warning("unable to start sort server: %s", e)
+
+	try:
+		while True:
+			started = time.time()
+
+			# ATTENTION: errors (ie. a tv_root that is briefly unavailable) only fail the current iteration
+			try:
+				__sync_library(config, library, watched, ignored, True)
+				process_schedule(broker, options.dry_run)
+			except (SystemExit, KeyboardInterrupt):
+				raise
+			except Exception, e:
+				logger.exception(e)
+				broker[NOTIFICATION_OBJECT].process(FATAL_ERROR_NOTIFICATION, 'Media Rover died unexpectedly: %s' % e)
+
+				# items retrieved this iteration weren't processed, request them in full next time
+				broker[FEED_CACHE_OBJECT].discard()
+			else:
+				if options.dry_run:
+					broker[FEED_CACHE_OBJECT].discard()
+				else:
+					broker[FEED_CACHE_OBJECT].save()
+
+			# persist titles parsed this iteration so that a restarted daemon doesn't parse them again
+			save_parse_cache(broker[METADATA_OBJECT])
+
+			logger.info("finished processing sources, sleeping for %d minute(s)", config['schedule']['interval'])
+
+			# wait for next iteration, applying library changes and sorting downloads as they 
+			# are reported
+			deadline = started + interval
+			while True:
+				remaining = deadline - time.time()
+				if remaining <= 0:
+					break
+
+				handles = [handle for handle in (library['watcher'], server) if handle is not None]
+				if len(handles) == 0:
+					time.sleep(remaining)
+					continue
+
+				try:
+					(readable, writable, errors) = select.select(handles, [], [], remaining)
+				except select.error, (e):
+					if e.args[0] == errno.EINTR:
+						continue
+					raise
+
+				for handle in readable:
+					if handle is server:
+						server.process_request()
+					else:
+						handle.process_events()
+	finally:
+		if server is not None:
+			server.close()
+		if library['watcher'] is not None:
+			library['watcher'].close()
+
+def __sync_library(config, library, watched, ignored, rescan):
+	"""
+		make sure the dicts of watched and ignored series reflect the current contents of the tv root 
+		directories.  Without a library watcher, series episode lists are also marked stale when rescan 
+		is True
+	"""
+	logger = logging.getLogger("mediarover")
+
+	watcher = library['watcher']
+	if watcher is None:
+		current = __root_mtimes(config)
+		if current != library['roots']:
+			__refresh_series_lists(config, watched, ignored)
+			library['roots'] = current
+
+		# series scans are cheap as unchanged directories are read from the library index
+		if rescan:
+			for series in __unique_series(watched):
+				series.mark_episode_list_stale()
+
+	elif watcher.roots_changed:
+		logger.info("tv root directories have changed, refreshing list of watched series")
+		__refresh_series_lists(config, watched, ignored)
+		watcher.close()
+		library['watcher'] = __start_watcher()
+
+def __start_watcher():
+	""" return new LibraryWatcher object, or None if the library can't be watched """
+	logger = logging.getLogger("mediarover")
+	try:
+		return LibraryWatcher()
+	except FilesystemError, (e):
+		logger.warning("unable to watch tv library for changes, falling back to scanning: %s", e)
+		return None
+
+def __root_mtimes(config):
+	""" return list of modification times for every tv root directory """
+	mtimes = []
+	for root in config['tv']['tv_root']:
+		try:
+			mtimes.append(os.stat(root).st_mtime)
+		except OSError:
+			mtimes.append(None)
+	return mtimes
+
+def __unique_series(watched):
+	""" return list of unique series objects found in given dict of watched series """
+	series = {}
+	for obj in watched.values():
+		series[id(obj)] = obj
+	return series.values()
+
+def __refresh_series_lists(config, watched, ignored):
+	"""
+		rebuild the given dicts of watched and ignored series in place.  Existing Series objects (and the episode lists
+		they have already built) are kept for any series whose folders haven't changed
+	"""
+	logger = logging.getLogger("mediarover")
+
+	current = {}
+	for series in __unique_series(watched):
+		current[series.sanitized_name] = series
+
+	(updated, skipped) = build_series_lists(config)
+
+	replacements = {}
+	for series in __unique_series(updated):
+		existing = current.get(series.sanitized_name)
+		if existing is not None and existing.path == series.path:
+			existing.aliases = series.aliases
+			existing.ignores = series.ignores
+			replacements[id(series)] = existing
+
+	for name, series in updated.items():
+		updated[name] = replacements.get(id(series), series)
+
+	watched.clear()
+	watched.update(updated)
+	ignored.clear()
+	ignored.update(skipped)
+	logger.info("watching %d tv show(s)", len(__unique_series(watched)))
@@ -13,12 +13,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from __future__ import with_statement
+
 import logging
 import logging.config
 import os
 import os.path
 import shutil
 import sys
+from collections import OrderedDict
 from optparse import OptionParser
 from tempfile import TemporaryFile
 from time import strftime
@@ -27,25 +30,28 @@ from mediarover.command import print_epilog, register_source_factories
 from mediarover.config import build_series_filters, get_processed_app_config
 from mediarover.ds.metadata import Metadata
 from mediarover.episode.factory import EpisodeFactory
+from mediarover.episode.parser import load_parse_cache, save_parse_cache
 from mediarover.error import (CleanupError, ConfigurationError, FailedDownload, FilesystemError, 
 										InvalidArgument, InvalidJobTitle, InvalidMultiEpisodeData, 
 										MissingParameterError)
 from mediarover.filesystem.episode import FilesystemEpisode
 from mediarover.filesystem.factory import FilesystemFactory
 from mediarover.notification import Notification
-from mediarover.series import Series, build_series_lists
-from mediarover.utils.filesystem import find_disk_with_space
+from mediarover.series import Series, lazy_series_lists
+from mediarover.sort_server import request_sort
+from mediarover.utils.filesystem import DiskScheduler, FreeSpace
+from mediarover.utils.pool import Task, run_tasks
 from mediarover.utils.quality import guess_quality_level
 from mediarover.version import __app_version__
 
 from mediarover.constant import (CONFIG_DIR, CONFIG_OBJECT, EPISODE_FACTORY_OBJECT, FATAL_ERROR_NOTIFICATION,
-											FILESYSTEM_FACTORY_OBJECT, HIGH, IGNORED_SERIES_LIST, LOW, MEDIUM, METADATA_OBJECT,
+											FILESYSTEM_FACTORY_OBJECT, FREE_SPACE_OBJECT, HIGH, HTTP_CLIENT_OBJECT, IGNORED_SERIES_LIST, LOW, MEDIUM, METADATA_OBJECT,
 											NEWZBIN_FACTORY_OBJECT, NOTIFICATION_OBJECT, RESOURCES_DIR, 
-											SORT_FAILED_NOTIFICATION, SORT_SUCCESSFUL_NOTIFICATION, WATCHED_SERIES_LIST)
+											SORT_FAILED_NOTIFICATION, SORT_SERVER_SOCKET, SORT_SUCCESSFUL_NOTIFICATION, WATCHED_SERIES_LIST)
 
 def episode_sort(broker, args):
 
-	usage = "%%prog episode-sort [options] result_dir [%s|%s|%s] | [nzb_name nice_name newzbin_id category newsgroup status]" % (LOW, MEDIUM, HIGH)
+	usage = "%%prog episode-sort [options] result_dir [%s|%s|%s] | [nzb_name nice_name newzbin_id category newsgroup status] | --batch path [path ...]" % (LOW, MEDIUM, HIGH)
 	description = "Description: process a recent download and sort episode file in appropriate series folder"
 	epilog = """
 Examples:
@@ -63,6 +69,12 @@ Examples:
    Simulate sorting a downloaded file:
      > python mediarover.py episode-sort --dry-run /path/to/some.download
 
+   Sort every completed download found in a folder:
+     > python mediarover.py episode-sort --batch /path/to/completed/downloads
+
+   Sort a list of downloaded files:
+     > python mediarover.py episode-sort --batch /path/to/some.download /path/to/another.download
+
    From shell script : (called by SABnzbd)
    ==================
    Sort a downloaded file:
@@ -72,6 +84,7 @@ Examples:
 	parser = OptionParser(usage=usage, description=description, epilog=epilog, add_help_option=False)
 	parser.add_option("-c", "--config", metavar="/PATH/TO/CONFIG/DIR", help="path to application configuration directory")
 	parser.add_option("-d", "--dry-run", action="store_true", default=False, help="simulate downloading nzb's from configured sources")
+	parser.add_option("-b", "--batch", action="store_true", default=False, help="sort every download found in the given list of paths")
 	parser.add_option("-h", "--help", action="callback", callback=print_epilog, help="show this help message and exit")
 
 	(options, args) = parser.parse_args(args)
@@ -79,6 +92,22 @@ Examples:
 	if options.config:
 		broker.register(CONFIG_DIR, options.config)
 
+	if len(args) == 0:
+		print_epilog(parser, code=1)
+
+	# hand the download over to the sort server (see daemon command) if one is 
+	# running, otherwise sort it in process.  The server doesn't share our working 
+	# directory so download paths must be absolute
+	if options.batch:
+		request = [os.path.abspath(path) for path in args]
+	else:
+		request = [os.path.abspath(args[0])] + args[1:]
+	response = request_sort(os.path.join(broker[CONFIG_DIR], SORT_SERVER_SOCKET), request, options.dry_run, options.batch)
+	if response is not None:
+		(fatal, message) = response
+		print message
+		exit(fatal)
+
 	# create config object using user config values
 	try:
 		config = get_processed_app_config(broker[RESOURCES_DIR], broker[CONFIG_DIR])
@@ -101,11 +130,54 @@ Examples:
 
 	""" post configuration setup """
 
-	if len(args) == 0:
-		print_epilog(parser, code=1)
+	broker.register(METADATA_OBJECT, Metadata())
+	broker.register(CONFIG_OBJECT, config)
+	broker.register(EPISODE_FACTORY_OBJECT, EpisodeFactory())
+	broker.register(FILESYSTEM_FACTORY_OBJECT, FilesystemFactory())
+	broker.register(NOTIFICATION_OBJECT, Notification())
+	broker.register(FREE_SPACE_OBJECT, FreeSpace())
+
+	# register source factory objects
+	register_source_factories(broker)
+
+	load_parse_cache(broker[METADATA_OBJECT])
+
+	logger.info("--- STARTING ---")
+	logger.debug("platform: %s, app version: %s, schema: %d", sys.platform, __app_version__, broker[METADATA_OBJECT].schema_version)
+	logger.debug("using config directory: %s", broker[CONFIG_DIR])
+
+	# sanitize tv series filter subsection names for 
+	# consistent lookups
+	for name, filters in config['tv']['filter'].items():
+		del config['tv']['filter'][name]
+		config['tv']['filter'][Series.sanitize_series_name(name)] = build_series_filters(config, filters)
+
+	try:
+		if options.batch:
+			(fatal, message) = sort_downloads(broker, args, options.dry_run)
+		else:
+			(fatal, message) = sort_download(broker, args, options.dry_run)
+	finally:
+		save_parse_cache(broker[METADATA_OBJECT])
+		broker[METADATA_OBJECT].cleanup()
+		broker[NOTIFICATION_OBJECT].cleanup()
+		broker[HTTP_CLIENT_OBJECT].cleanup()
+
+	print message
+	exit(fatal)
+
+def sort_download(broker, args, dry_run, series_lists=None):
+	"""
+		sort the download described by the given episode-sort command line arguments and return (status, message)
+		tuple, where a non-zero status indicates failure.  All application objects must already be registered with
+		the dependency broker.  If given, series_lists is a (watched, ignored) tuple of series dicts to use rather 
+		than building new ones
+	"""
+	logger = logging.getLogger("mediarover.command.episode_sort")
+	logger.debug(sys.argv[0] + " episode-sort " + " ".join(map(lambda x: "'" + x + "'", args)))
 
 	# gather command line arguments
-	params = {'path': args[0].rstrip("/\ ")}
+	params = {'path': args[0].rstrip("/\\ ")}
 	if len(args) == 2:
 		params['quality'] = args[1]
 	elif len(args) in (6,7):
@@ -121,126 +193,216 @@ Examples:
 		params['group'] = args[5]
 		params['status'] = args[6]
 
-	# if job name and nzb weren't provided, set them using the given 
-	# download path
-	if params.get('job', True):
-		params['job'] = os.path.basename(params['path'])
-	if params.get('nzb', True):
-		params['nzb'] = params['job'] + '.nzb'
-
-	# capture all logging output in local file.  If sorting script exits unexpectedly,
-	# or encounters an error and gracefully exits, the log file will be placed in
-	# the download directory for debugging
-	tmp_file = None
-	if config['logging']['generate_sorting_log']:
-		tmp_file = TemporaryFile()
-		handler = logging.StreamHandler(tmp_file)
-		formatter = logging.Formatter('%(asctime)s %(levelname)s - %(message)s - %(filename)s:%(lineno)s')
-		handler.setFormatter(formatter)
-		logger.addHandler(handler)
+	(job, fatal, message) = __sort(broker, [params], dry_run, series_lists)[0]
+	return (fatal, message)
 
-	broker.register(METADATA_OBJECT, Metadata())
-	broker.register(CONFIG_OBJECT, config)
-	broker.register(EPISODE_FACTORY_OBJECT, EpisodeFactory())
-	broker.register(FILESYSTEM_FACTORY_OBJECT, FilesystemFactory())
-	broker.register(NOTIFICATION_OBJECT, Notification())
+def sort_downloads(broker, paths, dry_run, series_lists=None):
+	"""
+		sort every completed download found in the given list of paths and return (status, message) tuple, where 
+		a non-zero status indicates that at least one download couldn't be sorted.  A path containing nothing but
+		directories is treated as a folder of completed downloads, every other path is sorted as a download.
 
-	# register source factory objects
-	register_source_factories(broker)
+		Series lists are only built once and redundant episode files are removed once per series
+	"""
+	logger = logging.getLogger("mediarover.command.episode_sort")
 
-	logger.info("--- STARTING ---")
-	logger.debug("platform: %s, app version: %s, schema: %d", sys.platform, __app_version__, broker[METADATA_OBJECT].schema_version)
-	logger.debug("using config directory: %s", broker[CONFIG_DIR])
+	jobs = []
+	for path in paths:
+		path = path.rstrip("/\\ ")
+		if not os.path.isdir(path):
+			jobs.append({'path': path})
+			continue
+
+		entries = [name for name in os.listdir(path) if not name.startswith(".")]
+		if len(entries) and all([os.path.isdir(os.path.join(path, name)) for name in entries]):
+			# ATTENTION: SABnzbd unpacks downloads into folders prefixed with _UNPACK_, 
+			# skip them as they are still in progress
+			for name in sorted(entries):
+				if not name.startswith("_UNPACK_"):
+					jobs.append({'path': os.path.join(path, name)})
+		else:
+			jobs.append({'path': path})
 
-	logger.debug(sys.argv[0] + " episode-sort " + " ".join(map(lambda x: "'" + x + "'", args)))
+	if len(jobs) == 0:
+		return (1, "FAILURE: unable to find any completed downloads!")
 
-	# sanitize tv series filter subsection names for 
-	# consistent lookups
-	for name, filters in config['tv']['filter'].items():
-		del config['tv']['filter'][name]
-		config['tv']['filter'][Series.sanitize_series_name(name)] = build_series_filters(config, filters)
+	logger.info("found %d completed download(s)", len(jobs))
+
+	results = __sort(broker, jobs, dry_run, series_lists)
+
+	lines = ["%s: %s" % (job, message) for (job, fatal, message) in results]
+	failed = len([job for (job, fatal, message) in results if fatal])
+	if failed:
+		lines.append("FAILURE: unable to sort %d of %d download(s)!" % (failed, len(results)))
+	else:
+		lines.append("DONE: processed %d download(s)!" % len(results))
+
+	return (1 if failed else 0, "\n".join(lines))
+
+def __sort(broker, jobs, dry_run, series_lists):
+	""" sort each of the given jobs and return list of (job, status, message) tuples """
+	logger = logging.getLogger("mediarover.command.episode_sort")
+	config = broker[CONFIG_OBJECT]
 
 	""" main """
 
 	# check if user has requested a dry-run
-	if options.dry_run:
+	if dry_run:
 		logger.info("--dry-run flag detected!  Download will not be sorted during execution!")
 
-	fatal = 0
-	message = None
-	if os.path.exists(params['path']):
-		try:
-			__episode_sort(broker, options, **params)
-		except (CleanupError), e:
-			broker[NOTIFICATION_OBJECT].process(SORT_SUCCESSFUL_NOTIFICATION, 
-				"'%s' successfully sorted! However, Media Rover was unable to delete the download folder" % params['job']
-			)
-			logger.warning(e)
-			message = "WARNING: sort successful, errors encountered during cleanup!"
-		except (ConfigurationError, FailedDownload, FilesystemError, InvalidArgument, InvalidJobTitle), e:
-			broker[NOTIFICATION_OBJECT].process(SORT_FAILED_NOTIFICATION, e.args[0])
-			fatal = 1
-			message = "FAILURE: %s!" % e.args[0]
-		except (Exception), e:
-			broker[NOTIFICATION_OBJECT].process(FATAL_ERROR_NOTIFICATION, 'Media Rover died unexpectedly: %s' % e.args[0])
-			fatal = 1
-			logger.exception(e)
-			message = "EXCEPTION: %s!" % e.args[0]
+	# build dict of watched series
+	# register series dictionary with dependency broker
+	# ATTENTION: only the series being sorted are looked up, there is no need
+	# to scan every tv root
+	if series_lists is None:
+		series_lists = lazy_series_lists(config)
+		broker.register(WATCHED_SERIES_LIST, series_lists[0])
+		broker.register(IGNORED_SERIES_LIST, series_lists[1])
+
+	# jobs are sorted in three steps:
+	#  1. locate episode file and pick a destination disk
+	#  2. move episode files, concurrently across disks (see DiskScheduler)
+	#  3. update metadata and remove download
+	# steps 1 and 3 are done one job at a time as they update the metadata db and series objects
+	scheduler = DiskScheduler(config['tv']['max_writes_per_disk'], broker[FREE_SPACE_OBJECT])
+	planned = set()
+
+	states = []
+	for params in jobs:
+
+		# if job name and nzb weren't provided, set them using the given 
+		# download path
+		if params.get('job', True):
+			params['job'] = os.path.basename(params['path'])
+		if params.get('nzb', True):
+			params['nzb'] = params['job'] + '.nzb'
+
+		state = {'params': params, 'fatal': 0, 'message': None, 'log': None, 'plan': None, 'task': None}
+		states.append(state)
+
+		# capture all logging output in local file.  If sorting script exits unexpectedly,
+		# or encounters an error and gracefully exits, the log file will be placed in
+		# the download directory for debugging
+		if config['logging']['generate_sorting_log']:
+			state['log'] = TemporaryFile()
+
+		if os.path.exists(params['path']):
+			state['plan'] = __process_job(broker, state, __plan_sort, broker, dry_run, scheduler, planned, **params)
 		else:
-			if options.dry_run:
-				message = "DONE: dry-run flag set...nothing to do!"
-			else:
-				broker[NOTIFICATION_OBJECT].process(SORT_SUCCESSFUL_NOTIFICATION, 
-					"'%s' successfully sorted!" % params['job']
-				)
-				message = "SUCCESS: downloaded episode sorted!"
-		finally:
-			broker[METADATA_OBJECT].cleanup()
-			broker[NOTIFICATION_OBJECT].cleanup()
-			if fatal and config['logging']['generate_sorting_log']:
+			state['fatal'] = 1
+			state['message'] = "FAILURE: sort unsuccessful, given path does not exist!"
+
+	# move episode files
+	writes = [(state['plan']['root'], state) for state in states if state['plan'] is not None]
+	if len(writes):
+		(ordered, workers) = scheduler.schedule(writes)
+		tasks = []
+		for state in ordered:
+			plan = state['plan']
+			state['task'] = Task(state['params']['job'], scheduler.move, 
+				(plan['orig_path'], plan['new_path'], plan['root'], plan['file'].size, config['tv']['preserve_file_metadata'])
+			)
+			tasks.append(state['task'])
+		run_tasks(tasks, workers)
+
+	results = []
+	pending = OrderedDict()
+	for state in states:
+		params = state['params']
+
+		if not state['fatal']:
+			file = __process_job(broker, state, __finish_sort, broker, dry_run, state['plan'], state['task'])
+
+			# redundant episodes are removed once all jobs have been sorted
+			if file is not None:
+				pending.setdefault(file.episode.series, []).append((len(results), file))
+
+			if not state['fatal'] and not dry_run:
+				__process_job(broker, state, __remove_download, params['path'])
+
+			if not state['fatal']:
+				if dry_run:
+					state['message'] = "DONE: dry-run flag set...nothing to do!"
+				elif state['message'] is None:
+					broker[NOTIFICATION_OBJECT].process(SORT_SUCCESSFUL_NOTIFICATION, 
+						"'%s' successfully sorted!" % params['job']
+					)
+					state['message'] = "SUCCESS: downloaded episode sorted!"
+
+		if state['log'] is not None:
+			if state['fatal'] and os.path.isdir(params['path']):
 				# reset current position to start of file for reading...
-				tmp_file.seek(0)
+				state['log'].seek(0)
 
 				# flush log data in temporary file handler to disk 
 				sort_log = open(os.path.join(params['path'], "sort.log"), "w")
-				shutil.copyfileobj(tmp_file, sort_log)
+				shutil.copyfileobj(state['log'], sort_log)
 				sort_log.close()
-	else:
-		fatal = 1
-		message = "FAILURE: sort unsuccessful, given path does not exist!"
+			state['log'].close()
 
-	print message
-	exit(fatal)
+		results.append((params['job'], state['fatal'], state['message']))
 
-def __episode_sort(broker, options, **kwargs):
+	# remove any episode files made redundant by the newly sorted episodes, once per series
+	for series, sorted in pending.items():
+		try:
+			__clean_series(broker, series, [file for (i, file) in sorted])
+		except (Exception), e:
+			broker[NOTIFICATION_OBJECT].process(FATAL_ERROR_NOTIFICATION, 'Media Rover died unexpectedly: %s' % e.args[0])
+			logger.exception(e)
+			for (i, file) in sorted:
+				results[i] = (results[i][0], 1, "EXCEPTION: %s!" % e.args[0])
 
-	logger = logging.getLogger("mediarover.scripts.sabnzbd.episode")
+	return results
+
+def __process_job(broker, state, func, *args, **kwargs):
+	"""
+		call func with the given arguments on behalf of the job described by state and return its result.  Any error is 
+		reported and recorded in state
+	"""
+	logger = logging.getLogger("mediarover.command.episode_sort")
+
+	handler = None
+	if state['log'] is not None:
+		handler = logging.StreamHandler(state['log'])
+		formatter = logging.Formatter('%(asctime)s %(levelname)s - %(message)s - %(filename)s:%(lineno)s')
+		handler.setFormatter(formatter)
+		logger.addHandler(handler)
+
+	try:
+		return func(*args, **kwargs)
+	except (CleanupError), e:
+		broker[NOTIFICATION_OBJECT].process(SORT_SUCCESSFUL_NOTIFICATION, 
+			"'%s' successfully sorted! However, Media Rover was unable to delete the download folder" % state['params']['job']
+		)
+		logger.warning(e)
+		state['message'] = "WARNING: sort successful, errors encountered during cleanup!"
+	except (ConfigurationError, FailedDownload, FilesystemError, InvalidArgument, InvalidJobTitle), e:
+		broker[NOTIFICATION_OBJECT].process(SORT_FAILED_NOTIFICATION, e.args[0])
+		state['fatal'] = 1
+		state['message'] = "FAILURE: %s!" % e.args[0]
+	except (Exception), e:
+		broker[NOTIFICATION_OBJECT].process(FATAL_ERROR_NOTIFICATION, 'Media Rover died unexpectedly: %s' % e.args[0])
+		state['fatal'] = 1
+		logger.exception(e)
+		state['message'] = "EXCEPTION: %s!" % e.args[0]
+	finally:
+		if handler is not None:
+			logger.removeHandler(handler)
+
+	return None
+
+def __validate_download(broker, **kwargs):
+	""" make sure the given job can be sorted, raise an exception if it can't """
 
 	# ensure user has indicated a desired quality level if quality management is turned on
 	config = broker[CONFIG_OBJECT]
 	if config['tv']['library']['quality']['managed'] and config['tv']['library']['quality']['desired'] is None:
 		raise ConfigurationError("when quality management is on you must indicate a desired quality level at [tv] [[quality]] desired =")
 
-	"""
-	arguments:
-	  1. The final directory of the job (full path)
-	  2. The name of the NZB file
-	  3. User modifiable job name
-	  4. Newzbin report number (may be empty)
-	  5. Newzbin or user-defined category
-	  6. Group that the NZB was posted in e.g. alt.binaries.x
-	  7. Status
-	"""
 	path = kwargs['path']
 	job = kwargs['job']
-	nzb = kwargs['nzb']
-	report_id = kwargs.get('report_id', '')
-	category = kwargs.get('category', '')
-	group = kwargs.get('group', '')
 	status = kwargs.get('status', 0)
 
-	tv_root = config['tv']['tv_root']
-
 	# check to ensure we have the necessary data to proceed
 	if path is None or path == "":
 		raise InvalidArgument("path to completed job is missing or null")
@@ -256,14 +418,46 @@ def __episode_sort(broker, options, **kwargs):
 		else:
 			raise FailedDownload("download failed")
 
-	# build dict of watched series
-	# register series dictionary with dependency broker
-	series_lists = build_series_lists(config)
-	broker.register(WATCHED_SERIES_LIST, series_lists[0])
-	broker.register(IGNORED_SERIES_LIST, series_lists[1])
+def __remove_download(path):
+	""" clean up download directory by removing all remaining files """
+	logger = logging.getLogger("mediarover.scripts.sabnzbd.episode")
+	try:
+		shutil.rmtree(path)
+	except (shutil.Error), e:
+		raise CleanupError("unable to remove download directory '%s'" % e)
+	else:
+		logger.info("removing download directory '%s'" % path)
+
+def __plan_sort(broker, dry_run, scheduler, planned, **kwargs):
+	"""
+		locate the episode file found in given download and determine where it belongs, creating series and season
+		folders as needed.  Return dict describing the move (the destination disk is charged with the pending write,
+		see DiskScheduler), or None when dry_run is set.  The given set of planned destination paths is updated
+	"""
+	logger = logging.getLogger("mediarover.scripts.sabnzbd.episode")
+	config = broker[CONFIG_OBJECT]
 
-	logger.info("watching %d tv show(s)", len(series_lists[0]))
-	logger.debug("finished processing watched tv")
+	__validate_download(broker, **kwargs)
+
+	"""
+	arguments:
+	  1. The final directory of the job (full path)
+	  2. The name of the NZB file
+	  3. User modifiable job name
+	  4. Newzbin report number (may be empty)
+	  5. Newzbin or user-defined category
+	  6. Group that the NZB was posted in e.g. alt.binaries.x
+	  7. Status
+	"""
+	path = kwargs['path']
+	job = kwargs['job']
+	nzb = kwargs['nzb']
+	report_id = kwargs.get('report_id', '')
+	category = kwargs.get('category', '')
+	group = kwargs.get('group', '')
+	status = kwargs.get('status', 0)
+
+	tv_root = config['tv']['tv_root']
 
 	ignored = [ext.lower() for ext in config['tv']['ignored_extensions']]
 
@@ -319,7 +513,7 @@ def __episode_sort(broker, options, **kwargs):
 		raise ConfigurationError("unable to sort episode as parent series is being ignored")
 
 	# move downloaded file to new location and rename
-	if not options.dry_run:
+	if not dry_run:
 
 		# build a filesystem episode object
 		file = FilesystemEpisode(orig_path, episode, size)
@@ -338,125 +532,171 @@ def __episode_sort(broker, options, **kwargs):
 				else:
 					episode.quality = in_progress['quality']
 
-		# find available disk with enough space for newly downloaded episode
-		free_root = find_disk_with_space(series, tv_root, file.size) 
+		# find available disk with enough space for newly downloaded episode, preferring 
+		# disks that already hold the series and aren't busy
+		free_root = scheduler.select(series.path + list(tv_root), file.size, series.path)
 		if free_root is None:
 			raise FilesystemError("unable to find disk with enough space to sort episode!")
 
-		# make sure series folder exists on that disk
-		series_dir = None
-		for dir in series.path:
-			if dir.startswith(free_root):
-				series_dir = dir 
-				break
-		else:
-			series_dir = os.path.join(free_root, series.format(config['tv']['template']['series']))
-			try:
-				os.makedirs(series_dir)
-			except OSError, (e):
-				logger.error("unable to create directory %r: %s", series_dir, e.strerror)
-				raise FilesystemError(e.strerror)
+		try:
+			# make sure series folder exists on that disk
+			series_dir = None
+			for dir in series.path:
+				if dir.startswith(free_root):
+					series_dir = dir 
+					break
 			else:
-				logger.debug("created series directory '%s'", series_dir)
-			series.path.append(series_dir)
-
-		dest_dir = series.locate_season_folder(episode.season, series_dir)
-		if dest_dir is None:
-			
-			# get season folder (if desired)
-			dest_dir = os.path.join(series_dir, file.format_season())
-
-			if not os.path.isdir(dest_dir):
+				series_dir = os.path.join(free_root, series.format(config['tv']['template']['series']))
 				try:
-					os.makedirs(dest_dir)
+					os.makedirs(series_dir)
 				except OSError, (e):
-					logger.error("unable to create directory %r: %s", dest_dir, e.strerror)
+					logger.error("unable to create directory %r: %s", series_dir, e.strerror)
 					raise FilesystemError(e.strerror)
 				else:
-					logger.debug("created season directory '%s'", dest_dir)
+					logger.debug("created series directory '%s'", series_dir)
+				series.path.append(series_dir)
+
+				# start watching new series so that later downloads are sorted into the same folder
+				broker[WATCHED_SERIES_LIST].setdefault(sanitized_name, series)
+
+			dest_dir = series.locate_season_folder(episode.season, series_dir)
+			if dest_dir is None:
+				
+				# get season folder (if desired)
+				dest_dir = os.path.join(series_dir, file.format_season())
+
+				if not os.path.isdir(dest_dir):
+					try:
+						os.makedirs(dest_dir)
+					except OSError, (e):
+						logger.error("unable to create directory %r: %s", dest_dir, e.strerror)
+						raise FilesystemError(e.strerror)
+					else:
+						logger.debug("created season directory '%s'", dest_dir)
+						series.add_season_folder(dest_dir)
+
+			# build list of episode(s) (either SingleEpisode or DailyEpisode) that are desirable
+			# ie. missing or of more desirable quality than current offering
+			desirables = series.filter_undesirables(episode)
+			additional = None
+			if len(desirables) == 0:
+				logger.warning("duplicate episode detected!")
+				additional = "[%s].%s" % (episode.quality, strftime("%Y%m%d%H%M"))
+
+			# generate new filename for current episode
+			new_path = os.path.join(dest_dir, file.format(additional))
+
+			# ATTENTION: episodes are only added to the series episode lists once moved, make sure
+			# two downloads of the same episode in the current run don't end up in the same file
+			if new_path in planned:
+				logger.warning("duplicate episode detected!")
+				count = 1
+				while new_path in planned:
+					additional = "[%s].%s.%d" % (episode.quality, strftime("%Y%m%d%H%M"), count)
+					new_path = os.path.join(dest_dir, file.format(additional))
+					count += 1
+			planned.add(new_path)
+			logger.info("episode file will be moved to '%s'", new_path)
+		except:
+			scheduler.release(free_root, file.size)
+			raise
+
+		return {'job': job, 'file': file, 'series': series, 'desirables': desirables, 'additional': additional, 
+			'orig_path': orig_path, 'new_path': new_path, 'root': free_root}
+
+	return None
+
+def __finish_sort(broker, dry_run, plan, task):
+	"""
+		record the episode file moved by given task (see __plan_sort) in the metadata db and series episode lists.
+		Return the new filesystem episode object if it isn't a duplicate, None otherwise
+	"""
+	logger = logging.getLogger("mediarover.scripts.sabnzbd.episode")
+	config = broker[CONFIG_OBJECT]
 
-		# build list of episode(s) (either SingleEpisode or DailyEpisode) that are desirable
-		# ie. missing or of more desirable quality than current offering
-		desirables = series.filter_undesirables(episode)
-		additional = None
-		if len(desirables) == 0:
-			logger.warning("duplicate episode detected!")
-			additional = "[%s].%s" % (episode.quality, strftime("%Y%m%d%H%M"))
+	if dry_run:
+		return None
 
-		# generate new filename for current episode
-		new_path = os.path.join(dest_dir, file.format(additional))
+	file = plan['file']
+	new_path = plan['new_path']
 
-		logger.info("attempting to move episode file...")
-		try:
-			shutil.move(orig_path, new_path)
-		except OSError, (e):
-			logger.error("unable to move downloaded episode to '%s': %s", new_path, e.strerror)
-			raise FilesystemError(e.strerror)
-	
-		# move successful, cleanup download directory
-		else:
-			logger.info("downloaded episode moved from '%s' to '%s'", orig_path, new_path)
+	try:
+		task.reraise()
+	except (IOError, OSError), (e):
+		logger.error("unable to move downloaded episode to '%s': %s", new_path, e.strerror)
+		raise FilesystemError(e.strerror)
+
+	# move successful, cleanup download directory
+	logger.info("downloaded episode moved from '%s' to '%s'", plan['orig_path'], new_path)
 
-			# update episode and set new filesystem path
-			file.path = new_path
+	# update episode and set new filesystem path
+	file.path = new_path
+
+	if config['tv']['library']['quality']['managed']:
+		with broker[METADATA_OBJECT].transaction():
 
 			# remove job from in_progress
-			if config['tv']['library']['quality']['managed']:
-				broker[METADATA_OBJECT].delete_in_progress(job)
-
-			if additional is None:
-
-				# mark series episode list stale
-				series.mark_episode_list_stale()
-
-				# update metadata db with newly sorted episode information
-				if config['tv']['library']['quality']['managed']:
-					for ep in desirables:
-						broker[METADATA_OBJECT].add_episode(ep)
-
-				remove = []
-				files = series.find_episode_on_disk(episode)
-
-				# remove any duplicate or multipart episodes on disk that are no longer
-				# needed...
-				logger.info("checking filesystem for duplicate or multipart episode redundancies...")
-				for found in files:
-					object = found.episode
-					if hasattr(object, "episodes"):
-						for ep in object.episodes:
-							list = series.find_episode_on_disk(ep, False)
-							if len(list) == 0: # individual part not found on disk, can't delete this multi
-								break
-						else:
-							remove.append(found)
-
-					elif file != found:
-						remove.append(found)
-
-				# if series isn't being archived, delete oldest episode on disk if series episode count
-				# exceeds the indicated value
-				# NOTE: if the number of series episodes exceeds the indicated amount by more than one
-				# display a warning message indicating as much. DO NOT remove more than one file!
-				# We don't want to accidentally wipe out an entire series due to improper configuration!
-				if sanitized_name in config['tv']['filter'] and config['tv']['filter'][sanitized_name]['archive'] is False:
-					limit = config['tv']['filter'][sanitized_name]['episode_limit']
-					if limit > 0:
-						count = len(series.files)
-						if count > limit:
-							if count > limit + 1:
-								logger.warning("the series '%s' has more episodes on disk than the configured limit of %d. Only 1 will be removed" % (series, limit))
-							else:
-								logger.info("removing oldest episode...")
-							series.delete_oldest_episode_file()
-
-				if len(remove) > 0:
-					series.delete_episode_files(*remove)
-					
-			# clean up download directory by removing all remaining files
-			try:
-				shutil.rmtree(path)
-			except (shutil.Error), e:
-				raise CleanupError("unable to remove download directory '%s'" % e)
+			broker[METADATA_OBJECT].delete_in_progress(plan['job'])
+
+			# update metadata db with newly sorted episode information
+			if plan['additional'] is None:
+				for ep in plan['desirables']:
+					broker[METADATA_OBJECT].add_episode(ep)
+
+	if plan['additional'] is None:
+
+		# add new file to series episode lists
+		plan['series'].add_files(new_path)
+
+		return file
+
+	return None
+
+def __clean_series(broker, series, files):
+	""" remove any episode files of given series that have been made redundant by the given newly sorted files """
+	logger = logging.getLogger("mediarover.scripts.sabnzbd.episode")
+	config = broker[CONFIG_OBJECT]
+	sanitized_name = series.sanitized_name
+
+	remove = []
+
+	# remove any duplicate or multipart episodes on disk that are no longer
+	# needed...
+	logger.info("checking filesystem for duplicate or multipart episode redundancies...")
+	for file in files:
+		for found in series.find_episode_on_disk(file.episode):
+
+			# never remove a file sorted during the current run
+			if found in files or found in remove:
+				continue
+
+			object = found.episode
+			if hasattr(object, "episodes"):
+				for ep in object.episodes:
+					list = series.find_episode_on_disk(ep, False)
+					if len(list) == 0: # individual part not found on disk, can't delete this multi
+						break
+				else:
+					remove.append(found)
+
 			else:
-				logger.info("removing download directory '%s'" % path)
+				remove.append(found)
+
+	# if series isn't being archived, delete oldest episode on disk if series episode count
+	# exceeds the indicated value
+	# NOTE: if the number of series episodes exceeds the indicated amount by more than one
+	# display a warning message indicating as much. DO NOT remove more than one file!
+	# We don't want to accidentally wipe out an entire series due to improper configuration!
+	if sanitized_name in config['tv']['filter'] and config['tv']['filter'][sanitized_name]['archive'] is False:
+		limit = config['tv']['filter'][sanitized_name]['episode_limit']
+		if limit > 0:
+			count = len(series.files)
+			if count > limit:
+				if count > limit + 1:
+					logger.warning("the series '%s' has more episodes on disk than the configured limit of %d. Only 1 will be removed" % (series, limit))
+				else:
+					logger.info("removing oldest episode...")
+				series.delete_oldest_episode_file()
 
+	if len(remove) > 0:
+		series.delete_episode_files(*remove)
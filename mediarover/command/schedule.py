@@ -13,6 +13,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from __future__ import with_statement
+
+import hashlib
 import logging
 import logging.config
 import os
@@ -20,13 +23,17 @@ import os.path
 import re
 import shutil
 import sys
+import time
+from collections import OrderedDict
 from optparse import OptionParser
 from time import strftime
 
 from mediarover.command import print_epilog, register_source_factories
 from mediarover.config import build_series_filters, get_processed_app_config
+from mediarover.ds.feed_cache import FeedCache
 from mediarover.ds.metadata import Metadata
 from mediarover.episode.factory import EpisodeFactory
+from mediarover.episode.parser import load_parse_cache, save_parse_cache
 from mediarover.error import (ConfigurationError, FailedDownload, FilesystemError, 
 										InvalidJobTitle, InvalidMultiEpisodeData, InvalidRemoteData,
 										MissingParameterError, QueueDeletionError, QueueInsertionError, 
@@ -34,13 +41,14 @@ from mediarover.error import (ConfigurationError, FailedDownload, FilesystemErro
 from mediarover.filesystem.episode import FilesystemEpisode
 from mediarover.filesystem.factory import FilesystemFactory
 from mediarover.notification import Notification
-from mediarover.series import Series, build_series_lists 
+from mediarover.series import Series, SeriesMatcher, build_series_lists 
+from mediarover.utils.pool import Task, run_tasks
 from mediarover.version import __app_version__
 
 from mediarover.constant import (CONFIG_DIR, CONFIG_OBJECT, DELAYED_ITEM_NOTIFICATION,
-											EPISODE_FACTORY_OBJECT, FATAL_ERROR_NOTIFICATION, 
-											FILESYSTEM_FACTORY_OBJECT, HIGH, LOW, MEDIUM, METADATA_OBJECT, 
-											NOTIFICATION_OBJECT, QUEUED_ITEM_NOTIFICATION, RESOURCES_DIR, 
+											EPISODE_FACTORY_OBJECT, FATAL_ERROR_NOTIFICATION, FEED_CACHE_OBJECT, 
+											FILESYSTEM_FACTORY_OBJECT, HIGH, HTTP_CLIENT_OBJECT, LOW, MEDIUM, METADATA_OBJECT, 
+											NOTIFICATION_OBJECT, QUEUED_ITEM_NOTIFICATION, RESOURCES_DIR, SERIES_MATCHER_OBJECT,
 											WATCHED_SERIES_LIST)
 
 def schedule(broker, args):
@@ -69,6 +77,41 @@ Examples:
 	if options.config:
 		broker.register(CONFIG_DIR, options.config)
 
+	initialize_schedule(broker)
+
+	logger = logging.getLogger("mediarover")
+	logger.info("--- STARTING ---")
+	logger.debug("platform: %s, app version: %s, schema: %d", sys.platform, __app_version__, broker[METADATA_OBJECT].schema_version)
+	logger.debug("using config directory: %s", broker[CONFIG_DIR])
+
+	try:
+		__schedule(broker, options)
+	except Exception, e:
+		broker[NOTIFICATION_OBJECT].process(FATAL_ERROR_NOTIFICATION, 'Media Rover died unexpectedly: %s' % e.args[0])
+		logger.exception(e)
+		raise
+	else:
+		if options.dry_run:
+			logger.info("DONE, dry-run flag set...nothing to do!")
+		else:
+			# only remember feed validators once every item has been processed,
+			# otherwise unprocessed items would be skipped on the next run
+			broker[FEED_CACHE_OBJECT].save()
+			logger.info("DONE")
+	finally:
+		save_parse_cache(broker[METADATA_OBJECT])
+		broker[METADATA_OBJECT].cleanup()
+		broker[FEED_CACHE_OBJECT].cleanup()
+		broker[NOTIFICATION_OBJECT].cleanup()
+		broker[HTTP_CLIENT_OBJECT].cleanup()
+
+def initialize_schedule(broker):
+	""" 
+		load and validate the application config and register all objects needed to process configured 
+		sources with the dependency broker.  Objects registered here are meant to be long lived; they can 
+		be reused by any number of calls to process_schedule()
+	"""
+
 	# create config object using user config values
 	try:
 		config = get_processed_app_config(broker[RESOURCES_DIR], broker[CONFIG_DIR])
@@ -88,38 +131,33 @@ Examples:
 	logging.config.fileConfig(open(os.path.join(broker[CONFIG_DIR], "logging.conf")))
 	logger = logging.getLogger("mediarover")
 
+	# if we don't have any sources there isn't any reason to continue.  Print
+	# message and exit
+	if not len(config['source']):
+		logger.warning("No sources found!")
+		print "ERROR: Did not find any configured sources in configuration file.  Nothing to do!"
+		exit(1)
+
 	""" post configuration setup """
 
 	broker.register(CONFIG_OBJECT, config)
 	broker.register(METADATA_OBJECT, Metadata())
+	broker.register(FEED_CACHE_OBJECT, FeedCache())
 	broker.register(EPISODE_FACTORY_OBJECT, EpisodeFactory())
 	broker.register(FILESYSTEM_FACTORY_OBJECT, FilesystemFactory())
 	broker.register(NOTIFICATION_OBJECT, Notification())
+	broker.register(SERIES_MATCHER_OBJECT, SeriesMatcher())
 
 	# register source dependencies
 	register_source_factories(broker)
 
-	logger.info("--- STARTING ---")
-	logger.debug("platform: %s, app version: %s, schema: %d", sys.platform, __app_version__, broker[METADATA_OBJECT].schema_version)
-	logger.debug("using config directory: %s", broker[CONFIG_DIR])
-
-	try:
-		__schedule(broker, options)
-	except Exception, e:
-		broker[NOTIFICATION_OBJECT].process(FATAL_ERROR_NOTIFICATION, 'Media Rover died unexpectedly: %s' % e.args[0])
-		logger.exception(e)
-		raise
-	else:
-		if options.dry_run:
-			logger.info("DONE, dry-run flag set...nothing to do!")
-		else:
-			logger.info("DONE")
-	finally:
-		broker[METADATA_OBJECT].cleanup()
-		broker[NOTIFICATION_OBJECT].cleanup()
-
-def __schedule(broker, options):
+	load_parse_cache(broker[METADATA_OBJECT])
 
+def process_schedule(broker, dry_run):
+	""" 
+		process configured sources and schedule desirable items for download.  The dict of watched series 
+		must already be registered with the dependency broker 
+	"""
 	logger = logging.getLogger("mediarover")
 
 	# grab config object
@@ -132,61 +170,22 @@ def __schedule(broker, options):
 		raise ConfigurationError("when quality management is on you must indicate a desired quality level at [tv] [[quality]] desired =")
 
 	# check if user has requested a dry-run
-	if options.dry_run:
+	if dry_run:
 		logger.info("--dry-run flag detected!  No new downloads will be queued during execution!")
 
-	tv_root = config['tv']['tv_root']
-	if not len(tv_root):
-		raise ConfigurationError("You must declare at least one tv_root directory!")
-
-	# build dict of watched series
-	series_lists = build_series_lists(config)
-	logger.info("watching %d tv show(s)", len(series_lists[0]))
-
-	# register series dictionary with dependency broker
-	broker.register(WATCHED_SERIES_LIST, series_lists[0])
-
-	logger.debug("finished processing watched tv")
 	logger.info("begin processing sources")
 
-	# grab list of source url's from config file and build appropriate Source objects
-	sources = []
-	for name, params in config['source'].items():
-		logger.debug("found feed '%s'", name)
-
-		# first things first: if manage_quality is True, make sure the user
-		# has specified a quality for this source
-		if manage_quality and params['quality'] is None:
-			raise ConfigurationError("missing quality flag for source '%s'" % name)
-
-		params['name'] = name
-		params['priority'] = config[params['type']]['priority']
-		
-		provider = params['provider']
-		del params['provider']
-
-		# grab source object
-		factory = broker[provider]
+	# items of series that aren't being watched are dropped as sources are read, make
+	# sure the current list of watched series is used
+	broker[SERIES_MATCHER_OBJECT].build(broker[WATCHED_SERIES_LIST])
 
-		logger.debug("creating source for feed %r", name)
-		try:
-			source = factory.create_source(**params)
-		except UrlRetrievalError, e:
-			logger.error("skipping source '%s', reason: %s" % (name, e))
-			continue
-		except InvalidRemoteData, e:
-			logger.error("skipping source '%s', unable to process remote data: %s", name, e)
-			continue
-		else:
-			logger.info("created source %r" % name)
-			sources.append(source)
+	# grab list of source url's from config file and build appropriate Source objects
+	sources = __build_sources(broker, manage_quality)
 
-	# if we don't have any sources there isn't any reason to continue.  Print
-	# message and exit
+	# none of the configured sources could be retrieved, there may still be
+	# delayed items to process
 	if not len(sources):
-		logger.warning("No sources found!")
-		print "ERROR: Did not find any configured sources in configuration file.  Nothing to do!"
-		exit(1)
+		logger.warning("unable to retrieve any of the configured sources!")
 
 	logger.info("watching %d source(s)", len(sources))
 	logger.debug("finished processing sources")
@@ -260,7 +259,7 @@ def __schedule(broker, options):
 					the current Item
 				d) the Item is not currently in the Queue list of Jobs
 	"""
-	scheduled = []
+	scheduled = OrderedDict()
 	drop_from_queue = []
 
 	# start by processing any items that have been delayed and 
@@ -270,6 +269,9 @@ def __schedule(broker, options):
 		logger.debug("begin processing delayed item '%s'", item.title)
 		__process_item(broker, item, queue, scheduled, drop_from_queue)
 
+	# items rejected during a previous run are skipped for as long as their series hasn't changed
+	ttl = config['schedule']['seen_item_ttl']
+
 	# now process items from any configured sources
 	for source in sources:
 		logger.info("processing '%s' items", source.name())
@@ -279,16 +281,35 @@ def __schedule(broker, options):
 		except (InvalidRemoteData), e:
 			logger.warning(e)
 			continue
-			
+
+		seen = {}
+		if ttl:
+			seen = broker[METADATA_OBJECT].get_seen_items(source.name())
+
+		decisions = []
 		for item in items:
+			key = __item_hash(item)
+			signature = __series_signature(item.download.series)
+
+			previous = seen.get(key)
+			if previous is not None and previous[0] is not None and previous[1] == signature:
+				logger.debug("skipping '%s', unchanged since last run (%s)", item.title, previous[0])
+				decisions.append((key, previous[0], signature))
+				continue
+
 			logger.debug("begin processing item '%s'", item.title)
 
 			# process current item
-			__process_item(broker, item, queue, scheduled, drop_from_queue)
+			decision = __process_item(broker, item, queue, scheduled, drop_from_queue)
+			decisions.append((key, decision, signature))
+
+		if ttl and not dry_run and len(decisions):
+			now = int(time.time())
+			broker[METADATA_OBJECT].update_seen_items(source.name(), decisions, now, now - ttl * 86400)
 
 	logger.debug("finished processing items")
 
-	if not options.dry_run:
+	if not dry_run:
 		if len(drop_from_queue) > 0:
 			logger.info("removing flagged items from download")
 			for job in drop_from_queue:
@@ -297,15 +318,14 @@ def __schedule(broker, options):
 				except QueueDeletionError:
 					logger.warning("unable to remove job %r from queue", job.title)
 
-		# remove processed items from delayed_item table
-		broker[METADATA_OBJECT].delete_stale_delayed_items()
-
 		# now that we've fully parsed all source items
 		# lets add the collected downloads to the queue...
+		# ATTENTION: items are recorded as in progress as soon as the queue accepts them, don't hold
+		# a metadata transaction open while waiting on the queue
 		delayed = []
 		if len(scheduled) > 0:
 			logger.info("scheduling items for download")
-			for item in scheduled:
+			for item in scheduled.values():
 				if item.delay > 0:
 					delayed.append(item)
 				else:
@@ -321,29 +341,140 @@ def __schedule(broker, options):
 		else:
 			logger.info("no items to schedule for download")
 
-		if len(delayed) > 0:
-			logger.info("identified %d item(s) with a schedule delay" % len(delayed))
-			existing = broker[METADATA_OBJECT].get_delayed_items()
-			for item in delayed:
-				if item not in existing:
-					broker[METADATA_OBJECT].add_delayed_item(item)
-					broker[NOTIFICATION_OBJECT].process(
-						DELAYED_ITEM_NOTIFICATION, 
-						"'%s' was delayed for %d iteration(s)" % (item.title, item.delay)
-					)
-				else:
-					logger.debug("skipping %s, already delayed" % item.title)
+		# record delayed items in a single transaction
+		recorded = []
+		with broker[METADATA_OBJECT].transaction():
+
+			# remove processed items from delayed_item table
+			broker[METADATA_OBJECT].delete_stale_delayed_items()
+
+			if len(delayed) > 0:
+				logger.info("identified %d item(s) with a schedule delay" % len(delayed))
+				existing = set([i.download.key for i in broker[METADATA_OBJECT].get_delayed_items()])
+				for item in delayed:
+					if item.download.key not in existing:
+						broker[METADATA_OBJECT].add_delayed_item(item)
+						recorded.append(item)
+					else:
+						logger.debug("skipping %s, already delayed" % item.title)
+
+			# reduce delay count for all items in delayed_item table
+			broker[METADATA_OBJECT].reduce_item_delay()
 
-		# reduce delay count for all items in delayed_item table
-		broker[METADATA_OBJECT].reduce_item_delay()
+		for item in recorded:
+			broker[NOTIFICATION_OBJECT].process(
+				DELAYED_ITEM_NOTIFICATION, 
+				"'%s' was delayed for %d iteration(s)" % (item.title, item.delay)
+			)
 	else:
 		if len(scheduled) > 0:
 			logger.info("the following items were identified as being eligible for download:")
-			for item in scheduled:
+			for item in scheduled.values():
 				logger.info(item.title)
 
-def __process_item(broker, item, queue, scheduled, drop_from_queue):
+def __schedule(broker, options):
+
+	logger = logging.getLogger("mediarover")
+
+	tv_root = broker[CONFIG_OBJECT]['tv']['tv_root']
+	if not len(tv_root):
+		raise ConfigurationError("You must declare at least one tv_root directory!")
+
+	# build dict of watched series
+	series_lists = build_series_lists(broker[CONFIG_OBJECT])
+	logger.info("watching %d tv show(s)", len(series_lists[0]))
+
+	# register series dictionary with dependency broker
+	broker.register(WATCHED_SERIES_LIST, series_lists[0])
+
+	logger.debug("finished processing watched tv")
+
+	process_schedule(broker, options.dry_run)
+
+def __build_sources(broker, manage_quality):
+	""" 
+		build Source objects for all configured sources.  Sources are retrieved and parsed concurrently
+		using a bounded pool of workers, each source must complete before its timeout is reached 
+	"""
+	logger = logging.getLogger("mediarover")
+
+	config = broker[CONFIG_OBJECT]
+
+	tasks = []
+	for name in config['source']:
+		logger.debug("found feed '%s'", name)
+
+		# work on a copy, the config section is reused on every run
+		params = dict(config['source'][name])
+
+		# first things first: if manage_quality is True, make sure the user
+		# has specified a quality for this source
+		if manage_quality and params['quality'] is None:
+			raise ConfigurationError("missing quality flag for source '%s'" % name)
+
+		params['name'] = name
+		params['priority'] = config[params['type']]['priority']
+		
+		provider = params.pop('provider')
+
+		# grab source object
+		factory = broker[provider]
+
+		logger.debug("creating source for feed %r", name)
+		tasks.append(Task(name, factory.create_source, kwargs=params, timeout=int(params['timeout'])))
+
+	run_tasks(tasks, config['schedule']['concurrent_sources'])
+
+	# collect sources in the order they were configured
+	sources = []
+	for task in tasks:
+		if task.expired:
+			logger.error("skipping source '%s', reason: no response after %d seconds", task.name, task.timeout)
+			continue
+
+		try:
+			task.reraise()
+		except UrlRetrievalError, e:
+			logger.error("skipping source '%s', reason: %s" % (task.name, e))
+			continue
+		except InvalidRemoteData, e:
+			logger.error("skipping source '%s', unable to process remote data: %s", task.name, e)
+			continue
+		else:
+			logger.info("created source %r" % task.name)
+			sources.append(task.result)
+
+			# stage the validators of the retrieved document, they are committed once the current run has 
+			# processed its items.  Results of expired tasks are dropped above so that a source that 
+			# finishes late can't stage validators for items that were never processed
+			if task.result.modified():
+				(etag, last_modified) = task.result.validators()
+				broker[FEED_CACHE_OBJECT].set_validators(task.result.url(), etag, last_modified)
+
+	return sources
+
+def __item_hash(item):
+	""" return digest identifying given source item """
+	values = []
+	for value in (item.url, item.title, item.quality):
+		if isinstance(value, unicode):
+			value = value.encode("utf-8")
+		values.append(str(value))
+
+	return hashlib.sha1("\0".join(values)).hexdigest()
+
+def __series_signature(series):
+	""" return signature of given series, series that aren't being watched aren't scanned """
+	if len(series.path) == 0:
+		return ""
 
+	return series.signature
+
+def __process_item(broker, item, queue, scheduled, drop_from_queue):
+	"""
+		evaluate given item and schedule it for download if desirable.  Return a label describing why the item was 
+		rejected when that decision only depends on the item series (see Series.signature), otherwise None
+	"""
 	logger = logging.getLogger("mediarover")
 
 	# grab the episode and series object
@@ -354,12 +485,12 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 	# for its series so it can be skipped
 	if len(series.path) == 0:
 		logger.info("skipping '%s', not watching series", item.title)
-		return
+		return "unwatched"
 
 	# check if season of current episode is being ignored...
 	if series.ignore(episode.season): 
 		logger.info("skipping '%s', ignoring season", item.title)
-		return
+		return "ignored season"
 
 	# if multiepisode job: check if user will accept, otherwise 
 	# continue to next job
@@ -369,15 +500,16 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 		except AttributeError:
 			pass
 		else:
-			return
+			return "multipart"
 
 	# check if episode is represented on disk (single or multi). If yes, determine whether 
 	# or not it should be scheduled for download.
 	# ATTENTION: this call takes into account users preferences regarding single vs multi-part 
 	# episodes as well as desired quality level
+	# NOTE: without a queued job to compare against, this decision only depends on the series
 	if not series.should_episode_be_downloaded(episode):
 		logger.info("skipping '%s'", item.title)
-		return
+		return "undesirable"
 
 	# if item has a schedule delay, determine if it meets desired series quality
 	# if it does, set delay to 0 so it will be scheduled immediately
@@ -399,7 +531,7 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 			# If it doesn't exist we skip
 			if len(series.find_episode_on_disk(episode)) == 0:
 				logger.debug("skipping '%s', older than newest episode already on disk", item.title)
-				return
+				return "older"
 
 	# check if episode is already in the queue.  If yes, determine whether or not it should
 	# replace queued item and be scheduled for download
@@ -424,6 +556,7 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 			return
 
 	# make sure current item hasn't already been downloaded before
+	# NOTE: this depends on the queue rather than the series, don't remember the decision
 	if queue.processed(item):
 		logger.info("skipping '%s', already processed by queue", item.title)
 		return
@@ -432,9 +565,11 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 	# should replace the currently scheduled item.
 	# ATTENTION: this call takes into account users preferences regarding single vs multi-part 
 	# episodes as well as desired quality level
+	# NOTE: scheduled items are indexed by episode key, equal episodes share the same key
+	key = episode.key
 	drop_from_scheduled = None
-	if item in scheduled:
-		old_item = scheduled[scheduled.index(item)]
+	if key in scheduled:
+		old_item = scheduled[key]
 		desirable = series.should_episode_be_downloaded(episode, old_item.download)
 
 		# the current item has a delay:
@@ -463,8 +598,7 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 
 	# we made it this far, schedule the current item for download!
 	logger.info("adding '%s' to download list", item.title)
-	scheduled.append(item)
-		
 	if drop_from_scheduled is not None:
-		scheduled.remove(drop_from_scheduled)
+		del scheduled[key]
+	scheduled[key] = item
 	
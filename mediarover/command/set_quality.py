@@ -13,6 +13,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from __future__ import with_statement
+
 import logging
 import logging.config
 import os.path
@@ -271,32 +273,36 @@ Series Options:
 				quality = HIGH
 
 			# set quality for all episodes in given size list
-			for episode in avg_sizes[avg_size]['episodes']:
-				episode.quality = quality
-				broker[METADATA_OBJECT].add_episode(episode)
+			with broker[METADATA_OBJECT].transaction():
+				for episode in avg_sizes[avg_size]['episodes']:
+					episode.quality = quality
+					broker[METADATA_OBJECT].add_episode(episode)
 
 		# set quality for all episodes that were matched by extension
 		extension_msg = "Setting quality of '%s' for %d episode(s) with extension found in %s"
 		if len(low):
 			quality = LOW
 			print extension_msg % (quality, len(low), options.low)
-			for episode in low:
-				episode.quality = quality
-				broker[METADATA_OBJECT].add_episode(episode)
+			with broker[METADATA_OBJECT].transaction():
+				for episode in low:
+					episode.quality = quality
+					broker[METADATA_OBJECT].add_episode(episode)
 
 		if len(medium):
 			quality = MEDIUM
 			print extension_msg % (quality, len(medium), options.medium)
-			for episode in medium:
-				episode.quality = quality
-				broker[METADATA_OBJECT].add_episode(episode)
+			with broker[METADATA_OBJECT].transaction():
+				for episode in medium:
+					episode.quality = quality
+					broker[METADATA_OBJECT].add_episode(episode)
 
 		if len(high):
 			quality = HIGH
 			print extension_msg % (quality, len(high), options.high)
-			for episode in high:
-				episode.quality = quality
-				broker[METADATA_OBJECT].add_episode(episode)
+			with broker[METADATA_OBJECT].transaction():
+				for episode in high:
+					episode.quality = quality
+					broker[METADATA_OBJECT].add_episode(episode)
 
 	print "DONE"
 		
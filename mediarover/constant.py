@@ -26,11 +26,17 @@ LIBNOTIFY_NOTIFICATION = 'libnotify'
 LOG_NOTIFICATION = 'log'
 XBMC_NOTIFICATION = 'xbmc'
 
+# name of the sort server socket, found in the config directory
+SORT_SERVER_SOCKET = 'episode_sort.sock'
+
 # dependency injection specific constants
 CONFIG_DIR = 'config_dir'
 CONFIG_OBJECT = 'config'
 EPISODE_FACTORY_OBJECT = 'episode_factory'
+FEED_CACHE_OBJECT = 'feed_cache'
 FILESYSTEM_FACTORY_OBJECT = 'filesystem_factory'
+FREE_SPACE_OBJECT = 'free_space'
+HTTP_CLIENT_OBJECT = 'http_client'
 IGNORED_SERIES_LIST = 'ignored_series'
 METADATA_OBJECT = 'metadata_data_store'
 NEWZBIN_FACTORY_OBJECT = NEWZBIN
@@ -41,4 +47,5 @@ NZBMATRIX_FACTORY_OBJECT = NZBMATRIX
 NZBS_FACTORY_OBJECT = NZBS
 NZBSRUS_FACTORY_OBJECT = NZBSRUS
 RESOURCES_DIR = 'resources_dir'
+SERIES_MATCHER_OBJECT = 'series_matcher'
 WATCHED_SERIES_LIST = 'watched_series'
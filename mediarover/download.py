@@ -18,6 +18,8 @@ from mediarover.comparable import Comparable
 class Download(Comparable):
 	""" Download interface class """
 
+	__slots__ = ()
+
 	# abstract methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def __hash__(self):
@@ -29,3 +31,10 @@ class Download(Comparable):
 	def __str__(self):
 		raise NotImplementedError
 
+	# property methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	@property
+	def key(self):
+		""" hashable value identifying current download.  Two equal downloads have the same key """
+		raise NotImplementedError
+
@@ -0,0 +1,105 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os.path
+import sqlite3
+import threading
+
+from mediarover.constant import CONFIG_DIR
+from mediarover.utils.injection import is_instance_of, Dependency
+
+class FeedCache(object):
+	"""
+		object interface to the source feed cache data store.  The cache records the HTTP validators
+		(ETag and Last-Modified) returned by each source url so that subsequent requests can be made
+		conditional.
+
+		Validators are read into memory when the object is created and may be queried and updated from
+		any thread.  Updates are staged until save() is called, which makes them visible to get_validators()
+		and writes them to disk.  Staged updates are dropped by discard()
+	"""
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# declare module dependencies
+	config_dir = Dependency(CONFIG_DIR, is_instance_of(str))
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def get_validators(self, url):
+		""" 
+			return saved (etag, last_modified) tuple for given url.  If url is not in cache, return (None, None) 
+		"""
+		self.__lock.acquire()
+		try:
+			return self.__validators.get(url, (None, None))
+		finally:
+			self.__lock.release()
+
+	def set_validators(self, url, etag, last_modified):
+		""" stage validators for given url.  Changes are not used or written to disk until save() is called """
+		self.__lock.acquire()
+		try:
+			self.__staged[url] = (etag, last_modified)
+		finally:
+			self.__lock.release()
+
+	def save(self):
+		""" commit all staged changes and write them to disk """
+		logger = logging.getLogger("mediarover.ds.feed_cache")
+
+		self.__lock.acquire()
+		try:
+			for (url, (etag, last_modified)) in self.__staged.items():
+				if etag is None and last_modified is None:
+					self.__validators.pop(url, None)
+					self.__dbh.execute("DELETE FROM feed_cache WHERE url=?", (url,))
+				else:
+					self.__validators[url] = (etag, last_modified)
+					self.__dbh.execute("INSERT OR REPLACE INTO feed_cache (url, etag, last_modified) VALUES (?,?,?)", (url, etag, last_modified))
+			self.__dbh.commit()
+
+			logger.debug("saved validators for %d source url(s)", len(self.__staged))
+			self.__staged = {}
+		finally:
+			self.__lock.release()
+
+	def discard(self):
+		""" drop all staged changes """
+		self.__lock.acquire()
+		try:
+			self.__staged = {}
+		finally:
+			self.__lock.release()
+
+	def cleanup(self):
+		self.__dbh.close()
+
+	def __init__(self):
+
+		db = os.path.join(self.config_dir, "ds", "feed_cache.db")
+
+		# establish connection to database
+		self.__dbh = sqlite3.connect(db)
+		self.__dbh.execute("CREATE TABLE IF NOT EXISTS feed_cache (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT)")
+		self.__dbh.commit()
+
+		self.__lock = threading.Lock()
+		self.__staged = {}
+		self.__validators = {}
+		for (url, etag, last_modified) in self.__dbh.execute("SELECT url, etag, last_modified FROM feed_cache"):
+			self.__validators[url] = (etag, last_modified)
+
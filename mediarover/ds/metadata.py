@@ -14,9 +14,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import with_statement
+from contextlib import contextmanager
 from string import Template
 from time import strftime
 
+import hashlib
 import logging
 import os.path
 import re
@@ -30,6 +32,26 @@ from mediarover.factory import ItemFactory
 from mediarover.utils.injection import is_instance_of, Dependency
 from mediarover.version import __schema_version__
 
+# size (in KB) of the page cache used by the metadata connection
+METADATA_CACHE_SIZE = 8192
+
+# ATTENTION: filesystem paths are byte strings of unknown encoding, which sqlite won't store as text.
+# Paths stored in the library index (and titles stored in the parse cache) are mapped one byte per 
+# character so that they can be read back unchanged and compared by prefix
+
+def _to_text(path):
+	if isinstance(path, str):
+		return path.decode("latin-1")
+	return path
+
+def _from_text(value):
+	if isinstance(value, unicode):
+		return value.encode("latin-1")
+	return value
+
+def _parse_hash(parser, title):
+	return hashlib.sha1(parser + "\0" + title).hexdigest()
+
 class Metadata(object):
 	""" object interface to series metadata data store """
 
@@ -44,7 +66,7 @@ class Metadata(object):
 	def add_in_progress(self, item):
 		""" record given nzb in progress table with type, and quality """
 		self.__dbh.execute("INSERT INTO in_progress (title, source, type, quality) VALUES (?,?,?,?)", (item.title, item.source, item.type, item.quality))
-		self.__dbh.commit()
+		self.__commit()
 
 	def get_in_progress(self, title):
 		""" retrieve tuple from the in_progress table for a given session id.  If given id doesn't exist, return None """
@@ -56,7 +78,7 @@ class Metadata(object):
 		count = 0
 		if len(titles) > 0:
 			count = self.__dbh.execute("DELETE FROM in_progress WHERE title IN (%s)" % ",".join(["?" for i in titles]), titles).rowcount
-			self.__dbh.commit()
+			self.__commit()
 		return count
 
 	def list_in_progress(self):
@@ -107,7 +129,7 @@ class Metadata(object):
 			# update episode data
 			self.__dbh.execute("UPDATE %s SET quality=? WHERE id=?" % table, args)
 
-		self.__dbh.commit()
+		self.__commit()
 
 #	def delete_episode(self, episode):
 #		""" delete given episode from database """
@@ -150,10 +172,141 @@ class Metadata(object):
 
 		return result
 
+	def get_episode_qualities(self, series):
+		""" return dict of recorded episode quality levels for given series, keyed by episode key """
+		qualities = {}
+
+		row = self.__fetch_series_data(series)
+		if row is not None:
+			sanitized = series.sanitized_name
+			for r in self.__dbh.execute("SELECT season, episode, quality FROM single_episode WHERE series=?", (row['id'],)):
+				qualities[('S', sanitized, r['season'], r['episode'])] = r['quality']
+			for r in self.__dbh.execute("SELECT year, month, day, quality FROM daily_episode WHERE series=?", (row['id'],)):
+				qualities[('D', sanitized, r['year'], r['month'], r['day'])] = r['quality']
+
+		return qualities
+
+	def get_library_directories(self, root):
+		""" return dict of (parent, mtime) tuples, keyed by path, for given directory and all of its indexed subdirectories """
+		prefix = os.path.join(root, "")
+		directories = {}
+		# express the prefix match as a range so that sqlite can use the index on path
+		for r in self.__dbh.execute("SELECT path, parent, mtime FROM library_directory WHERE path=? OR (path>=? AND path<? || char(1114111))", (_to_text(root), _to_text(prefix), _to_text(prefix))):
+			directories[_from_text(r['path'])] = (_from_text(r['parent']), r['mtime'])
+
+		return directories
+
+	def get_library_files(self, root):
+		""" return dict of library_file rows, grouped by directory, for given directory and all of its subdirectories """
+		prefix = os.path.join(root, "")
+		files = {}
+		for r in self.__dbh.execute("SELECT path, directory, size, mtime, type, season, episode, end_episode, year, month, day FROM library_file WHERE directory=? OR (directory>=? AND directory<? || char(1114111))", (_to_text(root), _to_text(prefix), _to_text(prefix))):
+			record = dict([(key, r[key]) for key in r.keys()])
+			record['path'] = _from_text(r['path'])
+			record['directory'] = _from_text(r['directory'])
+			files.setdefault(record['directory'], []).append(record)
+
+		return files
+
+	def update_library(self, directories, removed=()):
+		"""
+			record the given list of scanned directories in the library index.  Each directory is given as a
+			(path, parent, mtime, files) tuple where files is a list of dicts containing library_file values.
+			Any directories in removed are dropped from the index
+		"""
+		for path in removed:
+			self.__dbh.execute("DELETE FROM library_file WHERE directory=?", (_to_text(path),))
+			self.__dbh.execute("DELETE FROM library_directory WHERE path=?", (_to_text(path),))
+
+		for (path, parent, mtime, files) in directories:
+			values = []
+			for file in files:
+				file = dict(file)
+				file['path'] = _to_text(file['path'])
+				file['directory'] = _to_text(file['directory'])
+				values.append(file)
+
+			self.__dbh.execute("DELETE FROM library_file WHERE directory=?", (_to_text(path),))
+			self.__dbh.execute("INSERT OR REPLACE INTO library_directory (path, parent, mtime) VALUES (?,?,?)", (_to_text(path), _to_text(parent), mtime))
+			self.__dbh.executemany("INSERT OR REPLACE INTO library_file (path, directory, size, mtime, type, season, episode, end_episode, year, month, day) VALUES (:path, :directory, :size, :mtime, :type, :season, :episode, :end_episode, :year, :month, :day)", values)
+
+		self.__commit()
+
+	def get_tv_root_mtime(self, root):
+		""" return modification time of given tv root directory when its series directories were last indexed, or None """
+		row = self.__dbh.execute("SELECT mtime FROM tv_root WHERE path=?", (_to_text(root),)).fetchone()
+		if row is None:
+			return None
+		return row['mtime']
+
+	def get_series_directories(self, sanitized_name):
+		""" return list of (path, root, name) tuples for every indexed directory of the given series """
+		directories = []
+		for r in self.__dbh.execute("SELECT path, root, name FROM series_directory WHERE sanitized_name=? ORDER BY rowid", (sanitized_name,)):
+			directories.append((_from_text(r['path']), _from_text(r['root']), _from_text(r['name'])))
+
+		return directories
+
+	def update_tv_root(self, root, mtime, directories):
+		"""
+			replace the indexed series directories of given tv root.  Each directory is given as a 
+			(path, name, sanitized_name) tuple
+		"""
+		root = _to_text(root)
+		self.__dbh.execute("DELETE FROM series_directory WHERE root=?", (root,))
+		self.__dbh.execute("INSERT OR REPLACE INTO tv_root (path, mtime) VALUES (?,?)", (root, mtime))
+		self.__dbh.executemany("INSERT INTO series_directory (path, root, name, sanitized_name) VALUES (?,?,?,?)", 
+			[(_to_text(path), root, _to_text(name), sanitized_name) for (path, name, sanitized_name) in directories])
+		self.__commit()
+
+	def get_parse_results(self, parser, limit):
+		""" 
+			return list of (title, class_index, groups, series) tuples cached for given parser version, most 
+			recently used first.  No more than limit results are returned
+		"""
+		results = []
+		for r in self.__dbh.execute("SELECT title, class_index, groups, series FROM parse_cache WHERE parser=? ORDER BY last_used DESC LIMIT ?", (parser, limit)):
+			results.append((_from_text(r['title']), r['class_index'], r['groups'], _from_text(r['series'])))
+
+		return results
+
+	def update_parse_results(self, results, used, expiry):
+		"""
+			store given parse results in a single transaction.  Each result is given as a (parser, title, class_index, 
+			groups, series, last_used) tuple, used is a list of (parser, title, last_used) tuples for results that 
+			were read from the cache again.  Results that haven't been used since expiry are removed
+		"""
+		self.__dbh.executemany("INSERT OR REPLACE INTO parse_cache (hash, parser, title, class_index, groups, series, last_used) VALUES (?,?,?,?,?,?,?)", 
+			[(_parse_hash(parser, title), parser, _to_text(title), index, groups, _to_text(series), last_used) for (parser, title, index, groups, series, last_used) in results])
+		self.__dbh.executemany("UPDATE parse_cache SET last_used=? WHERE hash=?", 
+			[(last_used, _parse_hash(parser, title)) for (parser, title, last_used) in used])
+		self.__dbh.execute("DELETE FROM parse_cache WHERE last_used < ?", (expiry,))
+		self.__commit()
+
+	def get_seen_items(self, source):
+		""" return dict mapping item hash to (decision, signature) tuple for every item seen in given source """
+		items = {}
+		for r in self.__dbh.execute("SELECT hash, decision, signature FROM seen_item WHERE source=?", (source,)):
+			items[r['hash']] = (r['decision'], r['signature'])
+
+		return items
+
+	def update_seen_items(self, source, items, seen, expiry):
+		"""
+			record the items seen in given source in a single transaction.  Each item is given as a (hash, decision, 
+			signature) tuple.  Items that haven't been seen since expiry are removed
+		"""
+		self.__dbh.executemany("INSERT OR IGNORE INTO seen_item (source, hash, first_seen, last_seen) VALUES (?,?,?,?)", 
+			[(source, hash, seen, seen) for (hash, decision, signature) in items])
+		self.__dbh.executemany("UPDATE seen_item SET last_seen=?, decision=?, signature=? WHERE source=? AND hash=?", 
+			[(seen, decision, signature, source, hash) for (hash, decision, signature) in items])
+		self.__dbh.execute("DELETE FROM seen_item WHERE last_seen < ?", (expiry,))
+		self.__commit()
+
 	def add_delayed_item(self, item):
 		""" add given item to delayed_item table """
 		self.__dbh.execute("INSERT INTO delayed_item (title, source, url, type, priority, quality, delay, size) VALUES (?,?,?,?,?,?,?,?)", (item.title, item.source, item.url, item.type, item.priority, item.quality, item.delay, item.size))
-		self.__dbh.commit()
+		self.__commit()
 
 		logger = logging.getLogger("mediarover.ds.metadata")
 		logger.info("delayed scheduling '%s' for download", item.title)
@@ -161,12 +314,12 @@ class Metadata(object):
 	def delete_delayed_item(self, item):
 		""" remove given item from delayed_item table """
 		self.__dbh.execute("DELETE FROM delayed_item WHERE title=?", (item.title,))
-		self.__dbh.commit()
+		self.__commit()
 
 	def delete_stale_delayed_items(self):
 		""" remove all stale items from delayed_item table """
 		self.__dbh.execute("DELETE FROM delayed_item WHERE delay < 1")
-		self.__dbh.commit()
+		self.__commit()
 
 	def get_actionable_delayed_items(self):
 		""" return list of items from the delayed_item table that have delay value less than 1 """
@@ -198,7 +351,7 @@ class Metadata(object):
 	def reduce_item_delay(self):
 		""" reduce delay count by one for all items in delayed_item table """
 		self.__dbh.execute("UPDATE delayed_item SET delay=delay-1 WHERE delay > 0");
-		self.__dbh.commit()
+		self.__commit()
 	
 	def migrate_schema(self, version=None, rollback=False):
 		""" 
@@ -281,6 +434,10 @@ class Metadata(object):
 		print "Migration to schema version %d complete!" % version
 
 	def backup(self):
+
+		# move any changes still held in the write ahead log into the database file before it is copied
+		self.__dbh.execute("PRAGMA wal_checkpoint(FULL)")
+
 		backup = "metadata.%s.rev-%d.db" % (strftime("%Y%m%d%H%M%S"), self.schema_version)
 		root = os.path.join(self.config_dir, "ds")
 		shutil.copyfile(os.path.join(root, "metadata.db"), os.path.join(root, backup))
@@ -288,8 +445,32 @@ class Metadata(object):
 	def cleanup(self):
 		self.__dbh.close()
 
+	@contextmanager
+	def transaction(self):
+		"""
+			group every change made inside the with block into a single transaction.  Transactions can be nested, 
+			changes are committed when the outermost block exits and rolled back if it exits with an exception
+		"""
+		self.__transaction_depth += 1
+		try:
+			yield self
+		except:
+			self.__transaction_depth -= 1
+			if self.__transaction_depth == 0:
+				self.__dbh.rollback()
+			raise
+		else:
+			self.__transaction_depth -= 1
+			if self.__transaction_depth == 0:
+				self.__dbh.commit()
+
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	def __commit(self):
+		""" commit current changes, unless they are part of a larger transaction """
+		if self.__transaction_depth == 0:
+			self.__dbh.commit()
+
 	def __fetch_series_data(self, series):
 		""" query the database and return row data for the given series (if exists) """
 		details = None
@@ -343,6 +524,16 @@ class Metadata(object):
 		# tell connection to return Row objects instead of tuples
 		self.__dbh.row_factory = sqlite3.Row
 
+		# with a write ahead log, commits only append to the log and readers don't block the writer.  The log is 
+		# only synced when it is checkpointed, a crash can lose the last commits but never corrupts the database
+		self.__dbh.execute("PRAGMA journal_mode=WAL")
+		self.__dbh.execute("PRAGMA synchronous=NORMAL")
+		self.__dbh.execute("PRAGMA cache_size=-%d" % METADATA_CACHE_SIZE)
+		self.__dbh.execute("PRAGMA temp_store=MEMORY")
+
+		# number of transaction() blocks currently open
+		self.__transaction_depth = 0
+
 		if exists:
 			# db exists, check that schema version is current
 			if check_schema_version:
@@ -19,10 +19,13 @@ import re
 
 from mediarover.error import *
 from mediarover.episode import Episode
+from mediarover.episode.parser import ParsedTitle
 
 class DailyEpisode(Episode):
 	""" represent a daily episode of tv """
 
+	__slots__ = ('_series', '_year', '_month', '_day', '_title', '_quality', '_key', '_order')
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	__supported_patterns = (
@@ -54,6 +57,18 @@ class DailyEpisode(Episode):
 				<series>.<season>[xX]<episode>
 				<series>.<year>.<day>.<month>
 		"""
+		parsed = None
+		for pattern in cls.get_supported_patterns():
+			match = pattern.search(string)
+			if match:
+				parsed = ParsedTitle(cls, match.groupdict(), string[:match.start()])
+				break
+
+		return cls.extract_from_parse(parsed, **kwargs)
+
+	@classmethod
+	def extract_from_parse(cls, parsed, **kwargs):
+		""" extract episode values from given ParsedTitle object (see EpisodeParser), or None if string wasn't recognized """
 		params = {
 			'series':None,
 			'year':None,
@@ -64,22 +79,17 @@ class DailyEpisode(Episode):
 		}
 
 		# daily shows
-		for pattern in cls.get_supported_patterns():
-			match = pattern.search(string)
-			if match:
-				params['year'] = kwargs['year'] if 'year' in kwargs else match.group('year')
-				params['month'] = kwargs['month'] if 'month' in kwargs else match.group('month')
-				params['day'] = kwargs['day'] if 'day' in kwargs else match.group('day')
-				break
+		if parsed is not None:
+			params['year'] = kwargs['year'] if 'year' in kwargs else parsed.groups['year']
+			params['month'] = kwargs['month'] if 'month' in kwargs else parsed.groups['month']
+			params['day'] = kwargs['day'] if 'day' in kwargs else parsed.groups['day']
 
 		# if we've got a match object, try to set series 
 		if 'series' in kwargs:
 			params['series'] = kwargs['series']
 
-		elif match:
-			start = 0 
-			end = match.start()
-			params['series'] = match.string[start:end]
+		elif parsed is not None:
+			params['series'] = parsed.series
 
 		# finally, set the episode title
 		# NOTE: title will only be set if it was specifically provided, meaning
@@ -120,15 +130,10 @@ class DailyEpisode(Episode):
 				b) same episode number
 		"""
 		try:
-			if self.series != other.series: return False
-			if self.year != other.year: return False
-			if self.month != other.month: return False
-			if self.day != other.day : return False
+			return self._key == other._key
 		except AttributeError:
 			return False
 
-		return True
-
 	def __ne__(self, other):
 		return not self == other
 
@@ -136,11 +141,14 @@ class DailyEpisode(Episode):
 		return not self < other
 
 	def __lt__(self, other):
-		return (self.year, self.month, self.day) < (other.year, other.month, other.day)
+		# ATTENTION: daily episodes can't be ordered relative to season based episodes.  Callers rely on
+		# the AttributeError raised when comparing the two (see Series.get_newer_parts)
+		if other._key[0] != 'D':
+			raise AttributeError("unable to compare DailyEpisode to %s" % other.__class__.__name__)
+		return self._order < other._order
 
 	def __hash__(self):
-		hash = "%s %04d-%02d-%02d" % (self.series.sanitized_name, self.year, self.month, self.day)
-		return hash.__hash__()
+		return hash(self._key)
 
 	def __repr__(self):
 		return "%s(series=%r,year=%r,month=%r,day=%r,title=%r)" % (self.__class__.__name__,self.series,self.year,self.month,self.day,self.title)
@@ -154,6 +162,10 @@ class DailyEpisode(Episode):
 	def day(self):
 		return self._day
 
+	@property
+	def key(self):
+		return self._key
+
 	@property
 	def month(self):
 		return self._month
@@ -199,3 +211,7 @@ class DailyEpisode(Episode):
 		self._title = title
 		self._quality = quality
 
+		# precompute values used to hash, compare and order episodes
+		self._key = ('D', series.sanitized_name, self._year, self._month, self._day)
+		self._order = (self._year, self._month, self._day)
+
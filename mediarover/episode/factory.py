@@ -14,12 +14,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from mediarover.config import ConfigObj
-from mediarover.error import InvalidEpisodeString
+from mediarover.error import InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError
 from mediarover.episode.single import SingleEpisode
 from mediarover.episode.daily import DailyEpisode
+from mediarover.episode.parser import EpisodeParser
 from mediarover.episode.multi import MultiEpisode
 from mediarover.factory import EpisodeFactory as Factory
-from mediarover.series import Series
+from mediarover.series import resolve_series, Series
 from mediarover.utils.injection import is_instance_of, Dependency
 
 class EpisodeFactory(Factory):
@@ -30,40 +31,74 @@ class EpisodeFactory(Factory):
 	config = Dependency("config", is_instance_of(ConfigObj))
 	watched_series = Dependency('watched_series', is_instance_of(dict))
 
+	# episode classes are tried in the following order
+	parser = EpisodeParser(MultiEpisode, DailyEpisode, SingleEpisode)
+
+	# (multi, daily, single) classes used to build episode objects
+	episode_classes = (MultiEpisode, DailyEpisode, SingleEpisode)
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def create_episode(self, string, **kwargs):
+		(episode, error) = self.create_episodes([string], **kwargs)[0]
+		if error is not None:
+			raise error
 
-		# parse given string and extract episode attributes
-		if MultiEpisode.handle(string):
-			params = MultiEpisode.extract_from_string(string, **kwargs)
-		elif DailyEpisode.handle(string):
-			params = DailyEpisode.extract_from_string(string, **kwargs)
-		elif SingleEpisode.handle(string):
-			params = SingleEpisode.extract_from_string(string, **kwargs)
-		else:
-			raise InvalidEpisodeString("unable to identify episode type: %r" % string)
-
-		# locate series object.  If series is unknown, create new series
-		if type(params['series']) is not Series:
-			sanitized_series = Series.sanitize_series_name(params['series'])
-			if sanitized_series in self.watched_series:
-				params['series'] = self.watched_series[sanitized_series]
-			else:
-				params['series'] = Series(params['series'])
-		else:
-			sanitized_series = params['series'].sanitized_name
+		return episode
+
+	def create_episodes(self, strings, **kwargs):
+		"""
+			create episode objects for every given string.  Return list of (episode, error) tuples in the same order 
+			as strings, error is the exception raised when a string couldn't be turned into an episode (episode 
+			is None).  Given keyword arguments are used for every episode
+		"""
+		filters = self.config['tv']['filter']
+		desired_quality = self.config['tv']['library']['quality']['desired']
+		watched_series = self.watched_series
+		(multi, daily, single) = self.episode_classes
+
+		# series names are only resolved once per batch
+		series = {}
 
-		if 'quality' not in kwargs:
-			if sanitized_series in self.config['tv']['filter']:
-				params['quality'] = self.config['tv']['filter'][sanitized_series]['desired_quality']
+		episodes = []
+		for string in strings:
+			try:
+
+				# parse given string and extract episode attributes
+				parsed = self.parser.parse(string)
+				if parsed is None:
+					raise InvalidEpisodeString("unable to identify episode type: %r" % string)
+				params = self._extract_params(parsed, string, **kwargs)
+
+				# locate series object.  If series is unknown, create new series
+				name = params['series']
+				if type(name) is not Series:
+					if name not in series:
+						series[name] = resolve_series(name, watched_series)
+					params['series'] = series[name]
+				sanitized_series = params['series'].sanitized_name
+
+				if 'quality' not in kwargs:
+					if sanitized_series in filters:
+						params['quality'] = filters[sanitized_series]['desired_quality']
+					else:
+						params['quality'] = desired_quality
+
+				if 'start_episode' in params:
+					episode = multi(**params)
+				elif 'year' in params:
+					episode = daily(**params)
+				else:
+					episode = single(**params)
+			except (InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError), e:
+				episodes.append((None, e))
 			else:
-				params['quality'] = self.config['tv']['library']['quality']['desired']
+				episodes.append((episode, None))
+
+		return episodes
 
-		if 'start_episode' in params:
-			return MultiEpisode(**params)
-		elif 'year' in params:
-			return DailyEpisode(**params)
-		else:
-			return SingleEpisode(**params)
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	def _extract_params(self, parsed, string, **kwargs):
+		""" return dict of episode attributes for given ParsedTitle object """
+		return parsed.episode_class.extract_from_parse(parsed, **kwargs)
@@ -19,11 +19,14 @@ import re
 
 from mediarover.error import *
 from mediarover.episode import Episode
+from mediarover.episode.parser import ParsedTitle
 from mediarover.episode.single import SingleEpisode
 
 class MultiEpisode(Episode):
 	""" represents a single file containing multiple episodes """
 
+	__slots__ = ('_episodes', '_title', '_key', '_order')
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	__supported_patterns = (
@@ -54,6 +57,18 @@ class MultiEpisode(Episode):
 	@classmethod
 	def extract_from_string(cls, string, **kwargs):
 		""" parse given string and attempt to extract multiepisode values """
+		parsed = None
+		for pattern in cls.get_supported_patterns():
+			match = pattern.search(string)
+			if match:
+				parsed = ParsedTitle(cls, match.groupdict(), string[:match.start()])
+				break
+
+		return cls.extract_from_parse(parsed, **kwargs)
+
+	@classmethod
+	def extract_from_parse(cls, parsed, **kwargs):
+		""" extract multiepisode values from given ParsedTitle object (see EpisodeParser), or None if string wasn't recognized """
 		params = {
 			'series': None,
 			'season': None,
@@ -63,21 +78,20 @@ class MultiEpisode(Episode):
 			'quality':None,
 		}
 
-		for pattern in cls.get_supported_patterns():
-			match = pattern.search(string)
-			if match:
-				group = match.groupdict()
-				if 'season' in kwargs:
-					params['start_season'] = params['end_season'] = kwargs['season']
-				else:
-					params['start_season'] = group['start_season']
-					if group.get('end_season') is None:
-						params['end_season'] = params['start_season']
-					else:
-						params['end_season'] = group['end_season']
-				params['start_episode'] = group['start_episode']
-				params['end_episode'] = group['end_episode']
-				break
+		if parsed is None:
+			raise InvalidMultiEpisodeData("Unable to determine start and end of multiepisode")
+
+		group = parsed.groups
+		if 'season' in kwargs:
+			params['start_season'] = params['end_season'] = kwargs['season']
+		else:
+			params['start_season'] = group['start_season']
+			if group.get('end_season') is None:
+				params['end_season'] = params['start_season']
+			else:
+				params['end_season'] = group['end_season']
+		params['start_episode'] = group['start_episode']
+		params['end_episode'] = group['end_episode']
 
 		if params['start_season'] == params['end_season']:
 			params['season'] = params['start_season']
@@ -92,10 +106,8 @@ class MultiEpisode(Episode):
 		# if we've got a match object, try to set series 
 		if 'series' in kwargs:
 			params['series'] = kwargs['series']
-		elif match:
-			start = 0
-			end = match.start()
-			params['series'] = match.string[start:end]
+		else:
+			params['series'] = parsed.series
 
 		# finally, set the episode title
 		# NOTE: title will only be set if it was specifically provided, meaning
@@ -126,12 +138,10 @@ class MultiEpisode(Episode):
 			same episodes
 		"""
 		try:
-			if self.episodes != other.episodes: return False
+			return self._key == other._key
 		except AttributeError:
 			return False
 
-		return True
-
 	def __ne__(self, other):
 		return not self == other
 
@@ -139,8 +149,14 @@ class MultiEpisode(Episode):
 		return not self < other
 
 	def __lt__(self, other):
-		other_ep = getattr(other, 'episode', self.episodes[-1].episode)
-		return (self.season, self.episodes[-1].episode) < (other.season, other_ep)
+		# ATTENTION: daily episodes can't be ordered relative to season based episodes.  Callers rely on
+		# the AttributeError raised when comparing the two (see Series.get_newer_parts)
+		if other._key[0] == 'D':
+			raise AttributeError("unable to compare %s to daily episode" % self.__class__.__name__)
+		return self._order < other._order
+
+	def __hash__(self):
+		return hash(self._key)
 
 	def __repr__(self):
 		episodes = []
@@ -161,6 +177,10 @@ class MultiEpisode(Episode):
 	def episodes(self):
 		return self._episodes	
 
+	@property
+	def key(self):
+		return self._key
+
 	@property
 	def season(self):
 		return self.episodes[0].season
@@ -195,3 +215,9 @@ class MultiEpisode(Episode):
 		self._episodes = episodes
 		self._title = title
 
+		# precompute values used to hash, compare and order episodes.  Multipart episodes
+		# are ordered by their last part
+		first = episodes[0]
+		self._key = ('M', first.series.sanitized_name, tuple([(episode.season, episode.episode) for episode in episodes]))
+		self._order = (first.season, episodes[-1].episode)
+
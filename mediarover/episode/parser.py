@@ -0,0 +1,178 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import logging
+import re
+import time
+
+from mediarover.utils.cache import LRUCache
+
+# maximum number of parsed strings cached by each EpisodeParser
+PARSE_CACHE_SIZE = 4096
+
+# number of days a persisted parse result is kept without being used
+PARSE_CACHE_EXPIRY = 30
+
+# every EpisodeParser created, see load_parse_cache() and save_parse_cache()
+_parsers = []
+
+# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def load_parse_cache(metadata):
+	""" populate the cache of every EpisodeParser with the most recently used results persisted in the metadata store """
+	logger = logging.getLogger("mediarover.episode.parser")
+
+	results = {}
+	for parser in _parsers:
+		if parser.version not in results:
+			results[parser.version] = metadata.get_parse_results(parser.version, PARSE_CACHE_SIZE)
+		parser.restore(results[parser.version])
+
+	logger.debug("loaded %d persisted parse result(s)", sum([len(r) for r in results.values()]))
+
+def save_parse_cache(metadata):
+	""" write results parsed (and reused) by every EpisodeParser since the last save to the metadata store """
+	now = int(time.time())
+
+	results = {}
+	used = {}
+	for parser in _parsers:
+		(new, seen) = parser.flush()
+		for (title, index, groups, series) in new:
+			results[(parser.version, title)] = (parser.version, title, index, groups, series, now)
+		for title in seen:
+			used[(parser.version, title)] = (parser.version, title, now)
+
+	if len(results) or len(used):
+		for key in results:
+			used.pop(key, None)
+		metadata.update_parse_results(results.values(), used.values(), now - PARSE_CACHE_EXPIRY * 86400)
+
+# class definitions- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+class EpisodeParser(object):
+	"""
+		identify the episode type of a string and extract its values in a single pass.  The supported patterns of the 
+		given episode classes are tried in order and the first match wins, each pattern is searched at most once.  
+		This is the same result as calling handle() on each class in turn and then extract_from_string() on the first 
+		one that handles the string.
+
+		Results are cached by string in a bounded LRU cache.  Results of byte strings can be persisted across runs, 
+		see load_parse_cache() and save_parse_cache()
+	"""
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	digit_regex = re.compile("\d")
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def parse(self, string):
+		""" return ParsedTitle object for given string, or None if no episode class recognizes it """
+		parsed = self.__cache.get(string, self)
+		if parsed is self:
+			parsed = self.__parse(string)
+			self.__cache.put(string, parsed)
+			if isinstance(string, str):
+				self.__new[string] = parsed
+		elif isinstance(string, str):
+			self.__seen.add(string)
+
+		return parsed
+
+	def restore(self, results):
+		""" add given (title, class_index, groups, series) results, most recently used first, to the cache """
+		for (title, index, groups, series) in reversed(results):
+			if index is None:
+				parsed = None
+			else:
+				values = {}
+				for (key, value) in json.loads(groups).items():
+					if value is not None:
+						value = value.encode("latin-1")
+					values[str(key)] = value
+				parsed = ParsedTitle(self.__classes[index], values, series)
+			self.__cache.put(title, parsed)
+
+	def flush(self):
+		""" 
+			return (new, seen) tuple of results parsed since last flush, given as (title, class_index, groups, series) 
+			tuples, and list of titles that were read from the cache
+		"""
+		(new, self.__new) = (self.__new, {})
+		(seen, self.__seen) = (self.__seen, set())
+
+		results = []
+		for (title, parsed) in new.items():
+			if parsed is None:
+				results.append((title, None, None, None))
+			else:
+				values = {}
+				for (key, value) in parsed.groups.items():
+					if isinstance(value, str):
+						value = value.decode("latin-1")
+					values[key] = value
+				results.append((title, self.__classes.index(parsed.episode_class), json.dumps(values), parsed.series))
+
+		return (results, list(seen))
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __parse(self, string):
+
+		# every supported pattern requires a number
+		if self.digit_regex.search(string) is None:
+			return None
+
+		for (cls, search) in self.__patterns:
+			match = search(string)
+			if match:
+				return ParsedTitle(cls, match.groupdict(), string[:match.start()])
+
+		return None
+
+	def __init__(self, *classes):
+		self.__classes = list(classes)
+		self.__patterns = []
+
+		# persisted results are only valid for parsers trying the same patterns in the same order
+		version = hashlib.sha1()
+		for cls in classes:
+			version.update("%s.%s\0" % (cls.__module__, cls.__name__))
+			for pattern in cls.get_supported_patterns():
+				self.__patterns.append((cls, pattern.search))
+				version.update("%s\0%d\0" % (pattern.pattern, pattern.flags))
+		self.version = version.hexdigest()
+
+		self.__cache = LRUCache(PARSE_CACHE_SIZE)
+		self.__new = {}
+		self.__seen = set()
+
+		_parsers.append(self)
+
+class ParsedTitle(object):
+	""" result of parsing a string with EpisodeParser.  Parsed titles are cached and shared, never modify them """
+
+	__slots__ = ('episode_class', 'groups', 'series')
+
+	def __repr__(self):
+		return "%s(episode_class=%r,groups=%r,series=%r)" % (self.__class__.__name__, self.episode_class, self.groups, self.series)
+
+	def __init__(self, episode_class, groups, series):
+		self.episode_class = episode_class
+		self.groups = groups
+		self.series = series
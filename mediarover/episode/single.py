@@ -19,10 +19,13 @@ import re
 
 from mediarover.error import *
 from mediarover.episode import Episode
+from mediarover.episode.parser import ParsedTitle
 
 class SingleEpisode(Episode):
 	""" represents an episode of tv """
 
+	__slots__ = ('_series', '_season', '_episode', '_title', '_quality', '_key', '_order')
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	__supported_patterns = (
@@ -57,6 +60,18 @@ class SingleEpisode(Episode):
 				<series>.<season>[xX]<episode>
 				<series>.<year>.<day>.<month>
 		"""
+		parsed = None
+		for pattern in cls.get_supported_patterns():
+			match = pattern.search(string)
+			if match:
+				parsed = ParsedTitle(cls, match.groupdict(), string[:match.start()])
+				break
+
+		return cls.extract_from_parse(parsed, **kwargs)
+
+	@classmethod
+	def extract_from_parse(cls, parsed, **kwargs):
+		""" extract episode values from given ParsedTitle object (see EpisodeParser), or None if string wasn't recognized """
 		params = {
 			'series':None,
 			'season':None,
@@ -66,12 +81,9 @@ class SingleEpisode(Episode):
 		}
 
 		# check if given string contains season and episode numbers
-		for pattern in cls.get_supported_patterns():
-			match = pattern.search(string)
-			if match:
-				params['season'] = kwargs['season'] if 'season' in kwargs else match.group('season')
-				params['episode'] = kwargs['episode'] if 'episode' in kwargs else match.group('episode')
-				break
+		if parsed is not None:
+			params['season'] = kwargs['season'] if 'season' in kwargs else parsed.groups['season']
+			params['episode'] = kwargs['episode'] if 'episode' in kwargs else parsed.groups['episode']
 
 		# if we've got a match object, try to set series 
 		if 'series' in kwargs:
@@ -79,10 +91,8 @@ class SingleEpisode(Episode):
 
 		# grab series name and see if it's in the watched list.  If not,
 		# create a new series object
-		elif match:
-			start = 0 
-			end = match.start()
-			params['series'] = match.string[start:end]
+		elif parsed is not None:
+			params['series'] = parsed.series
 
 		# finally, set the episode title
 		# NOTE: title will only be set if it was specifically provided, meaning
@@ -123,14 +133,10 @@ class SingleEpisode(Episode):
 				b) same episode number
 		"""
 		try:
-			if self.series != other.series: return False
-			if self.season != other.season: return False
-			if self.episode != other.episode: return False
+			return self._key == other._key
 		except AttributeError:
 			return False
 
-		return True
-
 	def __ne__(self, other):
 		return not self == other
 
@@ -138,11 +144,14 @@ class SingleEpisode(Episode):
 		return not self < other
 
 	def __lt__(self, other):
-		return (self.season, self.episode) < (other.season, other.episode)
+		# ATTENTION: daily episodes can't be ordered relative to season based episodes.  Callers rely on
+		# the AttributeError raised when comparing the two (see Series.get_newer_parts)
+		if other._key[0] == 'D':
+			raise AttributeError("unable to compare %s to daily episode" % self.__class__.__name__)
+		return self._order < other._order
 
 	def __hash__(self):
-		hash = "%s %dx%02d" % (self.series.sanitized_name, self.season, self.episode)
-		return hash.__hash__()
+		return hash(self._key)
 
 	def __repr__(self):
 		return "%s(series=%r,season=%r,episode=%r,quality=%r,title=%r)" % (self.__class__.__name__,self.series,self.season,self.episode,self.quality,self.title)
@@ -156,6 +165,10 @@ class SingleEpisode(Episode):
 	def episode(self):
 		return self._episode
 
+	@property
+	def key(self):
+		return self._key
+
 	@property
 	def series(self):
 		return self._series
@@ -195,3 +208,7 @@ class SingleEpisode(Episode):
 		self._title = title
 		self._quality = quality
 
+		# precompute values used to hash, compare and order episodes
+		self._key = ('S', series.sanitized_name, self._season, self._episode)
+		self._order = (self._season, self._episode)
+
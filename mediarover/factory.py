@@ -18,6 +18,9 @@ class EpisodeFactory(object):
 	def create_episode(self, string, **kwargs):
 		raise NotImplementedError
 
+	def create_episodes(self, strings, **kwargs):
+		raise NotImplementedError
+
 class ItemFactory(object):
 
 	def create_item(self, title, url, type, priority, quality, delay, size):
@@ -27,6 +27,8 @@ from mediarover.utils.injection import is_instance_of, Dependency
 class FilesystemEpisode(Comparable):
 	""" filesystem episode """
 
+	__slots__ = ('__path', '__episode', '__size')
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	config = Dependency(CONFIG_OBJECT, is_instance_of(ConfigObj))
@@ -261,7 +263,8 @@ from mediarover.episode.single import SingleEpisode
 
 class FilesystemSingleEpisode(SingleEpisode):
 	""" filesystem single episode """
-	pass
+
+	__slots__ = ()
 
 #	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 #
@@ -295,7 +298,8 @@ from mediarover.episode.daily import DailyEpisode
 
 class FilesystemDailyEpisode(DailyEpisode):
 	""" filesystem daily episode """
-	pass
+
+	__slots__ = ()
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
@@ -303,7 +307,8 @@ from mediarover.episode.multi import MultiEpisode
 
 class FilesystemMultiEpisode(MultiEpisode):
 	""" filesystem multipart episode """
-	pass
+
+	__slots__ = ()
 
 #	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 #
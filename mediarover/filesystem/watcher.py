@@ -0,0 +1,238 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import os.path
+import struct
+
+from mediarover.config import ConfigObj
+from mediarover.constant import CONFIG_OBJECT, WATCHED_SERIES_LIST
+from mediarover.error import FilesystemError
+from mediarover.utils.injection import is_instance_of, Dependency
+
+# inotify constants, see <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+# event masks used when watching tv root and series directories
+ROOT_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+SERIES_EVENTS = IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+
+# struct inotify_event header: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct("iIII")
+
+class LibraryWatcher(object):
+	"""
+		keep the episode lists of every watched series current using the Linux inotify api.  Each tv root
+		directory and every series directory tree beneath it is watched; file events are applied to the
+		owning series as they are read.  Directories added to or removed from a tv root are not handled
+		here, instead the roots_changed flag is raised so that the caller can rebuild its series lists.
+
+		Call process_events() whenever fileno() becomes readable.
+	"""
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# declare module dependencies
+	config = Dependency(CONFIG_OBJECT, is_instance_of(ConfigObj))
+	watched_series = Dependency(WATCHED_SERIES_LIST, is_instance_of(dict))
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def fileno(self):
+		return self.__fd
+
+	def process_events(self):
+		""" read all pending events and apply them to the episode lists of the affected series """
+		logger = logging.getLogger("mediarover.filesystem.watcher")
+
+		added = {}
+		removed = {}
+		overflow = False
+		for (wd, mask, name) in self.__read_events():
+			if mask & IN_Q_OVERFLOW:
+				overflow = True
+				continue
+
+			if wd not in self.__watches:
+				continue
+
+			(dirpath, series) = self.__watches[wd]
+			if mask & IN_IGNORED:
+				self.__forget(wd)
+				continue
+
+			path = os.path.join(dirpath, name)
+			logger.debug("received event 0x%x for '%s'", mask, path)
+
+			# tv root directory, series folders have been added or removed
+			if series is None:
+				self.roots_changed = True
+				continue
+
+			if mask & IN_ISDIR:
+				if mask & (IN_CREATE | IN_MOVED_TO):
+					files = self.__watch_tree(path, series)
+					added.setdefault(series, []).extend(files)
+				elif mask & (IN_DELETE | IN_MOVED_FROM):
+					self.__unwatch_tree(path)
+					removed.setdefault(series, []).append(path)
+			elif mask & (IN_CREATE | IN_CLOSE_WRITE | IN_MOVED_TO):
+				added.setdefault(series, []).append(path)
+			elif mask & (IN_DELETE | IN_MOVED_FROM):
+				removed.setdefault(series, []).append(path)
+
+		# the kernel queue overflowed and events were lost, the only safe thing to do
+		# is rescan every series.  Directories created while events were dropped aren't 
+		# watched, flag the roots as changed so that the watcher is rebuilt
+		if overflow:
+			logger.warning("inotify event queue overflowed, marking all series episode lists as stale")
+			for series in self.__series():
+				series.mark_episode_list_stale()
+			self.roots_changed = True
+			return
+
+		for series, paths in removed.items():
+			series.remove_files(*paths)
+		for series, paths in added.items():
+			series.add_files(*paths)
+
+	def close(self):
+		if self.__fd is not None:
+			os.close(self.__fd)
+			self.__fd = None
+			self.__watches = {}
+			self.__paths = {}
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __read_events(self):
+		""" return list of (wd, mask, name) tuples for every event currently queued """
+		events = []
+		while True:
+			try:
+				data = os.read(self.__fd, 65536)
+			except OSError, (e):
+				if e.errno in (errno.EAGAIN, errno.EINTR):
+					break
+				raise
+
+			offset = 0
+			while offset < len(data):
+				(wd, mask, cookie, length) = EVENT_HEADER.unpack_from(data, offset)
+				offset += EVENT_HEADER.size
+				name = data[offset:offset + length].rstrip("\0")
+				offset += length
+				events.append((wd, mask, name))
+
+		return events
+
+	def __watch(self, path, mask, series):
+		wd = self.__libc.inotify_add_watch(self.__fd, path, mask)
+		if wd < 0:
+			error = ctypes.get_errno()
+			raise FilesystemError("unable to watch directory '%s': %s" % (path, os.strerror(error)))
+
+		self.__watches[wd] = (path, series)
+		self.__paths[path] = wd
+
+	def __watch_tree(self, root, series):
+		""" watch given directory tree and return list of files found in it """
+		logger = logging.getLogger("mediarover.filesystem.watcher")
+
+		files = []
+		for dirpath, dirnames, filenames in os.walk(root):
+			try:
+				self.__watch(dirpath, SERIES_EVENTS, series)
+			except FilesystemError, (e):
+				logger.error(e)
+				series.mark_episode_list_stale()
+			files.extend([os.path.join(dirpath, name) for name in filenames])
+
+		return files
+
+	def __unwatch_tree(self, root):
+		""" remove watches for given directory and all directories beneath it """
+		prefix = os.path.join(root, "")
+		for path in [path for path in self.__paths if path == root or path.startswith(prefix)]:
+			wd = self.__paths[path]
+			self.__libc.inotify_rm_watch(self.__fd, wd)
+			self.__forget(wd)
+
+	def __forget(self, wd):
+		(path, series) = self.__watches.pop(wd)
+		if self.__paths.get(path) == wd:
+			del self.__paths[path]
+
+	def __series(self):
+		""" return list of unique series objects being watched """
+		series = {}
+		for obj in self.watched_series.values():
+			series[id(obj)] = obj
+		return series.values()
+
+	def __init__(self):
+		logger = logging.getLogger("mediarover.filesystem.watcher")
+
+		try:
+			self.__libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+			self.__libc.inotify_add_watch
+		except (OSError, AttributeError):
+			raise FilesystemError("inotify is not supported on this platform")
+
+		if hasattr(self.__libc, "inotify_init1"):
+			fd = self.__libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		else:
+			fd = self.__libc.inotify_init()
+			if fd >= 0:
+				import fcntl
+				fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+				fcntl.fcntl(fd, fcntl.F_SETFD, fcntl.FD_CLOEXEC)
+
+		if fd < 0:
+			raise FilesystemError("unable to initialize inotify: %s" % os.strerror(ctypes.get_errno()))
+
+		self.__fd = fd
+		self.__watches = {}
+		self.__paths = {}
+		self.roots_changed = False
+
+		try:
+			for root in self.config['tv']['tv_root']:
+				self.__watch(root, ROOT_EVENTS, None)
+
+			for series in self.__series():
+				for path in series.path:
+					for dirpath, dirnames, filenames in os.walk(path):
+						self.__watch(dirpath, SERIES_EVENTS, series)
+		except:
+			self.close()
+			raise
+
+		logger.info("watching %d library directories for changes", len(self.__watches))
+
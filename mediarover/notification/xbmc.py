@@ -15,15 +15,22 @@
 
 import logging
 
-from urllib2 import urlopen, URLError
+from urllib2 import HTTPError, URLError
 
 from mediarover.error import NotificationHandlerError
 from mediarover.notification import NotificationHandler
-from mediarover.constant import SORT_SUCCESSFUL_NOTIFICATION, XBMC_NOTIFICATION
+from mediarover.constant import HTTP_CLIENT_OBJECT, SORT_SUCCESSFUL_NOTIFICATION, XBMC_NOTIFICATION
+from mediarover.utils.http import HttpClient
+from mediarover.utils.injection import is_instance_of, Dependency
 
 class XbmcNotificationHandler(NotificationHandler):
 	""" XBMC notification handler """
 
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# declare module dependencies
+	http = Dependency(HTTP_CLIENT_OBJECT, is_instance_of(HttpClient))
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def configure(self, params):
@@ -49,7 +56,9 @@ class XbmcNotificationHandler(NotificationHandler):
 		logger.debug("processing notification in XBMC handler (HTTP_API): %s" % url)
 
 		try:
-			handle = urlopen(url, None, self._params['timeout'])
+			handle = self.http.get(url, self._params['timeout'])
+		except (HTTPError), e:
+			raise NotificationHandlerError("unable to complete request: %d" % e.code)
 		except (URLError), e:
 			raise NotificationHandlerError(e.reason)
 		
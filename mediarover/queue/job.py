@@ -13,9 +13,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-class Job:
+class Job(object):
 	""" Queue job interface class """
 
+	__slots__ = ()
+
 	@property
 	def category(self):
 		""" job category from queue """
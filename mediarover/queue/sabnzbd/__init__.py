@@ -19,14 +19,15 @@ import re
 import time
 import xml.dom.minidom
 from urllib import urlencode
-from urllib2 import urlopen, HTTPError, URLError
+from urllib2 import HTTPError, URLError
 
 from mediarover.config import ConfigObj
-from mediarover.constant import CONFIG_OBJECT, METADATA_OBJECT
+from mediarover.constant import CONFIG_OBJECT, HTTP_CLIENT_OBJECT, METADATA_OBJECT
 from mediarover.ds.metadata import Metadata
 from mediarover.error import *
 from mediarover.queue import Queue
 from mediarover.queue.sabnzbd.job import SabnzbdJob
+from mediarover.utils.http import HttpClient
 from mediarover.utils.injection import Dependency, is_instance_of
 
 PRIORITY = {
@@ -42,6 +43,7 @@ class SabnzbdQueue(Queue):
 	# declare the metadata_data_source as a dependency
 	meta_ds = Dependency(METADATA_OBJECT, is_instance_of(Metadata))
 	config = Dependency(CONFIG_OBJECT, is_instance_of(ConfigObj))
+	http = Dependency(HTTP_CLIENT_OBJECT, is_instance_of(HttpClient))
 
 	# overriden methods  - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
@@ -50,15 +52,33 @@ class SabnzbdQueue(Queue):
 		logger = logging.getLogger("mediarover.queue.sabnzbd")
 
 		if self.__jobs is None:
-			self.__get_document()
+			document = self.__get_document()
 			self.__jobs = []
-			for rawJob in self.__document.getElementsByTagName("slot"):
+
+			slots = []
+			for rawJob in document.getElementsByTagName("slot"):
 				cat = rawJob.getElementsByTagName("cat")[0].childNodes[0].data.lower()
 				if cat in self._supported_categories:
-					try:
-						self.__jobs.append(SabnzbdJob(rawJob))
-					except (InvalidItemTitle), e:
-						logger.warning(e)
+					slots.append(rawJob)
+
+			# group job titles by the factory used to parse them, each factory then parses its titles at once
+			batches = {}
+			for (index, rawJob) in enumerate(slots):
+				title = rawJob.getElementsByTagName("filename")[0].childNodes[0].data
+				factory = SabnzbdJob.select_factory(title, rawJob.getElementsByTagName("msgid")[0].hasChildNodes())
+				batches.setdefault(factory, []).append((index, title))
+
+			results = [None] * len(slots)
+			for (factory, titles) in batches.items():
+				parsed = factory.create_episodes([title for (index, title) in titles])
+				for (index, title) in titles:
+					results[index] = parsed.pop(0)
+
+			for (rawJob, result) in zip(slots, results):
+				try:
+					self.__jobs.append(SabnzbdJob(rawJob, result))
+				except (InvalidItemTitle), e:
+					logger.warning(e)
 
 		# return job list to caller
 		return self.__jobs
@@ -92,7 +112,7 @@ class SabnzbdQueue(Queue):
 		url = "%s/api?%s" % (self.root, urlencode(args))
 		logger.debug("add to queue request: %s", url)
 		try:
-			handle = urlopen(url)
+			handle = self.http.get(url, self._params['timeout'])
 		except (HTTPError), e:
 			raise QueueInsertionError("unable to add item '%s' to queue: %d" % (item.title, e.code))
 		except (URLError), e:
@@ -131,7 +151,7 @@ class SabnzbdQueue(Queue):
 		url = "%s/api?%s" % (self.root, urlencode(args))
 		logger.debug("removing job from queue: %s", url)
 		try:
-			handle = urlopen(url)
+			handle = self.http.get(url, self._params['timeout'])
 		except (HTTPError), e:
 			raise QueueDeletionError("unable to remove job '%s' from queue: %d" % (job.title, e.code))
 		except (URLError), e:
@@ -223,7 +243,7 @@ class SabnzbdQueue(Queue):
 		# time to download the nzb and fully populate the queue.
 		for i in range(12):
 			try:
-				response = urlopen(url)
+				response = self.http.get(url, self._params['timeout'])
 			except (HTTPError), e:
 				raise QueueRetrievalError("unable to retrieve queue: %d" % e.code)
 			except (URLError), e:
@@ -238,13 +258,15 @@ class SabnzbdQueue(Queue):
 		else:
 			logger.warning("giving up waiting for queue to finish processing newly scheduled downloads - duplicate downloads possible!")
 
-		self.__document = xml.dom.minidom.parseString(data)
+		document = xml.dom.minidom.parseString(data)
 
 		# make sure we didn't get any errors back instead of the queue data
-		errors = self.__document.getElementsByTagName('error')
+		errors = document.getElementsByTagName('error')
 		if errors:
 			raise QueueRetrievalError("unable to retrieve queue: %s" % errors[0].childNodes[0].nodeValue)
 
+		return document
+
 	def __version_check(self):
 		""" verify that the running version of SABnzbd is at least 0.5.0 """
 
@@ -255,7 +277,7 @@ class SabnzbdQueue(Queue):
 		logger.debug("checking queue version: %s" % url)
 
 		try:
-			response = urlopen(url)
+			response = self.http.get(url, self._params['timeout'])
 		except (HTTPError), e:
 			raise UrlRetrievalError("unable to retrieve SABnzbd version: %d" % e.code)
 		except (URLError), e:
@@ -273,7 +295,6 @@ class SabnzbdQueue(Queue):
 		super(SabnzbdQueue, self).__init__(root, supported_categories, params)
 
 		self.__jobs = None
-		self.__document = None
 
 		# try to determine sabnzbd version
 		if self._params['__check_version__']:
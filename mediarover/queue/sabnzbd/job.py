@@ -23,6 +23,8 @@ from mediarover.utils.injection import is_instance_of, Dependency
 class SabnzbdJob(Job):
 	""" SABnzbd Job object """
 
+	__slots__ = ('__category', '__download', '__id', '__remaining', '__size', '__title')
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# declare module dependencies
@@ -56,25 +58,30 @@ class SabnzbdJob(Job):
 	def title(self):
 		return self.__title
 
+	@classmethod
+	def select_factory(cls, title, newzbin):
+		""" return episode factory used to parse the given job title """
+		if newzbin:
+			return cls.newzbin_factory
+
+		in_progress = cls.meta_ds.get_in_progress(title)
+		if in_progress is None:
+			return cls.episode_factory
+
+		return Dependency(in_progress['source'], is_instance_of(EpisodeFactory)).__get__()
+
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def __build_download(self):
+	def __build_download(self, newzbin, result):
 		""" parse job data and build appropriate download object """
 
-		if self.__job.getElementsByTagName("msgid")[0].hasChildNodes():
-			factory = self.newzbin_factory
-		else:
-			in_progress = self.meta_ds.get_in_progress(self.title)
-			if in_progress is None:
-				factory = self.episode_factory
-			else:
-				factory = Dependency(in_progress['source'], is_instance_of(EpisodeFactory)).__get__()
-
-		try:
-			download = factory.create_episode(self.title)
-		except (InvalidMultiEpisodeData, MissingParameterError):
+		if result is None:
+			result = self.select_factory(self.title, newzbin).create_episodes([self.title])[0]
+
+		(download, error) = result
+		if isinstance(error, (InvalidMultiEpisodeData, MissingParameterError)):
 			raise InvalidItemTitle("unable to parse job title and create Episode object: '%s'" % self.title)
-		except InvalidEpisodeString:
+		elif isinstance(error, InvalidEpisodeString):
 			raise InvalidItemTitle("unsupported job title format: '%s'" % self.title)
 
 		# try and determine job quality
@@ -84,17 +91,19 @@ class SabnzbdJob(Job):
 
 		return download
 
-	def __init__(self, job):
-
-		self.__job = job
+	def __init__(self, job, result=None):
+		""" 
+			init method expects a DOM Element object (xml.dom.Element).  Only the required values are kept.  If given, 
+			result is the (episode, error) tuple returned by create_episodes() for the job title
+		"""
 
-		self.__category = self.__job.getElementsByTagName("cat")[0].childNodes[0].data
+		self.__category = job.getElementsByTagName("cat")[0].childNodes[0].data
 		if self.__category == 'None':
 			self.__category = None
 
-		self.__id = self.__job.getElementsByTagName("nzo_id")[0].childNodes[0].data
-		self.__title = self.__job.getElementsByTagName("filename")[0].childNodes[0].data
-		self.__size = self.__job.getElementsByTagName("mb")[0].childNodes[0].data
-		self.__remaining = self.__job.getElementsByTagName("mbleft")[0].childNodes[0].data
-		self.__download = self.__build_download()
+		self.__id = job.getElementsByTagName("nzo_id")[0].childNodes[0].data
+		self.__title = job.getElementsByTagName("filename")[0].childNodes[0].data
+		self.__size = job.getElementsByTagName("mb")[0].childNodes[0].data
+		self.__remaining = job.getElementsByTagName("mbleft")[0].childNodes[0].data
+		self.__download = self.__build_download(job.getElementsByTagName("msgid")[0].hasChildNodes(), result)
 
@@ -13,20 +13,26 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 import logging
 import os
 import os.path
 import re
+import time
+from collections import OrderedDict
 
 from mediarover.config import ConfigObj
 from mediarover.constant import CONFIG_OBJECT, FILESYSTEM_FACTORY_OBJECT, METADATA_OBJECT
 from mediarover.ds.metadata import Metadata
 from mediarover.error import FilesystemError, InvalidData, InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError, TooManyParametersError
 from mediarover.factory import EpisodeFactory
-from mediarover.filesystem.episode import FilesystemEpisode
+from mediarover.filesystem.episode import FilesystemDailyEpisode, FilesystemEpisode, FilesystemMultiEpisode, FilesystemSingleEpisode
 from mediarover.utils.injection import is_instance_of, Dependency
 from mediarover.utils.quality import guess_quality_level, LOW, MEDIUM, HIGH
 
+# maximum number of series names memoized by Series.sanitize_series_name()
+SANITIZED_NAME_CACHE_SIZE = 10000
+
 class Series(object):
 	""" represents a tv series """
 
@@ -38,6 +44,14 @@ class Series(object):
 	meta_ds = Dependency(METADATA_OBJECT, is_instance_of(Metadata))
 
 	metadata_regex = re.compile("\s*\(.+?\)")
+	sanitize_regex = re.compile("[^a-z0-9]")
+
+	# memoized results of sanitize_series_name()
+	__sanitized_names = {}
+
+	# used to identify the season number of season folders
+	season_metadata_regex = re.compile("\(.+?\)$")
+	season_number_regex = re.compile("[^\d]")
 
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
@@ -89,12 +103,15 @@ class Series(object):
 		"""
 		logger = logging.getLogger("mediarover.series")
 
-		# get list of episodes that will serve as the test sample.  If a sample
-		# wasn't provided, grab the series episode list
+		# get index of episodes that will serve as the test sample.  If a sample
+		# wasn't provided, use the index of series episodes found on disk
 		if len(args) > 0:
-			sample = list(args)
+			sample = {}
+			for ep in args:
+				sample.setdefault(ep.key, ep)
 		else:
-			sample = self.episodes
+			self.__check_episode_lists()
+			sample = self.__index
 
 		# prepare a list of episodes for comparison
 		try:
@@ -102,36 +119,30 @@ class Series(object):
 		except AttributeError:
 			parts = [episode]
 		
-		series = episode.series
-		sanitized_name = series.sanitized_name
+		(managed, filtered, acceptable, desired) = episode.series.__quality_policy()
 
 		found = []
 		desirable = []
 		for ep in parts:
 			
 			# found, must compare quality before we can determine desirability
-			if ep in sample:
-				found.append((ep, sample[sample.index(ep)]))
+			current = sample.get(ep.key)
+			if current is not None:
+				found.append((ep, current))
 
 			# not found == desirable
 			else:
-				if self.config['tv']['library']['quality']['managed']:
-					if sanitized_name in self.config['tv']['filter']:
-						if ep.quality not in self.config['tv']['filter'][sanitized_name]['acceptable_quality']:
-							logger.debug("episode not of acceptable quality, skipping")
-							continue
-					elif ep.quality not in self.config['tv']['library']['quality']['acceptable']:
-						logger.debug("episode not of acceptable quality, skipping")
-						continue
+				if managed and ep.quality not in acceptable:
+					logger.debug("episode not of acceptable quality, skipping")
+					continue
 				desirable.append(ep)
 
 		# make sure episode quality is acceptable
-		if self.config['tv']['library']['quality']['managed'] and len(found) > 0:
+		if managed and len(found) > 0:
 
-			if sanitized_name in self.config['tv']['filter']:
+			if filtered:
 
-				if episode.quality in self.config['tv']['filter'][sanitized_name]['acceptable_quality']:
-					desired = self.config['tv']['filter'][sanitized_name]['desired_quality']
+				if episode.quality in acceptable:
 					given_quality = episode.quality.lower()
 					for given, current in found:
 						current_quality = current.quality.lower()
@@ -176,25 +187,23 @@ class Series(object):
 		else:
 			path = [path]
 
-		metadata_regex = re.compile("\(.+?\)$")
-		number_regex = re.compile("[^\d]")
+		# season folders of each series root are only listed once, see add_season_folder()
 		for root in path:
-			for dir in os.listdir(root):
-				if os.path.isdir(os.path.join(root, dir)):
-
-					# strip any metadata that may be appended to the end of 
-					# the season folder as it can interfer with season identification
-					clean_dir = metadata_regex.sub("", dir)
-
-					number = number_regex.sub("", clean_dir)
-					if len(number) and int(season) == int(number):
-						season_path = os.path.join(root, dir)
-						break
+			season_path = self.__season_folder_map(root).get(int(season))
 			if season_path is not None:
 				break
 		
 		return season_path
 
+	def add_season_folder(self, path):
+		""" record newly created season folder so that it is found by locate_season_folder() """
+		(root, dir) = os.path.split(path.rstrip(os.sep))
+		folders = self.__season_folders.get(root)
+		if folders is not None:
+			number = self.__season_number(dir)
+			if number is not None:
+				folders.setdefault(number, path)
+
 	def ignore(self, season):
 		""" return boolean indicating whether or not the given season number should be ignored """
 
@@ -233,6 +242,11 @@ class Series(object):
 		self.__multipart_files = []
 		self.__newest_episode = None
 		self.__oldest_episode_file = None
+		self.__index = {}
+		self.__policy = None
+		self.__records = OrderedDict()
+		self.__season_folders = {}
+		self.__signature = None
 
 	def is_episode_newer_than_current(self, episode):
 		""" determine if the given episode is newer than all existing series episodes """
@@ -275,118 +289,383 @@ class Series(object):
 			else:
 				logger.info("removing file '%s'", file.path)
 
+	def add_files(self, *paths):
+		"""
+			add (or refresh) the files at given paths to the episode lists of current series.  If the series 
+			folders haven't been scanned yet, do nothing; the files will be picked up by the initial scan
+		"""
+		# pick up season folders created outside of media rover
+		for path in paths:
+			directory = os.path.dirname(path)
+			if os.path.dirname(directory) in self.__season_folders and os.path.isdir(directory):
+				self.add_season_folder(directory)
+
+		if self.__scanned is False:
+			return
+
+		for path in paths:
+			directory = os.path.dirname(path)
+			if os.path.basename(directory).startswith('.'):
+				continue
+
+			record = self.__index_file(path, directory, self.__records.get(path))
+			if record is None:
+				self.__records.pop(path, None)
+			else:
+				self.__records[path] = record
+
+		self.__compile_episode_lists()
+
+	def remove_files(self, *paths):
+		"""
+			remove the files at given paths from the episode lists of current series.  If a path is a directory, 
+			every file found beneath it is removed
+		"""
+		# forget the season folders of any root that lost one
+		for path in paths:
+			root = os.path.dirname(path.rstrip(os.sep))
+			if path in self.__season_folders.get(root, {}).values():
+				del self.__season_folders[root]
+
+		if self.__scanned is False:
+			return
+
+		removed = []
+		for path in paths:
+			prefix = os.path.join(path, "")
+			removed.extend([file for file in self.__records if file == path or file.startswith(prefix)])
+
+		if len(removed):
+			for file in set(removed):
+				del self.__records[file]
+			self.__compile_episode_lists()
+
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	def __season_folder_map(self, root):
+		""" return dict mapping season number to season folder found in given series root """
+		folders = self.__season_folders.get(root)
+		if folders is None:
+			folders = {}
+			for dir in os.listdir(root):
+				if os.path.isdir(os.path.join(root, dir)):
+					number = self.__season_number(dir)
+					if number is not None:
+						folders.setdefault(number, os.path.join(root, dir))
+			self.__season_folders[root] = folders
+
+		return folders
+
+	def __season_number(self, dir):
+		""" return season number found in given season folder name, or None """
+
+		# strip any metadata that may be appended to the end of 
+		# the season folder as it can interfer with season identification
+		clean_dir = self.season_metadata_regex.sub("", dir)
+
+		number = self.season_number_regex.sub("", clean_dir)
+		if len(number):
+			return int(number)
+
+		return None
+
 	def __find_series_episodes(self):
-		""" return list of episode objects for current series """
+		""" scan series folders and build list of episode objects for current series """
 		logger = logging.getLogger("mediarover.series")
 		logger.info("scanning filesystem for episodes belonging to '%s'..." % self)
 
+		records = OrderedDict()
+		for root in self.path:
+			for dirpath, list in self.__scan_library(root):
+				# skip any directory that start with a '.'
+				if os.path.basename(dirpath).startswith('.'):
+					continue
+
+				for record in list:
+					records[record['path']] = record
+
+		self.__records = records
+		self.__compile_episode_lists()
+
+	def __compile_episode_lists(self):
+		""" build episode lists and index of current series using the library records found on disk """
+		logger = logging.getLogger("mediarover.series")
+
 		# duplicate episodes are appended with the date and time that 
 		# they were detected.
 		dup_regex = re.compile("\.\d{12}$")
 
 		compiled = []
+		index = {}
 		daily = []
 		single = []
 		multipart = []
 
+		self.__newest_episode = None
+		self.__oldest_episode_file = None
+
 		sanitized_name = self.sanitized_name
 		if sanitized_name in self.config['tv']['filter']:
 			desired = self.config['tv']['filter'][sanitized_name]['desired_quality']
 		else:
 			desired = self.config['tv']['library']['quality']['desired']
 
-		for root in self.path:
-			for dirpath, dirnames, filenames in os.walk(root):
-				# skip any directory that start with a '.'
-				if os.path.basename(dirpath).startswith('.'):
-					continue
+		# bulk load the quality levels recorded for this series
+		qualities = {}
+		if self.config['tv']['library']['quality']['managed']:
+			qualities = self.meta_ds.get_episode_qualities(self)
 
-				# process files and identify episodes
-				for filename in filenames:
-					# skip any files that start with a '.'
-					if filename.startswith('.'):
-						continue
+		# process files and identify episodes
+		for record in self.__records.itervalues():
+			path = record['path']
+			filename = os.path.basename(path)
 
-					(name, ext) = os.path.splitext(filename)
+			# skip any files that start with a '.'
+			if filename.startswith('.'):
+				continue
 
-					# skip duplicates when building list of episodes
-					if dup_regex.search(name):
-						continue
+			(name, ext) = os.path.splitext(filename)
 
-					ext = ext.lstrip(".")
-					if ext not in self.config['tv']['ignored_extensions']:
+			# skip duplicates when building list of episodes
+			if dup_regex.search(name):
+				continue
 
-						path = os.path.join(dirpath, filename)
-						size = os.path.getsize(path)
+			ext = ext.lstrip(".")
+			if ext not in self.config['tv']['ignored_extensions']:
 
-						# skip this file if it is less than 50 MB
-						if size < 52428800:
-							continue
+				size = record['size']
+
+				# skip this file if it is less than 50 MB
+				if size < 52428800:
+					continue
+
+				# files that weren't parsed when indexed (ie. too small or ignored at the time) or that failed
+				# to parse are parsed again here.  Unrecognized titles are answered by the parse cache
+				if record['type'] is None:
+					try:
+						self.__set_episode_values(record, self.factory.create_episode(name, series=self))
+					except (InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError), e:
+						logger.warning("skipping file, encountered error while parsing filename: %s (%s)" % (e, path))
+						continue
+
+				file = FilesystemEpisode(path, self.__build_episode(record, desired), size)
+				episode = file.episode
+				list = []
+
+				# multipart
+				if hasattr(episode, "episodes"):
+					multipart.append(file)
 
-						try:
-							file = FilesystemEpisode(
-								path,
-								self.factory.create_episode(name, series=self), 
-								size
-							)
-						except (InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError), e:
-							logger.warning("skipping file, encountered error while parsing filename: %s (%s)" % (e, path))
-							pass
+					# now look at individual parts and determine
+					# if they should be added to compiled episode list
+					list = []
+					for ep in episode.episodes:
+						if ep.key not in index:
+							list.append(ep)
+				else:
+					list.append(episode)
+					if hasattr(episode, "year"):
+						daily.append(file)
+					else:
+						single.append(file)
+			
+				# add to compiled list and index
+				compiled.extend(list)
+				for ep in list:
+					index.setdefault(ep.key, ep)
+
+				# see if we can come up with a more accurate quality level 
+				# for current file
+				if len(list) > 0 and self.config['tv']['library']['quality']['managed']:
+					quality = qualities.get(list[0].key)
+					if quality is None:
+						if self.config['tv']['library']['quality']['guess']:
+							episode.quality = guess_quality_level(self.config, file.extension, episode.quality)
 						else:
-							episode = file.episode
-							list = []
-
-							# multipart
-							if hasattr(episode, "episodes"):
-								multipart.append(file)
-
-								# now look at individual parts and determine
-								# if they should be added to compiled episode list
-								list = []
-								for ep in episode.episodes:
-									if ep not in compiled:
-										list.append(ep)
-							else:
-								list.append(episode)
-								if hasattr(episode, "year"):
-									daily.append(file)
-								else:
-									single.append(file)
-						
-							# add to compiled list
-							compiled.extend(list)
-
-							# see if we can come up with a more accurate quality level 
-							# for current file
-							if len(list) > 0 and self.config['tv']['library']['quality']['managed']:
-								record = self.meta_ds.get_episode(list[0])
-								if record is None:
-									if self.config['tv']['library']['quality']['guess']:
-										episode.quality = guess_quality_level(self.config, file.extension, episode.quality)
-									else:
-										logger.warning("quality level of '%s' unknown, defaulting to desired level of '%s'" % (episode, desired))
-								else:
-									episode.quality = record['quality']
-
-							# determine if episode is older than oldest or newer than newest
-							if self.__is_older_than_oldest(episode):
-								self.__oldest_episode_file = file
-								if self.__newest_episode is None:
-									self.__newest_episode = episode.parts().pop()
-							else:
-								newer = self.get_newer_parts(episode)
-								if len(newer) > 0:
-									self.__newest_episode = newer.pop()
-
-							logger.debug("created %r" % file)
+							logger.warning("quality level of '%s' unknown, defaulting to desired level of '%s'" % (episode, desired))
+					else:
+						episode.quality = quality
+
+				# determine if episode is older than oldest or newer than newest
+				if self.__is_older_than_oldest(episode):
+					self.__oldest_episode_file = file
+					if self.__newest_episode is None:
+						self.__newest_episode = episode.parts().pop()
+				else:
+					newer = self.get_newer_parts(episode)
+					if len(newer) > 0:
+						self.__newest_episode = newer.pop()
+
+				logger.debug("created %r" % file)
 
 		self.__scanned = True
 		self.__episodes = compiled
+		self.__index = index
 		self.__daily_files = daily
 		self.__single_files = single
 		self.__multipart_files = multipart
+		self.__signature = None
+
+	def __scan_library(self, root):
+		"""
+			return list of (directory, records) tuples for the given directory tree, where records is a list of
+			library_file values for every file found in directory.  The library index is used to skip any
+			directory whose modification time hasn't changed since it was last scanned
+		"""
+		logger = logging.getLogger("mediarover.series")
+
+		known = self.meta_ds.get_library_directories(root)
+		indexed = self.meta_ds.get_library_files(root)
+
+		children = {}
+		for path, (parent, mtime) in known.items():
+			children.setdefault(parent, []).append(path)
+
+		now = time.time()
+		scanned = []
+		updated = []
+		seen = set()
+		pending = [(root, None)]
+		while len(pending):
+			(dirpath, parent) = pending.pop()
+			try:
+				mtime = os.stat(dirpath).st_mtime
+			except OSError, (e):
+				logger.warning("unable to read directory '%s': %s" % (dirpath, e.strerror))
+				continue
+
+			seen.add(dirpath)
+
+			# directory listing hasn't changed, use values from index
+			if dirpath in known and known[dirpath][1] == mtime:
+				records = indexed.get(dirpath, [])
+				subdirs = children.get(dirpath, [])
+
+			else:
+				logger.debug("indexing directory '%s'", dirpath)
+				previous = dict([(record['path'], record) for record in indexed.get(dirpath, [])])
+				records = []
+				subdirs = []
+				for filename in os.listdir(dirpath):
+					path = os.path.join(dirpath, filename)
+
+					# don't follow symbolic links to directories
+					if os.path.isdir(path):
+						if not os.path.islink(path):
+							subdirs.append(path)
+					else:
+						record = self.__index_file(path, dirpath, previous.get(path))
+						if record is not None:
+							records.append(record)
+
+				# ATTENTION: a directory modified within the last few seconds could be modified again without
+				# its mtime changing.  Don't record its mtime so that it is scanned again next time
+				if now - mtime < 2:
+					mtime = -1
+				updated.append((dirpath, parent, mtime, records))
+
+			scanned.append((dirpath, records))
+			pending.extend([(path, dirpath) for path in subdirs])
+
+		# drop any directories that no longer exist
+		removed = [path for path in known if path not in seen]
+
+		if len(updated) or len(removed):
+			logger.debug("updating library index: %d directories scanned, %d removed", len(updated), len(removed))
+			self.meta_ds.update_library(updated, removed)
+
+		return scanned
+
+	def __index_file(self, path, directory, previous=None):
+		"""
+			stat and parse the file at given path and return dict of library_file values.  If the file hasn't changed
+			since the previous record was made, the previous values are reused.  Files that will never be considered
+			an episode (ignored extension or less than 50 MB) are recorded without being parsed.  Return None if 
+			file can't be read 
+		"""
+		logger = logging.getLogger("mediarover.series")
+
+		try:
+			stat = os.stat(path)
+		except OSError, (e):
+			logger.warning("unable to read file '%s': %s" % (path, e.strerror))
+			return None
+
+		if previous is not None and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime:
+			return dict([(key, previous[key]) for key in previous.keys()])
+
+		record = {
+			'path': path,
+			'directory': directory,
+			'size': stat.st_size,
+			'mtime': stat.st_mtime,
+			'type': None,
+			'season': None,
+			'episode': None,
+			'end_episode': None,
+			'year': None,
+			'month': None,
+			'day': None,
+		}
+
+		(name, ext) = os.path.splitext(os.path.basename(path))
+		if name.startswith('.') or ext.lstrip(".") in self.config['tv']['ignored_extensions'] or stat.st_size < 52428800:
+			return record
+
+		try:
+			episode = self.factory.create_episode(name, series=self)
+		except (InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError):
+			pass
+		else:
+			self.__set_episode_values(record, episode)
+
+		return record
+
+	def __set_episode_values(self, record, episode):
+		""" store the type and identifying values of given episode in library_file record """
+		if hasattr(episode, "episodes"):
+			record['type'] = 'M'
+			record['season'] = episode.season
+			record['episode'] = episode.episodes[0].episode
+			record['end_episode'] = episode.episodes[-1].episode
+		elif hasattr(episode, "year"):
+			record['type'] = 'D'
+			record['year'] = episode.year
+			record['month'] = episode.month
+			record['day'] = episode.day
+		else:
+			record['type'] = 'S'
+			record['season'] = episode.season
+			record['episode'] = episode.episode
+
+	def __build_episode(self, record, quality):
+		""" build episode object using the parsed values of given library_file record """
+		if record['type'] == 'M':
+			return FilesystemMultiEpisode(series=self, season=record['season'], start_episode=record['episode'],
+				end_episode=record['end_episode'], quality=quality, title=None)
+		elif record['type'] == 'D':
+			return FilesystemDailyEpisode(series=self, year=record['year'], month=record['month'], day=record['day'],
+				quality=quality, title=None)
+		else:
+			return FilesystemSingleEpisode(series=self, season=record['season'], episode=record['episode'],
+				quality=quality, title=None)
+
+	def __quality_policy(self):
+		"""
+			return (managed, filtered, acceptable, desired) tuple describing the quality preferences of current 
+			series, where filtered indicates whether or not the series has its own filter settings.  The 
+			tuple is built once and reused until the episode lists are marked stale
+		"""
+		if self.__policy is None:
+			managed = self.config['tv']['library']['quality']['managed']
+			sanitized_name = self.sanitized_name
+			if sanitized_name in self.config['tv']['filter']:
+				filters = self.config['tv']['filter'][sanitized_name]
+				self.__policy = (managed, True, filters['acceptable_quality'], filters['desired_quality'])
+			else:
+				self.__policy = (managed, False, self.config['tv']['library']['quality']['acceptable'], None)
+
+		return self.__policy
 
 	def __check_episode_lists(self):
 		if self.__scanned is False:
@@ -399,8 +678,12 @@ class Series(object):
 			result = True
 		else:
 			oldest = self.__oldest_episode_file.episode.parts()[0]
-			if oldest > episode.parts()[0]:
-				result = True
+			try:
+				if oldest > episode.parts()[0]:
+					result = True
+			except AttributeError:
+				# daily and season based episodes can't be compared
+				pass
 
 		return result
 
@@ -420,7 +703,13 @@ class Series(object):
 			return a sanitized version of given series name
 			lowercase and remove all non alpha numeric characters 
 		"""
-		return re.sub("[^a-z0-9]", "", name.lower())
+		sanitized = cls.__sanitized_names.get(name)
+		if sanitized is None:
+			if len(cls.__sanitized_names) >= SANITIZED_NAME_CACHE_SIZE:
+				cls.__sanitized_names.clear()
+			sanitized = cls.__sanitized_names[name] = cls.sanitize_regex.sub("", name.lower())
+
+		return sanitized
 
 	# property methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
@@ -454,7 +743,30 @@ class Series(object):
 
 	@property
 	def sanitized_name(self):
-		return Series.sanitize_series_name(self.name)
+		return self.__sanitized_name
+
+	@property
+	def signature(self):
+		""" 
+			digest of the series files on disk (and their quality) and the series download preferences.  Decisions made 
+			about downloading an episode of the series remain valid for as long as the signature doesn't change
+		"""
+		self.__check_episode_lists()
+		if self.__signature is None:
+			sanitized_name = self.sanitized_name
+
+			digest = hashlib.sha1()
+			digest.update(repr(self.config['tv']['library']))
+			if sanitized_name in self.config['tv']['filter']:
+				digest.update(repr(sorted(self.config['tv']['filter'][sanitized_name].items())))
+			digest.update(repr(sorted(self.ignores)))
+			for record in self.__records.itervalues():
+				digest.update("%s\0%r\0%r\0" % (record['path'], record['size'], record['mtime']))
+			for episode in self.__episodes:
+				digest.update("%r\0%s\0" % (episode.key, episode.quality))
+			self.__signature = digest.hexdigest()
+
+		return self.__signature
 
 	def _aliases_prop(self, aliases = None):
 		if aliases is not None:
@@ -467,6 +779,7 @@ class Series(object):
 	def _ignores_prop(self, ignores = None):
 		if ignores is not None:
 			self.__ignores = [int(i) for i in ignores]
+			self.__signature = None
 		return self.__ignores
 
 	def _path_prop(self, path = None):
@@ -490,13 +803,19 @@ class Series(object):
 	ignores = property(fget=_ignores_prop, fset=_ignores_prop, doc="season ignore list")
 	path = property(fget=_path_prop, fset=_path_prop, doc="series filesystem path")
 
-	def __init__(self, name, path = [], ignores = [], aliases = []):
+	def __init__(self, name, path = None, ignores = [], aliases = []):
 
 		# clean up given series name
 		name = name.rstrip(" .-")
 
+		# ATTENTION: new series folders are appended to the path list, never share it
+		# between series objects
+		if path is None:
+			path = []
+
 		# instance variables
 		self.__name = name
+		self.__sanitized_name = Series.sanitize_series_name(name)
 		self.aliases = aliases
 		self.path = path
 
@@ -552,45 +871,254 @@ def build_series_lists(config, process_aliases=True):
 				# new series, create new Series object and add to the watched list
 				else:
 					series = Series(name, path=dir)
-					additions = dict({sanitized_name: series})
-
-					# locate and process any filters for current series.  If no user defined filters for 
-					# current series exist, build dict using default values
-					if sanitized_name not in config['tv']['filter']:
-						config['tv']['filter'][sanitized_name] = build_series_filters(config)
-
-					# incorporate any .ignore file settings
-					locate_and_process_ignore(config['tv']['filter'][sanitized_name], dir)
+					additions = _configure_series(config, series, sanitized_name, dir, watched_list, process_aliases)
 
 					# check filters to see if user wants this series skipped...
-					if config['tv']['filter'][sanitized_name]["ignore_series"]:
+					if additions is None:
 						skip_list[sanitized_name] = series
-						logger.debug("found ignore_series flag, ignoring series: %s", series.name)
 						continue
 
-					# set season ignore list for current series
-					if len(config['tv']['filter'][sanitized_name]['ignore_season']):
-						logger.debug("ignoring the following seasons of %s: %s", series.name, config['tv']['filter'][sanitized_name]['ignore_season'])
-						series.ignores = config['tv']['filter'][sanitized_name]['ignore_season']
-
-					# process series aliases.  For each new alias, register series in watched_list
-					if process_aliases:
-						count = 0
-						for alias in config['tv']['filter'][sanitized_name]['series_alias']:
-							sanitized_alias = Series.sanitize_series_name(alias)
-							if sanitized_alias in watched_list:
-								logger.warning("duplicate series alias found for '%s'! Duplicate aliases can/will result in incorrect downloads and improper sorting! You've been warned..." % series)
-							additions[sanitized_alias] = series
-							count += 1
-						if count:
-							logger.debug("%d alias(es) identified for series '%s'" % (count, series))
-
-					# finally, add additions to watched list
-					if config['tv']['filter'][sanitized_name]['archive']:
-						logger.debug("watching archived series: %s", series)
-					else:
-						logger.debug("watching series: %s", series)
 					watched_list.update(additions)
 	
 	return watched_list, skip_list
 
+
+def resolve_series(name, watched_series):
+	"""
+		return the Series object for given raw series name or alias.  Watched series are found in the given dict of
+		watched series, any other series is created once and reused by later calls for the same raw name
+	"""
+	series = watched_series.get(Series.sanitize_series_name(name))
+	if series is None:
+
+		# ATTENTION: unwatched series are keyed by raw name, the name of the series object is 
+		# used when building new series folders (see episode-sort)
+		series = _unknown_series.get(name)
+		if series is None:
+			if len(_unknown_series) >= SANITIZED_NAME_CACHE_SIZE:
+				_unknown_series.clear()
+			series = _unknown_series[name] = Series(name)
+
+	return series
+
+# series created by resolve_series() that aren't being watched, keyed by raw name
+_unknown_series = {}
+
+class SeriesMatcher(object):
+	"""
+		reject strings that can't belong to a watched series without parsing them.  The sanitized names and aliases of 
+		all watched series are stored in a character trie.  Sanitizing a string only removes characters, so a string can 
+		only belong to a watched series when its sanitized form starts with the sanitized series name
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def build(self, watched_series):
+		""" (re)build trie using the keys of given dict of watched series """
+		root = {}
+		for name in watched_series:
+			node = root
+			for char in name:
+				node = node.setdefault(char, {})
+			node[None] = True
+
+		self.__root = root
+
+	def match(self, string):
+		""" return True if given string may belong to a watched series.  Everything matches until build() is called """
+		node = self.__root
+		if node is None or None in node:
+			return True
+
+		for char in Series.sanitize_regex.sub("", string.lower()):
+			node = node.get(char)
+			if node is None:
+				return False
+			elif None in node:
+				return True
+
+		return False
+
+	def __init__(self, watched_series=None):
+		self.__root = None
+		if watched_series is not None:
+			self.build(watched_series)
+
+def lazy_series_lists(config):
+	"""
+		return (watched, ignored) tuple of series dictionaries, like build_series_lists().  Rather than scanning 
+		every tv root up front, series are looked up the first time they are requested using an index of series
+		directories kept in the metadata data store.  The index is only rebuilt for tv roots that have changed
+	"""
+	return SeriesLookup(config).lists()
+
+class SeriesLookup(object):
+	""" resolve series names to Series objects using the series directory index """
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# declare module dependencies
+	meta_ds = Dependency(METADATA_OBJECT, is_instance_of(Metadata))
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def lists(self):
+		return (self.__watched, self.__ignored)
+
+	def resolve(self, sanitized_name):
+		""" look up given series name (or alias) and register the series with the watched or ignored list """
+		if sanitized_name in self.__resolved:
+			return
+		self.__resolved.add(sanitized_name)
+
+		logger = logging.getLogger("mediarover.series")
+
+		self.__check_index()
+
+		# map series alias to the series it belongs to
+		if self.__aliases is None:
+			self.__aliases = {}
+			for name, filters in self.__config['tv']['filter'].items():
+				for alias in filters['series_alias']:
+					self.__aliases.setdefault(Series.sanitize_series_name(alias), name)
+		target = self.__aliases.get(sanitized_name, sanitized_name)
+		if target != sanitized_name:
+			if target in self.__resolved:
+				return
+			self.__resolved.add(target)
+
+		directories = self.meta_ds.get_series_directories(target)
+		if len(directories) == 0:
+			return
+
+		(dir, root, name) = directories[0]
+		series = Series(name, path=[directory[0] for directory in directories])
+		logger.debug("resolved series '%s' to %r", sanitized_name, series.path)
+
+		additions = _configure_series(self.__config, series, target, dir, self.__watched)
+		if additions is None:
+			dict.__setitem__(self.__ignored, target, series)
+			self.__resolved.add(target)
+		else:
+			for name in additions:
+				dict.__setitem__(self.__watched, name, series)
+				self.__resolved.add(name)
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __check_index(self):
+		""" rebuild index of series directories for every tv root that has changed since it was last indexed """
+		if self.__checked:
+			return
+		self.__checked = True
+
+		logger = logging.getLogger("mediarover.series")
+
+		now = time.time()
+		for root in self.__config['tv']['tv_root']:
+
+			# first things first, check that tv root directory exists and that we
+			# have read access to it
+			if not os.access(root, os.F_OK):
+				raise FilesystemError("TV root rootectory (%s) does not exist!", root)
+			if not os.access(root, os.R_OK):
+				raise FilesystemError("Missing read access to tv root directory (%s)", root)
+
+			mtime = os.stat(root).st_mtime
+			if mtime == self.meta_ds.get_tv_root_mtime(root):
+				continue
+
+			logger.info("indexing series directories in tv directory: %s", root)
+			directories = []
+			for name in os.listdir(root):
+
+				# skip hidden directories
+				if name.startswith("."):
+					continue
+
+				dir = os.path.join(root, name)
+				if os.path.isdir(dir):
+					directories.append((dir, name, Series.sanitize_series_name(name)))
+
+			# ATTENTION: a directory modified within the last few seconds could be modified again without
+			# its mtime changing.  Don't record its mtime so that it is indexed again next time
+			if now - mtime < 2:
+				mtime = -1
+			self.meta_ds.update_tv_root(root, mtime, directories)
+
+	def __init__(self, config):
+		self.__config = config
+		self.__checked = False
+		self.__aliases = None
+		self.__resolved = set()
+		self.__watched = LazySeriesList(self)
+		self.__ignored = LazySeriesList(self)
+
+class LazySeriesList(dict):
+	""" series dictionary that resolves missing series on demand using a SeriesLookup object """
+
+	def get(self, key, default=None):
+		self.__lookup.resolve(key)
+		return dict.get(self, key, default)
+
+	def __contains__(self, key):
+		self.__lookup.resolve(key)
+		return dict.__contains__(self, key)
+
+	def __missing__(self, key):
+		self.__lookup.resolve(key)
+		if dict.__contains__(self, key):
+			return dict.__getitem__(self, key)
+		raise KeyError(key)
+
+	def __init__(self, lookup):
+		dict.__init__(self)
+		self.__lookup = lookup
+
+def _configure_series(config, series, sanitized_name, dir, watched_list, process_aliases=True):
+	"""
+		apply user defined filters and any .ignore file settings found in dir to given series.  Return None if the
+		user wants the series skipped, otherwise return dict of names (sanitized series name and aliases) that the
+		series should be registered under
+	"""
+	logger = logging.getLogger("mediarover.series")
+
+	additions = dict({sanitized_name: series})
+
+	# locate and process any filters for current series.  If no user defined filters for 
+	# current series exist, build dict using default values
+	if sanitized_name not in config['tv']['filter']:
+		config['tv']['filter'][sanitized_name] = build_series_filters(config)
+
+	# incorporate any .ignore file settings
+	locate_and_process_ignore(config['tv']['filter'][sanitized_name], dir)
+
+	# check filters to see if user wants this series skipped...
+	if config['tv']['filter'][sanitized_name]["ignore_series"]:
+		logger.debug("found ignore_series flag, ignoring series: %s", series.name)
+		return None
+
+	# set season ignore list for current series
+	if len(config['tv']['filter'][sanitized_name]['ignore_season']):
+		logger.debug("ignoring the following seasons of %s: %s", series.name, config['tv']['filter'][sanitized_name]['ignore_season'])
+		series.ignores = config['tv']['filter'][sanitized_name]['ignore_season']
+
+	# process series aliases.  For each new alias, register series in watched_list
+	if process_aliases:
+		count = 0
+		for alias in config['tv']['filter'][sanitized_name]['series_alias']:
+			sanitized_alias = Series.sanitize_series_name(alias)
+			if dict.__contains__(watched_list, sanitized_alias):
+				logger.warning("duplicate series alias found for '%s'! Duplicate aliases can/will result in incorrect downloads and improper sorting! You've been warned..." % series)
+			additions[sanitized_alias] = series
+			count += 1
+		if count:
+			logger.debug("%d alias(es) identified for series '%s'" % (count, series))
+
+	# finally, add additions to watched list
+	if config['tv']['filter'][sanitized_name]['archive']:
+		logger.debug("watching archived series: %s", series)
+	else:
+		logger.debug("watching series: %s", series)
+
+	return additions
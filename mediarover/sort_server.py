@@ -0,0 +1,188 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import errno
+import json
+import logging
+import os
+import socket
+
+from mediarover.error import FilesystemError
+
+# maximum size (in bytes) of a single request or response
+MAX_MESSAGE_SIZE = 65536
+
+# number of seconds a client is given to send its request (or read the response) before it is dropped
+REQUEST_TIMEOUT = 30
+
+# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def read_message(sock):
+	""" read a single newline terminated message from given socket.  Return None if connection was closed """
+	data = ""
+	while not data.endswith("\n"):
+		chunk = sock.recv(4096)
+		if not chunk:
+			return None
+		data += chunk
+		if len(data) > MAX_MESSAGE_SIZE:
+			raise socket.error("message too large")
+
+	return data
+
+def request_sort(path, args, dry_run, batch=False):
+	"""
+		hand the given episode-sort arguments to the sort server listening at path and wait for it to
+		finish.  Return (status, message) tuple reported by the server, or None if no server is listening
+	"""
+	if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+		return None
+
+	try:
+		request = json.dumps({'args': args, 'dry_run': dry_run, 'batch': batch})
+	except UnicodeDecodeError:
+		return None
+
+	sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	try:
+		try:
+			sock.connect(path)
+		except socket.error:
+			return None
+
+		# from here on the server may have started sorting, never fall back to
+		# sorting in process as the download could be sorted twice
+		try:
+			sock.sendall(request + "\n")
+			response = read_message(sock)
+		except socket.error, (e):
+			return (1, "FAILURE: lost connection to sort server: %s" % e)
+
+		if response is None:
+			return (1, "FAILURE: lost connection to sort server!")
+
+		response = json.loads(response)
+		return (response['status'], response['message'].encode("utf-8"))
+	finally:
+		sock.close()
+
+# class definitions- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+class SortServer(object):
+	"""
+		accept episode-sort requests made by request_sort() over a Unix domain socket.  Each request is
+		handed to the given handler, a callable that accepts (args, dry_run, batch) and returns a (status, message)
+		tuple which is sent back to the client.
+
+		Requests are handled one at a time by calling process_request() whenever fileno() becomes readable
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def fileno(self):
+		return self.__sock.fileno()
+
+	def process_request(self):
+		""" accept a pending connection and process its request """
+		logger = logging.getLogger("mediarover.sort_server")
+
+		try:
+			(conn, address) = self.__sock.accept()
+		except socket.error, (e):
+			if e.args[0] in (errno.EAGAIN, errno.EINTR):
+				return
+			raise
+
+		try:
+			conn.settimeout(REQUEST_TIMEOUT)
+			try:
+				request = read_message(conn)
+				if request is None:
+					return
+				request = json.loads(request)
+				args = [arg.encode("utf-8") for arg in request['args']]
+			except (socket.error, ValueError, KeyError, AttributeError), e:
+				logger.warning("ignoring invalid sort request: %s", e)
+				return
+
+			logger.info("received sort request: %s", " ".join(map(lambda x: "'" + x + "'", args)))
+			try:
+				(status, message) = self.__handler(args, bool(request.get('dry_run', False)), bool(request.get('batch', False)))
+			except Exception, e:
+				# an error sorting one request must not take down the process serving it
+				logger.exception(e)
+				(status, message) = (1, "FAILURE: %s" % e)
+
+			# messages may name paths that aren't valid utf-8
+			if isinstance(message, str):
+				message = message.decode("utf-8", "replace")
+
+			try:
+				conn.sendall(json.dumps({'status': status, 'message': message}) + "\n")
+			except socket.error, (e):
+				logger.warning("unable to report sort result to client: %s", e)
+		finally:
+			conn.close()
+
+	def close(self):
+		if self.__sock is not None:
+			self.__sock.close()
+			self.__sock = None
+			try:
+				os.unlink(self.__path)
+			except OSError:
+				pass
+
+	def __init__(self, path, handler):
+		logger = logging.getLogger("mediarover.sort_server")
+
+		if not hasattr(socket, "AF_UNIX"):
+			raise FilesystemError("unix domain sockets are not supported on this platform")
+
+		# remove socket left behind by a server that didn't shut down cleanly.  If
+		# another server is still listening, leave it alone
+		if os.path.exists(path):
+			probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			try:
+				try:
+					probe.connect(path)
+				except socket.error:
+					os.unlink(path)
+				else:
+					raise FilesystemError("sort server already listening at '%s'" % path)
+			finally:
+				probe.close()
+
+		self.__sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+		# only the current user is allowed to connect
+		umask = os.umask(0077)
+		try:
+			try:
+				self.__sock.bind(path)
+			except socket.error, (e):
+				self.__sock.close()
+				raise FilesystemError("unable to create sort server socket '%s': %s" % (path, e))
+		finally:
+			os.umask(umask)
+
+		self.__sock.listen(16)
+		self.__sock.setblocking(0)
+
+		self.__path = path
+		self.__handler = handler
+
+		logger.info("listening for sort requests at '%s'", path)
+
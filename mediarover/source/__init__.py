@@ -47,15 +47,25 @@ class Source(object):
 
 import logging
 import re
-import socket
-import xml.dom.minidom
-from urllib2 import urlopen, HTTPError, URLError
-from xml.parsers.expat import ExpatError
+from urllib2 import HTTPError, URLError
 
+from mediarover.constant import FEED_CACHE_OBJECT, HTTP_CLIENT_OBJECT, SERIES_MATCHER_OBJECT
+from mediarover.ds.feed_cache import FeedCache
 from mediarover.error import InvalidRemoteData, UrlRetrievalError
+from mediarover.series import SeriesMatcher
+from mediarover.source.feed import iter_items
+from mediarover.utils.http import HttpClient
+from mediarover.utils.injection import is_instance_of, Dependency
 
 class AbstractXmlSource(Source):
 	""" NZB abstract source class """
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# declare module dependencies
+	http = Dependency(HTTP_CLIENT_OBJECT, is_instance_of(HttpClient))
+	feed_cache = Dependency(FEED_CACHE_OBJECT, is_instance_of(FeedCache))
+	series_matcher = Dependency(SERIES_MATCHER_OBJECT, is_instance_of(SeriesMatcher))
 	
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 	def name(self):
@@ -79,34 +89,81 @@ class AbstractXmlSource(Source):
 	def delay(self):
 		return self._delay
 
+	def modified(self):
+		""" return False if remote document hasn't changed since the last successful run """
+		return self._modified
+
+	def validators(self):
+		""" return (etag, last_modified) tuple returned by the source url along with the current document """
+		return self._validators
+
 	# private methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def _get_document(self):
+	def _build_record(self, fields):
+		"""
+			convert given item fields (as returned by mediarover.source.feed.iter_items) to a FeedRecord
+			object.  Return None if item should be skipped
+		"""
+		raise NotImplementedError
+
+	def _get_records(self):
+		""" retrieve remote document and return list of FeedRecord objects """
 		logger = logging.getLogger("mediarover.source")
 
-		# update socket timeout to reflect source value
-		current_timeout = socket.getdefaulttimeout()
-		socket.setdefaulttimeout(self.timeout())
+		# make request conditional using the validators returned by the
+		# last successful request for the same url
+		headers = {}
+		(etag, last_modified) = self.feed_cache.get_validators(self.url())
+		if etag is not None:
+			headers['If-None-Match'] = etag
+		if last_modified is not None:
+			headers['If-Modified-Since'] = last_modified
 
 		# attempt to retrieve data at source url
+		# NOTE: sources are retrieved concurrently, use a per request timeout rather
+		# than changing the default socket timeout for the whole process
 		try:
-			url = urlopen(self.url())
+			url = self.http.get(self.url(), self.timeout(), headers, stream=True)
 		except (HTTPError), e:
 			raise UrlRetrievalError("unable to complete request: %d" % e.code)
 		except (URLError), e:
 			raise UrlRetrievalError("unable to retrieve source url: %s" % e.reason)
 
-		# parse xml response data and build DOM
-		# trap any expat errors
+		# remote document hasn't changed, nothing to parse
+		if url.status == 304:
+			logger.debug("source '%s' not modified since last run", self.name())
+			self._modified = False
+			return []
+
+		# incrementally parse xml response data as it is received, building a record 
+		# for each item as it is read.  Items that can't belong to a watched series are
+		# dropped before their titles are parsed.  Trap any parse errors
+		records = []
+		skipped = 0
 		try:
-			document = xml.dom.minidom.parse(url)
-		except ExpatError, (e):
+			for fields in iter_items(url):
+				record = self._build_record(fields)
+				if record is not None:
+					if self.series_matcher.match(record.title):
+						records.append(record)
+					else:
+						skipped += 1
+		except SyntaxError, (e):
 			raise InvalidRemoteData(e)
+		except (URLError), e:
+			raise UrlRetrievalError("unable to retrieve source url: %s" % e.reason)
+		finally:
+			url.close()
+
+		if skipped:
+			logger.debug("skipping %d item(s) from source '%s', not watching series", skipped, self.name())
 
-		# reset socket timeout value to default
-		socket.setdefaulttimeout(current_timeout)
+		# document is valid, keep new validators.  They are handed to the feed cache by
+		# the caller once it has accepted this source (see mediarover.command.schedule)
+		self._validators = (url.headers.get('etag'), url.headers.get('last-modified'))
 
-		return document
+		self._modified = True
+		return records
 
 	def __init__(self, name, url, type, priority, timeout, quality, delay):
 		""" validate given url and verify that it is a valid url (syntactically) """
@@ -117,6 +174,7 @@ class AbstractXmlSource(Source):
 		self._type = type
 		self._quality = quality
 		self._delay = delay
+		self._validators = (None, None)
 
 		if url in ("", None):
 			raise InvalidURL("empty url")
@@ -126,5 +184,5 @@ class AbstractXmlSource(Source):
 			self._url = url
 
 		# call the given url and retrieve remote document
-		self._document = self._get_document()
+		self._records = self._get_records()
 
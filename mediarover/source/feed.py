@@ -0,0 +1,80 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+try:
+	from xml.etree import cElementTree as ElementTree
+except ImportError:
+	from xml.etree import ElementTree
+
+# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def iter_items(stream):
+	"""
+		incrementally parse the RSS document read from given file like object and yield a dict for
+		every <item> element found.  Each dict maps the tag name of an item child element to a
+		(text, attributes) tuple.  Namespaced tags are named using the prefix declared in the
+		document, ie. 'report:size'.
+
+		Item elements are discarded as soon as they have been processed, so only a single item is
+		held in memory at any given time.
+	"""
+	prefixes = {}
+	stack = []
+	for (event, elem) in ElementTree.iterparse(stream, events=("start-ns", "start", "end")):
+		if event == "start-ns":
+			(prefix, uri) = elem
+			prefixes[uri] = prefix
+		elif event == "start":
+			stack.append(elem)
+		else:
+			stack.pop()
+			if __tag_name(elem.tag, prefixes) == "item":
+				fields = {}
+				for child in elem:
+					name = __tag_name(child.tag, prefixes)
+					if name not in fields:
+						fields[name] = ((child.text or "").strip(), dict(child.attrib))
+				yield fields
+
+				# done with current item, release it
+				elem.clear()
+				if stack:
+					stack[-1].remove(elem)
+
+# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def __tag_name(tag, prefixes):
+	""" convert ElementTree '{uri}local' tag name to 'prefix:local' """
+	if tag[0] == "{":
+		(uri, local) = tag[1:].split("}", 1)
+		prefix = prefixes.get(uri)
+		if prefix:
+			return "%s:%s" % (prefix, local)
+		return local
+	return tag
+
+# class definitions- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+class FeedRecord(object):
+	""" lightweight representation of a single feed item """
+
+	__slots__ = ('title', 'url', 'size', 'category')
+
+	def __init__(self, title, url, size=0, category=None):
+		self.title = title
+		self.url = url
+		self.size = size
+		self.category = category
+
@@ -18,6 +18,8 @@ from mediarover.comparable import Comparable
 class Item(Comparable):
 	""" Source item interface class """
 
+	__slots__ = ()
+
 	# property methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	@property
@@ -64,16 +66,22 @@ from mediarover.error import InvalidEpisodeString, InvalidItemTitle, InvalidMult
 class AbstractItem(Item):
 	""" Abstract source item class """
 
+	__slots__ = ('_type', '_priority', '_quality', '_size', '_title', '_url', '_download')
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def build_download(self):
-		""" use item data to build appropriate download object """
+	def build_download(self, result=None):
+		""" 
+			use item data to build appropriate download object.  If given, result is the (episode, error) tuple 
+			returned by the item factory's create_episodes() for the item title
+		"""
+		if result is None:
+			result = self.factory.create_episodes([self.title], quality=self.quality)[0]
 
-		try:
-			download = self.factory.create_episode(self.title, quality=self.quality)
-		except (InvalidMultiEpisodeData, MissingParameterError):
+		(download, error) = result
+		if isinstance(error, (InvalidMultiEpisodeData, MissingParameterError)):
 			raise InvalidItemTitle("unable to parse item title and create Episode object: %s" % self.title)
-		except InvalidEpisodeString:
+		elif isinstance(error, InvalidEpisodeString):
 			raise InvalidItemTitle("unsupported item title format: %s" % self.title)
 		else:
 			return download
@@ -17,6 +17,7 @@ import logging
 
 from mediarover.error import InvalidItemTitle, UnsupportedCategory
 from mediarover.source import AbstractXmlSource
+from mediarover.source.feed import FeedRecord
 from mediarover.source.newzbin.item import NewzbinItem
 
 class NewzbinSource(AbstractXmlSource):
@@ -27,26 +28,44 @@ class NewzbinSource(AbstractXmlSource):
 	def items(self):
 		""" return list of Item objects """
 		logger = logging.getLogger("mediarover.source.newzbin")
-		
-		# if item list hasn't been constructed yet, parse document tree
-		# and build list of available items.
+
+		# if item list hasn't been constructed yet, build list of 
+		# available items from the records read from the remote document
 		try:
 			self.__items
 		except AttributeError:
 			self.__items = []
-			for rawItem in self._document.getElementsByTagName("item"):
-				if self.type().lower() == rawItem.getElementsByTagName("report:category")[0].childNodes[0].data.lower():
-					title = rawItem.getElementsByTagName("title")[0].childNodes[0].data
-					try:
-						item = NewzbinItem(rawItem, self.type(), self.priority(), self.quality(), self.delay())
-					except InvalidItemTitle:
-						logger.debug("skipping %r, unknown format" % title)
-					except UnsupportedCategory:
-						logger.debug("skipping %r, unsupported category type" % title)
-					else:
-						if item is not None:
-							self.__items.append(item)
+
+			# parse every title of the requested category at once
+			records = [record for record in self._records if self.type().lower() == (record.category or "").lower()]
+			results = NewzbinItem.factory.create_episodes([record.title for record in records], quality=self.quality())
+			for (record, result) in zip(records, results):
+				try:
+					item = NewzbinItem(self.type(), self.priority(), self.quality(), self.delay(), size=record.size, title=record.title, url=record.url, result=result)
+				except InvalidItemTitle:
+					logger.debug("skipping %r, unknown format" % record.title)
+				except UnsupportedCategory:
+					logger.debug("skipping %r, unsupported category type" % record.title)
+				else:
+					if item is not None:
+						self.__items.append(item)
 
 		# return item list to caller
 		return self.__items
 
+	# private methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def _build_record(self, fields):
+		(title, attrs) = fields.get("title", ("", {}))
+		if not title:
+			return None
+
+		(url, attrs) = fields.get("report:nzb", (None, {}))
+		(category, attrs) = fields.get("report:category", (None, {}))
+
+		size = 0
+		(text, attrs) = fields.get("report:size", ("", {}))
+		if text.isdigit(): # in MB
+			size = int(text) / 1024 / 1024
+
+		return FeedRecord(title, url or None, size, category)
@@ -24,6 +24,8 @@ NEWZBIN_SEPARATOR_REGEX = '[\s_]-[\s_]'
 class NewzbinSingleEpisode(SingleEpisode):
 	""" newzbin single episode """
 
+	__slots__ = ()
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -50,6 +52,8 @@ class NewzbinSingleEpisode(SingleEpisode):
 class NewzbinMultiEpisode(MultiEpisode):
 	""" newzbin multiepisode """
 
+	__slots__ = ()
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -74,6 +78,8 @@ class NewzbinMultiEpisode(MultiEpisode):
 class NewzbinDailyEpisode(DailyEpisode):
 	""" newzbin daily episode """
 
+	__slots__ = ()
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -13,61 +13,35 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from mediarover.config import ConfigObj
-from mediarover.constant import CONFIG_OBJECT, WATCHED_SERIES_LIST
 from mediarover.error import *
-from mediarover.factory import EpisodeFactory, ItemFactory, SourceFactory
-from mediarover.series import Series
+from mediarover.episode.factory import EpisodeFactory
+from mediarover.episode.parser import EpisodeParser
+from mediarover.factory import ItemFactory, SourceFactory
 from mediarover.source.newzbin import NewzbinSource
 from mediarover.source.newzbin.item import NewzbinItem
 from mediarover.source.newzbin.episode import NewzbinSingleEpisode, NewzbinMultiEpisode, NewzbinDailyEpisode
-from mediarover.utils.injection import is_instance_of, Dependency
 
 class NewzbinFactory(EpisodeFactory, ItemFactory, SourceFactory):
 
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	# declare module dependencies
-	config = Dependency(CONFIG_OBJECT, is_instance_of(ConfigObj))
-	watched_series = Dependency(WATCHED_SERIES_LIST, is_instance_of(dict))
+	# episode classes are tried in the following order
+	parser = EpisodeParser(NewzbinMultiEpisode, NewzbinSingleEpisode, NewzbinDailyEpisode)
+
+	# (multi, daily, single) classes used to build episode objects
+	episode_classes = (NewzbinMultiEpisode, NewzbinDailyEpisode, NewzbinSingleEpisode)
 
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def create_source(self, name, url, type, priority, timeout, quality, schedule_delay):
 		return NewzbinSource(name, url, type, priority, timeout, quality, schedule_delay)
 
-	def create_episode(self, string, **kwargs):
-		
-		# parse given string and extract episode attributes
-		if NewzbinMultiEpisode.handle(string):
-			params = NewzbinMultiEpisode.extract_from_string(string, **kwargs)
-		elif NewzbinSingleEpisode.handle(string):
-			params = NewzbinSingleEpisode.extract_from_string(string, **kwargs)
-		elif NewzbinDailyEpisode.handle(string):
-			params = NewzbinDailyEpisode.extract_from_string(string, **kwargs)
-		else:
-			raise InvalidEpisodeString("unable to identify episode type: %r" % string)
-	
-		# locate series object.  If series is unknown, create new series
-		sanitized_series = Series.sanitize_series_name(params['series'])
-		if sanitized_series in self.watched_series:
-			params['series'] = self.watched_series[sanitized_series]
-		else:
-			params['series'] = Series(params['series'])
-
-		if 'quality' not in kwargs:
-			if sanitized_series in self.config['tv']['filter']:
-				params['quality'] = self.config['tv']['filter'][sanitized_series]['desired_quality']
-			else:
-				params['quality'] = self.config['tv']['library']['quality']['desired']
+	def create_item(self, title, url, type, priority, quality, delay, size):
+		return NewzbinItem(type, priority, quality, delay, size=size, title=title, url=url)
 
-		if 'start_episode' in params:
-			return NewzbinMultiEpisode(**params)
-		elif 'year' in params:
-			return NewzbinDailyEpisode(**params)
-		else:
-			return NewzbinSingleEpisode(**params)
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def create_item(self, title, url, type, priority, quality, delay, size):
-		return NewzbinItem(None, type, priority, quality, delay, size=size, title=title, url=url)
+	def _extract_params(self, parsed, string, **kwargs):
 
+		# ATTENTION: newzbin reports are split into series, episode and title before values are extracted
+		return parsed.episode_class.extract_from_string(string, **kwargs)
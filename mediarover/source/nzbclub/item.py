@@ -25,6 +25,8 @@ from mediarover.utils.injection import is_instance_of, Dependency
 class NzbclubItem(AbstractItem):
 	""" wrapper object representing an unparsed report object """
 
+	__slots__ = ('__delay',)
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# declare module dependencies
@@ -48,46 +50,20 @@ class NzbclubItem(AbstractItem):
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def __init__(self, item, type, priority, quality, delay, size=0, title=None, url=None):
-		""" init method expects a DOM Element object (xml.dom.Element) """
+	def __init__(self, type, priority, quality, delay, size=0, title=None, url=None, result=None):
 
 		self._type = type
 		self._priority = priority
 		self._quality = quality
 		self.__delay = delay
-
-		if item is None:
-			self._title = title
-			self._url = url
-		else:
-			self._item = item
-
-			titles = self._item.getElementsByTagName("title")
-			if titles:
-				self._title = titles[0].childNodes[0].data
-			else:
-				self._title = title
-
-			enclosure = self._item.getElementsByTagName("enclosure")
-			if enclosure:
-				if enclosure[0].getAttribute('url') is not "":
-					index = enclosure[0].getAttribute('url').rfind("/")
-					self._url = "%s/nzb" % enclosure[0].getAttribute('url')[:index]
-				else:
-					self._url = url
-
-				if enclosure[0].getAttribute('length').isnumeric():
-					self._size = int(enclosure[0].getAttribute('length')) / 1024 / 1024
-				else:
-					self._size = size;
-			else:
-				self._size = size;
-				self._url = url
+		self._size = size
+		self._title = title
+		self._url = url
 
 		if self._title is None:
 			raise InvalidRemoteData("report does not have a title")
 		if self._url is None:
 			raise InvalidRemoteData("report does not have a url")
 
-		self._download = self.build_download()
+		self._download = self.build_download(result)
 
@@ -17,6 +17,7 @@ import logging
 
 from mediarover.error import InvalidItemTitle, InvalidRemoteData
 from mediarover.source import AbstractXmlSource
+from mediarover.source.feed import FeedRecord
 from mediarover.source.nzbindex.item import NzbindexItem
 
 class NzbindexSource(AbstractXmlSource):
@@ -28,20 +29,22 @@ class NzbindexSource(AbstractXmlSource):
 		""" return list of Item objects """
 		logger = logging.getLogger("mediarover.source.nzbindex")
 
-		# if item list hasn't been constructed yet, parse document tree 
-		# and build list of available items.
+		# if item list hasn't been constructed yet, build list of 
+		# available items from the records read from the remote document
 		try:
 			self.__items
 		except AttributeError:
 			self.__items = []
-			for rawItem in self._document.getElementsByTagName("item"):
-				title = rawItem.getElementsByTagName("title")[0].childNodes[0].data
+
+			# parse every title at once
+			results = NzbindexItem.factory.create_episodes([record.title for record in self._records], quality=self.quality())
+			for (record, result) in zip(self._records, results):
 				try:
-					item = NzbindexItem(rawItem, self.type(), self.priority(), self.quality(), self.delay())
+					item = NzbindexItem(self.type(), self.priority(), self.quality(), self.delay(), size=record.size, title=record.title, url=record.url, result=result)
 				except InvalidItemTitle:
-					logger.debug("skipping %r, unknown format" % title)
+					logger.debug("skipping %r, unknown format" % record.title)
 				except InvalidRemoteData:
-					logger.debug("skipping %r, report missing required data" % title)
+					logger.debug("skipping %r, report missing required data" % record.title)
 				else:
 					if item is not None:
 						self.__items.append(item)
@@ -49,3 +52,20 @@ class NzbindexSource(AbstractXmlSource):
 		# return item list to caller
 		return self.__items
 
+	# private methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def _build_record(self, fields):
+		(title, attrs) = fields.get("title", ("", {}))
+		if not title:
+			return None
+
+		url = None
+		size = 0
+		if "enclosure" in fields:
+			(text, attrs) = fields["enclosure"]
+			if attrs.get("url"):
+				url = attrs["url"]
+			if attrs.get("length", "").isdigit():
+				size = int(attrs["length"]) / 1024 / 1024
+
+		return FeedRecord(title, url, size)
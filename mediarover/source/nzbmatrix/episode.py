@@ -21,6 +21,8 @@ from mediarover.episode.daily import DailyEpisode
 class NzbmatrixDailyEpisode(DailyEpisode):
 	""" nzbmatrix daily episode """
 
+	__slots__ = ()
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	__supported_patterns = (
@@ -17,6 +17,7 @@ import logging
 
 from mediarover.error import InvalidItemTitle, UnsupportedCategory
 from mediarover.source import AbstractXmlSource
+from mediarover.source.feed import FeedRecord
 from mediarover.source.nzbs.item import NzbsItem
 
 class NzbsSource(AbstractXmlSource):
@@ -28,20 +29,22 @@ class NzbsSource(AbstractXmlSource):
 		""" return list of Item objects """
 		logger = logging.getLogger("mediarover.source.nzbs")
 
-		# if item list hasn't been constructed yet, parse document tree 
-		# and build list of available items.
+		# if item list hasn't been constructed yet, build list of 
+		# available items from the records read from the remote document
 		try:
 			self.__items
 		except AttributeError:
 			self.__items = []
-			for rawItem in self._document.getElementsByTagName("item"):
-				title = rawItem.getElementsByTagName("title")[0].childNodes[0].data
+
+			# parse every title at once
+			results = NzbsItem.factory.create_episodes([record.title for record in self._records], quality=self.quality())
+			for (record, result) in zip(self._records, results):
 				try:
-					item = NzbsItem(rawItem, self.type(), self.priority(), self.quality(), self.delay())
+					item = NzbsItem(self.type(), self.priority(), self.quality(), self.delay(), size=record.size, title=record.title, url=record.url, result=result)
 				except InvalidItemTitle:
-					logger.debug("skipping %r, unknown format" % title)
+					logger.debug("skipping %r, unknown format" % record.title)
 				except UnsupportedCategory:
-					logger.debug("skipping %r, unsupported category type" % title)
+					logger.debug("skipping %r, unsupported category type" % record.title)
 				else:
 					if item is not None:
 						self.__items.append(item)
@@ -49,3 +52,18 @@ class NzbsSource(AbstractXmlSource):
 		# return item list to caller
 		return self.__items
 
+	# private methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def _build_record(self, fields):
+		(title, attrs) = fields.get("title", ("", {}))
+		if not title:
+			return None
+
+		(url, attrs) = fields.get("link", (None, {}))
+
+		size = 0
+		(text, attrs) = fields.get("report:size", ("", {}))
+		if text.isdigit():
+			size = int(text) / 1024 / 1024
+
+		return FeedRecord(title, url or None, size)
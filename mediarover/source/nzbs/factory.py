@@ -28,5 +28,5 @@ class NzbsFactory(EpisodeFactory, ItemFactory, SourceFactory):
 		return NzbsSource(name, url, type, priority, timeout, quality, schedule_delay)
 
 	def create_item(self, title, url, type, priority, quality, delay, size):
-		return NzbsItem(None, type, priority, quality, delay, size=size, title=title, url=url)
+		return NzbsItem(type, priority, quality, delay, size=size, title=title, url=url)
 
@@ -25,6 +25,8 @@ from mediarover.utils.injection import is_instance_of, Dependency
 class NzbsItem(AbstractItem):
 	""" wrapper object representing an unparsed report object """
 
+	__slots__ = ('__delay',)
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# declare module dependencies
@@ -48,43 +50,20 @@ class NzbsItem(AbstractItem):
 	
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def __init__(self, item, type, priority, quality, delay, size=0, title=None, url=None):
-		""" init method expects a DOM Element object (xml.dom.Element) """
+	def __init__(self, type, priority, quality, delay, size=0, title=None, url=None, result=None):
 
 		self._type = type
 		self._priority = priority
 		self._quality = quality
 		self.__delay = delay
-
-		if item is None:
-			self._size = size
-			self._title = title
-			self._url = url
-		else:
-			self._item = item
-
-			titles = self._item.getElementsByTagName("title")
-			if titles:
-				self._title = titles[0].childNodes[0].data
-			else:
-				self._title = title
-
-			links = self._item.getElementsByTagName("link")
-			if links:
-				self._url = links[0].childNodes[0].data
-			else:
-				self._url = url
-
-			sizes = self._item.getElementsByTagName("report:size")
-			if sizes:
-				self._size = int(sizes[0].childNodes[0].data) / 1024 / 1024
-			else:
-				self._size = size
+		self._size = size
+		self._title = title
+		self._url = url
 
 		if self._title is None:
 			raise InvalidRemoteData("report does not have a title")
 		if self._url is None:
 			raise InvalidRemoteData("report does not have a url")
 
-		self._download = self.build_download()
+		self._download = self.build_download(result)
 
@@ -14,11 +14,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
+import re
 
 from mediarover.error import InvalidItemTitle, InvalidRemoteData, UnsupportedCategory
 from mediarover.source import AbstractXmlSource
+from mediarover.source.feed import FeedRecord
 from mediarover.source.nzbsrus.item import NzbsrusItem
 
+size_re = re.compile("Size (?P<size>\d+\.\d{2}) (?P<units>[GM])iB")
+
 class NzbsrusSource(AbstractXmlSource):
 	""" NZBsRus source class """
 
@@ -28,22 +32,24 @@ class NzbsrusSource(AbstractXmlSource):
 		""" return list of Item objects """
 		logger = logging.getLogger("mediarover.source.nzbsrus")
 
-		# if item list hasn't been constructed yet, parse document tree 
-		# and build list of available items.
+		# if item list hasn't been constructed yet, build list of 
+		# available items from the records read from the remote document
 		try:
 			self.__items
 		except AttributeError:
 			self.__items = []
-			for rawItem in self._document.getElementsByTagName("item"):
-				title = rawItem.getElementsByTagName("title")[0].childNodes[0].data
+
+			# parse every title at once
+			results = NzbsrusItem.factory.create_episodes([record.title for record in self._records], quality=self.quality())
+			for (record, result) in zip(self._records, results):
 				try:
-					item = NzbsrusItem(rawItem, self.type(), self.priority(), self.quality(), self.delay())
+					item = NzbsrusItem(self.type(), self.priority(), self.quality(), self.delay(), size=record.size, title=record.title, url=record.url, result=result)
 				except InvalidItemTitle:
-					logger.debug("skipping %r, unknown format" % title)
+					logger.debug("skipping %r, unknown format" % record.title)
 				except UnsupportedCategory:
-					logger.debug("skipping %r, unsupported category type" % title)
+					logger.debug("skipping %r, unsupported category type" % record.title)
 				except InvalidRemoteData:
-					logger.debug("skipping %r, report missing required data" % title)
+					logger.debug("skipping %r, report missing required data" % record.title)
 				else:
 					if item is not None:
 						self.__items.append(item)
@@ -51,3 +57,22 @@ class NzbsrusSource(AbstractXmlSource):
 		# return item list to caller
 		return self.__items
 
+	# private methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def _build_record(self, fields):
+		(title, attrs) = fields.get("title", ("", {}))
+		if not title:
+			return None
+
+		(url, attrs) = fields.get("link", (None, {}))
+
+		size = 0
+		(description, attrs) = fields.get("description", ("", {}))
+		match = size_re.match(description)
+		if match:
+			if match.group('units') == 'G':
+				size = float(match.group('size')) * 1024
+			else:
+				size = float(match.group('size'))
+
+		return FeedRecord(title, url or None, size)
@@ -22,11 +22,11 @@ from mediarover.factory import EpisodeFactory
 from mediarover.source.item import AbstractItem
 from mediarover.utils.injection import is_instance_of, Dependency
 
-size_re = re.compile("Size (?P<size>\d+\.\d{2}) (?P<units>[GM])iB")
-
 class NzbsrusItem(AbstractItem):
 	""" wrapper object representing an unparsed report object """
 
+	__slots__ = ('__delay',)
+
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# declare module dependencies
@@ -50,50 +50,20 @@ class NzbsrusItem(AbstractItem):
 	
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def __init__(self, item, type, priority, quality, delay, size=0, title=None, url=None):
-		""" init method expects a DOM Element object (xml.dom.Element) """
+	def __init__(self, type, priority, quality, delay, size=0, title=None, url=None, result=None):
 
-		self._type = type 
+		self._type = type
 		self._priority = priority
 		self._quality = quality
 		self.__delay = delay
-
-		if item is None:
-			self._size = size
-			self._title = title
-			self._url = url
-		else:
-			self._item = item
-
-			titles = self._item.getElementsByTagName("title")
-			if titles:
-				self._title = titles[0].childNodes[0].data
-			else:
-				self._title = title
-
-			links = self._item.getElementsByTagName("link")
-			if links:
-				self._url = links[0].childNodes[0].data
-			else:
-				self._url = url
-
-			description = self._item.getElementsByTagName("description")
-			if description:
-				match = size_re.match(description[0].childNodes[0].data)
-				if match:
-					if match.group('units') == 'G':
-						self._size = float(match.group('size')) * 1024
-					else:
-						self._size = float(match.group('size'))
-				else:
-					self._size = size
-			else:
-				self._size = size
+		self._size = size
+		self._title = title
+		self._url = url
 
 		if self._title is None:
 			raise InvalidRemoteData("report does not have a title")
 		if self._url is None:
 			raise InvalidRemoteData("report does not have a url")
 
-		self._download = self.build_download()
+		self._download = self.build_download(result)
 
@@ -0,0 +1,91 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+# class definitions- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+class LRUCache(object):
+	"""
+		thread safe mapping that holds at most maxsize entries, evicting the least recently used entry first.  Entries
+		are kept in a circular doubly linked list of [prev, next, key, value] links, most recently used last
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def get(self, key, default=None):
+		""" return value cached under given key (marking it as recently used), or default """
+		with self.__lock:
+			link = self.__links.get(key)
+			if link is None:
+				self.misses += 1
+				return default
+
+			# move link to the most recently used end of the list
+			(prev, next, key, value) = link
+			prev[1] = next
+			next[0] = prev
+			root = self.__root
+			last = root[0]
+			last[1] = root[0] = link
+			link[0] = last
+			link[1] = root
+
+			self.hits += 1
+			return value
+
+	def put(self, key, value):
+		""" cache given value under key, evicting the least recently used entry if the cache is full """
+		with self.__lock:
+			root = self.__root
+			links = self.__links
+			link = links.pop(key, None)
+			if link is None and len(links) >= self.maxsize:
+				# reuse the least recently used link for the new entry
+				link = root[1]
+				del links[link[2]]
+
+			if link is not None:
+				(prev, next) = link[0:2]
+				prev[1] = next
+				next[0] = prev
+			else:
+				link = [None, None, None, None]
+
+			last = root[0]
+			link[:] = [last, root, key, value]
+			last[1] = root[0] = links[key] = link
+
+	def clear(self):
+		with self.__lock:
+			self.__links.clear()
+			self.__root[:] = [self.__root, self.__root, None, None]
+
+	def __len__(self):
+		return len(self.__links)
+
+	def __contains__(self, key):
+		return key in self.__links
+
+	def __init__(self, maxsize):
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self.__lock = threading.Lock()
+		self.__links = {}
+
+		# sentinel link of the circular list
+		self.__root = []
+		self.__root[:] = [self.__root, self.__root, None, None]
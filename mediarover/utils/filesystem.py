@@ -13,42 +13,151 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import ctypes
+import ctypes.util
+import errno
 import logging
 import os.path
 import os
-import ctypes
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+try:
+	import fcntl
+except ImportError:
+	# not available on windows, files are never reflinked there
+	fcntl = None
+
+from mediarover.error import FilesystemError
+
+# ioctl request used to reflink a file on btrfs and xfs, see <linux/fs.h>
+FICLONE = 0x40049409
+
+# number of bytes copied by each copy_file_range() / sendfile() call
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# size of the buffer used when falling back to a regular copy
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+# number of seconds the free space of a device is cached for, see FreeSpace
+FREE_SPACE_TTL = 30
+
+# errors indicating that a copy method isn't supported for a given pair of files
+UNSUPPORTED_ERRORS = (errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY, errno.EBADF, errno.EPERM)
 
 # public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-def find_disk_with_space(series, tv_root, minimum_space):
+def move_file(src, dest, preserve_metadata=False):
+	"""
+		move the file at src to dest and return the name of the method used.  The following methods are
+		tried in order:
+
+		 1. rename (src and dest on the same filesystem)
+		 2. reflink (copy on write clone, btrfs and xfs)
+		 3. copy_file_range / sendfile (data is copied by the kernel)
+		 4. buffered copy
+
+		When the file is copied, its data is written to a hidden temporary file next to dest that is renamed
+		once complete.  File metadata (permissions, access and modification times) is only copied if 
+		preserve_metadata is True, a failure to do so is logged and otherwise ignored.  Raise OSError or
+		IOError if the file can't be moved
+	"""
+	logger = logging.getLogger("mediarover.utils.filesystem")
+
+	started = time.time()
+	try:
+		os.rename(src, dest)
+	except OSError, (e):
+		if e.errno != errno.EXDEV:
+			raise
+	else:
+		logger.debug("renamed '%s' to '%s'", src, dest)
+		return "rename"
+
+	(dir, name) = os.path.split(dest)
+	tmp = os.path.join(dir, ".%s.part" % name)
+
+	size = os.stat(src).st_size
+	# ATTENTION: windows opens files in text mode unless told otherwise
+	binary = getattr(os, "O_BINARY", 0)
+	fsrc = os.open(src, os.O_RDONLY | binary)
+	try:
+		fdest = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | binary, 0666)
+		try:
+			try:
+				method = __copy_data(fsrc, fdest, size)
+			finally:
+				os.close(fdest)
+
+			if preserve_metadata:
+				try:
+					shutil.copystat(src, tmp)
+				except OSError, (e):
+					logger.warning("unable to copy file metadata to '%s': %s", dest, e.strerror)
+
+			os.rename(tmp, dest)
+		except:
+			try:
+				os.unlink(tmp)
+			except OSError:
+				pass
+			raise
+	finally:
+		os.close(fsrc)
+
+	os.unlink(src)
+
+	elapsed = max(time.time() - started, 0.001)
+	logger.info("copied %.1f MB to '%s' in %.1f seconds using %s (%.1f MB/s)", size / 1048576.0, dest, elapsed, method, size / 1048576.0 / elapsed)
+
+	return method
+
+def find_disk_with_space(series, tv_root, minimum_space, cache=None):
 	""" 
 		identify a filesystem disk that has the minimum amount of free space
 
 		iterate over the given series paths and determine if there is the minimum amount of space.  
-		Failing that check all disks in tv_root.  Return None otherwise 
+		Failing that check all disks in tv_root.  Return None otherwise.  If given, free space is read 
+		from the FreeSpace cache object
 	"""
 	found = None
 
-	check = set()
-	check.update(series.path)
-	check.update(tv_root)
+	if cache is None:
+		cache = FreeSpace()
+
+	check = list(series.path)
+	check.extend([path for path in tv_root if path not in check])
 
 	# iterate over the list of unique paths and check the underlying filesystem for available space
 	for path in check:
-		if os.name == 'posix':
-			obj = os.statvfs(path)
-			if (obj.f_frsize * obj.f_bavail) >= long(minimum_space):
-				found = path
-				break
-		elif os.name == 'nt':
-			free_bytes = ctypes.c_ulonglong(0)
-			ctypes.windll.kernel32.GetDiskFreeSpaceExW(ctypes.c_wchar_p(u'%s' % path), None, None, ctypes.pointer(free_bytes))
-			if free_bytes >= long(minimum_space):
-				found = path
-				break
+		if cache.available(path) >= long(minimum_space):
+			found = path
+			break
 
 	return found
 
+def free_space(path):
+	""" return the number of bytes available to the current user on the filesystem holding given path """
+	if os.name == 'nt':
+		free_bytes = ctypes.c_ulonglong(0)
+		ctypes.windll.kernel32.GetDiskFreeSpaceExW(ctypes.c_wchar_p(u'%s' % path), None, None, ctypes.pointer(free_bytes))
+		return free_bytes.value
+	else:
+		obj = os.statvfs(path)
+		return obj.f_frsize * obj.f_bavail
+
+def device(path):
+	""" return identifier of the physical device holding given path, or None if path doesn't exist """
+	if os.name == 'nt':
+		# ATTENTION: st_dev is always 0 on windows, use the drive letter instead
+		return os.path.splitdrive(os.path.abspath(path))[0].lower() or None
+	try:
+		return os.stat(path).st_dev
+	except OSError:
+		return None
+
 def clean_path(path, extensions):
 	""" open given path and delete any files with file extension in given list. """
 
@@ -112,3 +221,258 @@ def clean_file(file, extensions):
 	else:
 		raise FilesystemError("given file '%s' does not exist", file)
 
+# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def __copy_data(fsrc, fdest, size):
+	""" copy size bytes from file descriptor fsrc to fdest and return the name of the method used """
+
+	# reflink shares data blocks between both files, nothing is copied
+	if fcntl is not None:
+		try:
+			fcntl.ioctl(fdest, FICLONE, fsrc)
+		except (IOError, OSError), (e):
+			if e.errno not in UNSUPPORTED_ERRORS:
+				raise
+		else:
+			return "reflink"
+
+	# have the kernel copy data between files without passing through user space
+	libc = __libc()
+	if libc is not None:
+		for method in ("copy_file_range", "sendfile"):
+			if not hasattr(libc, method):
+				continue
+
+			copy = getattr(libc, method)
+			copied = 0
+			while copied < size:
+				if method == "copy_file_range":
+					count = copy(fsrc, None, fdest, None, min(COPY_CHUNK_SIZE, size - copied), 0)
+				else:
+					count = copy(fdest, fsrc, None, min(COPY_CHUNK_SIZE, size - copied))
+
+				if count < 0:
+					error = ctypes.get_errno()
+					if error == errno.EINTR:
+						continue
+
+					# method isn't supported, try the next one
+					if copied == 0 and error in UNSUPPORTED_ERRORS:
+						break
+					raise OSError(error, os.strerror(error))
+
+				# source file was truncated while copying
+				elif count == 0:
+					break
+
+				copied += count
+			else:
+				return method
+
+			if copied > 0:
+				return method
+
+	# regular buffered copy
+	while True:
+		data = os.read(fsrc, COPY_BUFFER_SIZE)
+		if not data:
+			break
+		while data:
+			written = os.write(fdest, data)
+			data = data[written:]
+
+	return "copy"
+
+def __libc():
+	""" return handle to the C library with argument types declared for the kernel copy functions, or None """
+	global _libc
+	if _libc is False:
+		_libc = None
+		try:
+			libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+		except OSError:
+			pass
+		else:
+			if hasattr(libc, "copy_file_range"):
+				libc.copy_file_range.restype = ctypes.c_ssize_t
+				libc.copy_file_range.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint]
+			if hasattr(libc, "sendfile"):
+				libc.sendfile.restype = ctypes.c_ssize_t
+				libc.sendfile.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t]
+			_libc = libc
+
+	return _libc
+
+_libc = False
+
+# class definitions- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+class DiskScheduler(object):
+	"""
+		pick destination disks for newly sorted files and limit the number of concurrent writes to each
+		physical device.  Paths are grouped by device (st_dev) so that tv_root folders sharing a disk also
+		share its write limit.
+
+		Every destination returned by select() is charged with the pending write until the file has been
+		moved (see move()) or the write is cancelled (see release())
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def select(self, paths, size, preferred=()):
+		"""
+			return the first of the given paths found on the device best suited to receive a new file of
+			the given size, or None if no device has enough free space.  Devices holding one of the preferred 
+			paths are always chosen when they have room, even when busy (the write waits for a free slot, see 
+			move()).  Otherwise the device below its write limit with the fewest pending writes and the most free 
+			space wins
+		"""
+		logger = logging.getLogger("mediarover.utils.filesystem")
+
+		preferred = set([self.__space.device(path) for path in preferred])
+
+		self.__lock.acquire()
+		try:
+			best = None
+			seen = set()
+			for path in paths:
+				dev = self.__space.device(path)
+				if dev is None or dev in seen:
+					continue
+				seen.add(dev)
+
+				free = self.__space.available(path) - self.__reserved.get(dev, 0)
+				if free < size:
+					continue
+
+				load = self.__load.get(dev, 0)
+				rank = (dev not in preferred, load >= self.__max_writes, load, -free)
+				if best is None or rank < best[0]:
+					best = (rank, dev, path)
+
+			if best is None:
+				return None
+
+			(rank, dev, path) = best
+			self.__load[dev] = self.__load.get(dev, 0) + 1
+			self.__reserved[dev] = self.__reserved.get(dev, 0) + size
+			if dev not in self.__slots:
+				self.__slots[dev] = threading.Semaphore(self.__max_writes)
+			self.__paths[path] = dev
+
+			logger.debug("selected disk '%s' (%d pending write(s), %.1f MB free)", path, rank[2], -rank[3] / 1048576.0)
+			return path
+		finally:
+			self.__lock.release()
+
+	def release(self, path, size):
+		""" cancel a pending write of size bytes to the destination returned by select() """
+		self.__lock.acquire()
+		try:
+			dev = self.__paths[path]
+			self.__load[dev] -= 1
+			self.__reserved[dev] -= size
+		finally:
+			self.__lock.release()
+
+	def move(self, src, dest, path, size, preserve_metadata=False):
+		"""
+			move src to dest once the device of path (as returned by select()) is below its write limit.  Return
+			the name of the method used, see move_file()
+		"""
+		slot = self.__slots[self.__paths[path]]
+		slot.acquire()
+		try:
+			method = move_file(src, dest, preserve_metadata)
+		finally:
+			slot.release()
+			self.release(path, size)
+
+		# a file renamed within its filesystem doesn't take up any additional space
+		if method != "rename":
+			self.__space.consume(path, size)
+
+		return method
+
+	def schedule(self, writes):
+		"""
+			return the given list of (path, item) tuples reordered so that consecutive items target different devices,
+			followed by the number of workers needed to keep every device busy
+		"""
+		queues = OrderedDict()
+		for (path, item) in writes:
+			queues.setdefault(self.__paths[path], []).append(item)
+
+		workers = sum([min(len(items), self.__max_writes) for items in queues.values()])
+
+		ordered = []
+		while len(queues):
+			for dev, items in queues.items():
+				ordered.append(items.pop(0))
+				if len(items) == 0:
+					del queues[dev]
+
+		return (ordered, workers)
+
+	def __init__(self, max_writes=1, space=None):
+		self.__max_writes = max_writes
+		self.__space = space or FreeSpace()
+		self.__lock = threading.Lock()
+		self.__load = {}
+		self.__reserved = {}
+		self.__slots = {}
+		self.__paths = {}
+
+class FreeSpace(object):
+	"""
+		report the free space of the filesystems holding given paths.  Paths are mapped to their device once and
+		free space is cached per device for ttl seconds.  Files written in the meantime must be reported with 
+		consume() so that the cached figures don't overcommit a device
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def device(self, path):
+		""" return identifier of the device holding given path, or None if path doesn't exist """
+		dev = self.__devices.get(path)
+		if dev is None:
+			dev = device(path)
+			if dev is not None:
+				self.__devices[path] = dev
+
+		return dev
+
+	def available(self, path):
+		""" return number of bytes available on the device holding given path """
+		dev = self.device(path)
+		if dev is None:
+			return 0
+
+		self.__lock.acquire()
+		try:
+			cached = self.__free.get(dev)
+			if cached is None or time.time() - cached[1] >= self.__ttl:
+				cached = (free_space(path), time.time())
+				self.__free[dev] = cached
+
+			return cached[0]
+		finally:
+			self.__lock.release()
+
+	def consume(self, path, size):
+		""" subtract size bytes from the cached free space of the device holding given path """
+		dev = self.device(path)
+
+		self.__lock.acquire()
+		try:
+			if dev in self.__free:
+				(free, stamp) = self.__free[dev]
+				self.__free[dev] = (free - size, stamp)
+		finally:
+			self.__lock.release()
+
+	def __init__(self, ttl=FREE_SPACE_TTL):
+		self.__ttl = ttl
+		self.__lock = threading.Lock()
+		self.__devices = {}
+		self.__free = {}
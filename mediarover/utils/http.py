@@ -0,0 +1,355 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import base64
+import httplib
+import logging
+import socket
+import threading
+import urllib
+import urlparse
+import zlib
+from cStringIO import StringIO
+from urllib2 import HTTPError, URLError
+
+from mediarover.version import __app_version__
+
+# maximum number of redirects followed for a single request
+MAX_REDIRECTS = 5
+
+# maximum number of idle connections kept open for each host
+MAX_IDLE_CONNECTIONS = 4
+
+# number of bytes read from the connection at a time when streaming a response body
+STREAM_READ_SIZE = 16384
+
+class HttpClient(object):
+	"""
+		thread safe http client shared by all components that talk to remote services.  Connections
+		are kept alive and reused on a per host basis, responses are transparently decompressed.  Like
+		urllib2, requests are sent through the proxies named by the http_proxy and https_proxy environment
+		variables unless the host is listed in no_proxy
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def get(self, url, timeout=None, headers=None, stream=False):
+		"""
+			retrieve given url and return an HttpResponse object.  Redirects are followed.
+
+			if stream is True, a successful (2xx) response is returned as an HttpStream that reads the body from 
+			the connection as it is consumed.  The caller must read the stream to the end or close() it
+
+			errors are reported using the same exceptions as urllib2.urlopen(): HTTPError for any response
+			with a status of 400 or greater and URLError when the remote host could not be reached
+		"""
+		logger = logging.getLogger("mediarover.utils.http")
+
+		request_headers = {
+			'Accept-Encoding': 'gzip, deflate',
+			'User-Agent': 'Media Rover/%s' % __app_version__,
+		}
+		if headers:
+			request_headers.update(headers)
+
+		for i in range(MAX_REDIRECTS + 1):
+			response = self.__request(url, timeout, request_headers, stream)
+			if response.status in (301, 302, 303, 307) and 'location' in response.headers:
+				url = urlparse.urljoin(url, response.headers['location'])
+				logger.debug("following redirect to '%s'", url)
+				continue
+			break
+		else:
+			raise URLError("too many redirects")
+
+		if response.status >= 400:
+			raise HTTPError(url, response.status, response.reason, response.headers, None)
+
+		return response
+
+	def cleanup(self):
+		""" close all idle connections """
+		self.__lock.acquire()
+		try:
+			for connections in self.__idle.values():
+				for conn in connections:
+					conn.close()
+			self.__idle = {}
+		finally:
+			self.__lock.release()
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __request(self, url, timeout, headers, stream=False):
+		(scheme, netloc, path, query, fragment) = urlparse.urlsplit(url)
+		scheme = scheme.lower()
+		if scheme not in ('http', 'https'):
+			raise URLError("unsupported url scheme: %s" % scheme)
+
+		selector = path or "/"
+		if query:
+			selector = "%s?%s" % (selector, query)
+
+		# plain http requests are relayed by the proxy and must name the full url, https 
+		# requests are tunnelled through the proxy (see __checkout)
+		proxy = self.__proxy(scheme, netloc)
+		if proxy is not None and scheme == 'http':
+			selector = urlparse.urlunsplit((scheme, netloc, path or "/", query, ""))
+			if proxy[1] is not None:
+				headers = dict(headers)
+				headers['Proxy-Authorization'] = proxy[1]
+
+		key = (scheme, netloc.lower())
+		for attempt in range(2):
+			(conn, reused) = self.__checkout(key, timeout, proxy)
+			try:
+				conn.request("GET", selector, headers=headers)
+				raw = conn.getresponse()
+				if stream and 200 <= raw.status < 300:
+					data = None
+				else:
+					data = raw.read()
+			except (httplib.HTTPException, socket.error), e:
+				conn.close()
+
+				# the remote host may have dropped an idle keep-alive connection,
+				# retry once using a new connection
+				if reused and attempt == 0:
+					continue
+				raise URLError(e)
+			break
+
+		response_headers = dict([(name.lower(), value) for name, value in raw.getheaders()])
+
+		# body is read by the caller, the connection is released once it has been read in full
+		if data is None:
+			release = lambda complete: self.__release(key, conn, complete and not raw.will_close)
+			return HttpStream(url, raw.status, raw.reason, response_headers, raw, release)
+
+		self.__release(key, conn, not raw.will_close)
+		data = self.__decode(data, response_headers.get('content-encoding', '').lower())
+
+		return HttpResponse(url, raw.status, raw.reason, response_headers, data)
+
+	def __release(self, key, conn, reusable):
+		""" return given connection to the idle pool if it can be reused, otherwise close it """
+		if reusable:
+			self.__checkin(key, conn)
+		else:
+			conn.close()
+
+	def __decode(self, data, encoding):
+		""" decompress given response body """
+		try:
+			if encoding == 'gzip':
+				data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+			elif encoding == 'deflate':
+				try:
+					data = zlib.decompress(data)
+				except zlib.error:
+					# some servers send a raw deflate stream without zlib headers
+					data = zlib.decompress(data, -zlib.MAX_WBITS)
+		except zlib.error, e:
+			raise URLError("unable to decode %s response: %s" % (encoding, e))
+
+		return data
+
+	def __proxy(self, scheme, netloc):
+		""" 
+			return (address, authorization) tuple describing the proxy to use when connecting to given host, 
+			or None if host should be contacted directly 
+		"""
+		proxy = self.__proxies.get(scheme)
+		if not proxy or urllib.proxy_bypass(netloc):
+			return None
+
+		if "://" not in proxy:
+			proxy = "http://%s" % proxy
+		address = urlparse.urlsplit(proxy).netloc
+
+		authorization = None
+		if "@" in address:
+			(credentials, address) = address.rsplit("@", 1)
+			authorization = "Basic %s" % base64.b64encode(urllib.unquote(credentials))
+
+		return (address, authorization)
+
+	def __checkout(self, key, timeout, proxy=None):
+		""" return an idle connection for given host (if available) or open a new one """
+		conn = None
+
+		self.__lock.acquire()
+		try:
+			if self.__idle.get(key):
+				conn = self.__idle[key].pop()
+		finally:
+			self.__lock.release()
+
+		if conn is None:
+			(scheme, netloc) = key
+			if proxy is None:
+				address = netloc
+			else:
+				address = proxy[0]
+
+			if scheme == 'https':
+				conn = httplib.HTTPSConnection(address, timeout=timeout)
+				if proxy is not None:
+					tunnel_headers = {}
+					if proxy[1] is not None:
+						tunnel_headers['Proxy-Authorization'] = proxy[1]
+					conn.set_tunnel(netloc, headers=tunnel_headers)
+			else:
+				conn = httplib.HTTPConnection(address, timeout=timeout)
+			return (conn, False)
+
+		# apply timeout of current request to reused connection
+		conn.timeout = timeout
+		if conn.sock is not None:
+			conn.sock.settimeout(timeout)
+
+		return (conn, True)
+
+	def __checkin(self, key, conn):
+		""" return given connection to the pool of idle connections """
+		self.__lock.acquire()
+		try:
+			connections = self.__idle.setdefault(key, [])
+			if len(connections) < MAX_IDLE_CONNECTIONS:
+				connections.append(conn)
+				conn = None
+		finally:
+			self.__lock.release()
+
+		if conn is not None:
+			conn.close()
+
+	def __init__(self):
+		self.__idle = {}
+		self.__lock = threading.Lock()
+		self.__proxies = urllib.getproxies()
+
+class HttpResponse(object):
+	""" file like object wrapping the (decompressed) body of a http response """
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def read(self, *args):
+		return self.__body.read(*args)
+
+	def readline(self, *args):
+		return self.__body.readline(*args)
+
+	def close(self):
+		self.__body.close()
+
+	# property methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	@property
+	def data(self):
+		return self.__data
+
+	def __init__(self, url, status, reason, headers, data):
+		self.url = url
+		self.status = status
+		self.reason = reason
+		self.headers = headers
+		self.__data = data
+		self.__body = StringIO(data)
+
+class HttpStream(object):
+	"""
+		file like object that reads (and decompresses) the body of a http response from its connection as
+		the body is consumed.  The connection is handed back to the client once the body has been read in full
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def read(self, size=-1):
+		while not self.__eof and (size < 0 or len(self.__buffer) < size):
+			self.__fill()
+
+		if size < 0 or size >= len(self.__buffer):
+			data = self.__buffer
+			self.__buffer = ""
+		else:
+			data = self.__buffer[:size]
+			self.__buffer = self.__buffer[size:]
+
+		return data
+
+	def close(self):
+		""" stop reading the response body.  Unless the body was read in full, its connection is closed """
+		self.__buffer = ""
+		if not self.__eof:
+			self.__eof = True
+			self.__release(False)
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __fill(self):
+		""" read next chunk of the body from the connection and append its decoded data to the buffer """
+		try:
+			chunk = self.__raw.read(STREAM_READ_SIZE)
+		except (httplib.HTTPException, socket.error), e:
+			self.close()
+			raise URLError(e)
+
+		try:
+			if chunk:
+				self.__buffer += self.__decompress(chunk)
+			else:
+				if self.__decoder is not None:
+					self.__buffer += self.__decoder.flush()
+				self.__eof = True
+				self.__release(True)
+		except zlib.error, e:
+			self.close()
+			raise URLError("unable to decode %s response: %s" % (self.__encoding, e))
+
+	def __decompress(self, chunk):
+		if self.__decoder is None:
+			return chunk
+
+		try:
+			data = self.__decoder.decompress(chunk)
+		except zlib.error:
+			# some servers send a raw deflate stream without zlib headers
+			if self.__encoding != 'deflate' or self.__started:
+				raise
+			self.__decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+			data = self.__decoder.decompress(chunk)
+
+		self.__started = True
+		return data
+
+	def __init__(self, url, status, reason, headers, raw, release):
+		self.url = url
+		self.status = status
+		self.reason = reason
+		self.headers = headers
+		self.__raw = raw
+		self.__release = release
+		self.__buffer = ""
+		self.__eof = False
+		self.__started = False
+
+		self.__encoding = headers.get('content-encoding', '').lower()
+		if self.__encoding == 'gzip':
+			self.__decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+		elif self.__encoding == 'deflate':
+			self.__decoder = zlib.decompressobj()
+		else:
+			self.__decoder = None
@@ -0,0 +1,138 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import sys
+import threading
+import time
+from Queue import Queue, Empty
+
+# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def run_tasks(tasks, max_workers):
+	"""
+		run the given list of Task objects using a pool of at most max_workers threads.  Return once
+		every task has either finished or exceeded its deadline.
+
+		The deadline of a task starts when a worker picks it up.  Workers that are stuck on an expired
+		task are abandoned (they are daemon threads) and replaced so that the remaining tasks are not
+		starved.
+	"""
+	logger = logging.getLogger("mediarover.utils.pool")
+
+	if len(tasks) == 0:
+		return tasks
+
+	pending = Queue()
+	for task in tasks:
+		pending.put(task)
+
+	lock = threading.Lock()
+	changed = threading.Event()
+
+	def worker():
+		while True:
+			try:
+				task = pending.get_nowait()
+			except Empty:
+				return
+
+			task.started = time.time()
+			try:
+				task.result = task.func(*task.args, **task.kwargs)
+			except Exception:
+				task.error = sys.exc_info()
+
+			lock.acquire()
+			try:
+				task.finished = True
+				if task.expired:
+					# this worker has already been replaced
+					return
+			finally:
+				lock.release()
+				changed.set()
+
+	def start_worker():
+		thread = threading.Thread(target=worker)
+		thread.setDaemon(True)
+		thread.start()
+
+	for i in range(min(max_workers, len(tasks))):
+		start_worker()
+
+	while True:
+		changed.clear()
+
+		now = time.time()
+		wait = None
+		outstanding = 0
+		lock.acquire()
+		try:
+			for task in tasks:
+				if task.finished or task.expired:
+					continue
+
+				outstanding += 1
+				if task.timeout is None or task.started is None:
+					continue
+
+				remaining = task.started + task.timeout - now
+				if remaining <= 0:
+					logger.debug("task %r exceeded deadline of %ds", task.name, task.timeout)
+					task.expired = True
+					outstanding -= 1
+					if not pending.empty():
+						start_worker()
+				elif wait is None or remaining < wait:
+					wait = remaining
+		finally:
+			lock.release()
+
+		if outstanding == 0:
+			break
+
+		# wake up when a task finishes, when the next deadline passes or periodically
+		# so that tasks that have just been picked up are given a deadline
+		if wait is None or wait > 1:
+			wait = 1
+		changed.wait(wait)
+
+	return tasks
+
+# class definitions- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+class Task(object):
+	""" unit of work processed by run_tasks() """
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def reraise(self):
+		""" re-raise the exception (if any) that was raised while processing current task """
+		if self.error is not None:
+			raise self.error[0], self.error[1], self.error[2]
+
+	def __init__(self, name, func, args=(), kwargs=None, timeout=None):
+		self.name = name
+		self.func = func
+		self.args = args
+		self.kwargs = kwargs or {}
+		self.timeout = timeout
+
+		self.started = None
+		self.finished = False
+		self.expired = False
+		self.result = None
+		self.error = None
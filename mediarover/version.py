@@ -15,4 +15,4 @@
 
 __app_version__ = "0.8.1"
 __config_version__ = {'version': 8, 'min': 7}
-__schema_version__ = 3
+__schema_version__ = 7
@@ -14,6 +14,8 @@
 	category = string(default=tv)
 	priority = option('normal', 'high', 'low', 'force', default='normal')
 	ignored_extensions = string_list(default=list("nfo","txt","sfv","srt","nzb","idx","log","par","par2","exe","bat","com","tbn","jpg","png","gif","info","db","srr"))
+	preserve_file_metadata = boolean(default=False)
+	max_writes_per_disk = integer(min=1, default=1)
 
 	[[library]]
 		allow_multipart = boolean(default=True)
@@ -48,6 +50,13 @@
 		single_episode = string(default='$(series)s - $(season_episode_1)s$(smart_title)s')
 		daily_episode = string(default='$(series)s - $(daily-)s$(smart_title)s')
 
+[schedule]
+	concurrent_sources = integer(min=1, default=4)
+	interval = integer(min=1, default=30)
+	watch_library = boolean(default=True)
+	sort_server = boolean(default=True)
+	seen_item_ttl = integer(min=0, default=7)
+
 [source]
 	[[__many__]]
 		url = url()
@@ -64,6 +73,7 @@
 		password = string(default=None)
 		api_key = string(default=None)
 		backup_dir = path(default="")
+		timeout = integer(default=60)
 		__check_version__ = boolean(default=True)
 
 [notification]
@@ -3,6 +3,12 @@ DROP TABLE IF EXISTS single_episode;
 DROP TABLE IF EXISTS daily_episode;
 DROP TABLE IF EXISTS in_progress;
 DROP TABLE IF EXISTS delayed_item;
+DROP TABLE IF EXISTS library_file;
+DROP TABLE IF EXISTS library_directory;
+DROP TABLE IF EXISTS series_directory;
+DROP TABLE IF EXISTS tv_root;
+DROP TABLE IF EXISTS parse_cache;
+DROP TABLE IF EXISTS seen_item;
 
 CREATE TABLE IF NOT EXISTS series
 (
@@ -55,5 +61,75 @@ CREATE TABLE IF NOT EXISTS delayed_item
 	size INTEGER NOT NULL
 );
 
+CREATE TABLE IF NOT EXISTS library_directory
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	parent TEXT,
+	mtime REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS library_directory_parent ON library_directory (parent);
+
+CREATE TABLE IF NOT EXISTS library_file
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	directory TEXT NOT NULL,
+	size INTEGER NOT NULL,
+	mtime REAL NOT NULL,
+	type TEXT,
+	season INTEGER,
+	episode INTEGER,
+	end_episode INTEGER,
+	year INTEGER,
+	month INTEGER,
+	day INTEGER,
+	FOREIGN KEY (directory) REFERENCES library_directory (path)
+);
+
+CREATE INDEX IF NOT EXISTS library_file_directory ON library_file (directory);
+
+CREATE TABLE IF NOT EXISTS tv_root
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	mtime REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS series_directory
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	root TEXT NOT NULL,
+	name TEXT NOT NULL,
+	sanitized_name TEXT NOT NULL,
+	FOREIGN KEY (root) REFERENCES tv_root (path)
+);
+
+CREATE INDEX IF NOT EXISTS series_directory_sanitized_name ON series_directory (sanitized_name);
+
+CREATE TABLE IF NOT EXISTS parse_cache
+(
+	hash TEXT PRIMARY KEY NOT NULL,
+	parser TEXT NOT NULL,
+	title TEXT NOT NULL,
+	class_index INTEGER,
+	groups TEXT,
+	series TEXT,
+	last_used INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS parse_cache_parser ON parse_cache (parser, last_used);
+
+CREATE TABLE IF NOT EXISTS seen_item
+(
+	source TEXT NOT NULL,
+	hash TEXT NOT NULL,
+	first_seen INTEGER NOT NULL,
+	last_seen INTEGER NOT NULL,
+	decision TEXT,
+	signature TEXT,
+	PRIMARY KEY (source, hash)
+);
+
+CREATE INDEX IF NOT EXISTS seen_item_last_seen ON seen_item (last_seen);
+
 PRAGMA user_version = ${schema_version};
 
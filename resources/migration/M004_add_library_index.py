@@ -0,0 +1,50 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+def upgrade(dbh):
+	dbh.executescript('''
+CREATE TABLE IF NOT EXISTS library_directory
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	parent TEXT,
+	mtime REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS library_directory_parent ON library_directory (parent);
+
+CREATE TABLE IF NOT EXISTS library_file
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	directory TEXT NOT NULL,
+	size INTEGER NOT NULL,
+	mtime REAL NOT NULL,
+	type TEXT,
+	season INTEGER,
+	episode INTEGER,
+	end_episode INTEGER,
+	year INTEGER,
+	month INTEGER,
+	day INTEGER,
+	FOREIGN KEY (directory) REFERENCES library_directory (path)
+);
+
+CREATE INDEX IF NOT EXISTS library_file_directory ON library_file (directory);
+	''')
+
+def revert(dbh):
+	dbh.executescript('''
+DROP TABLE IF EXISTS library_file;
+DROP TABLE IF EXISTS library_directory;
+	''')
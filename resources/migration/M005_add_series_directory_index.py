@@ -0,0 +1,40 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+def upgrade(dbh):
+	dbh.executescript('''
+CREATE TABLE IF NOT EXISTS tv_root
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	mtime REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS series_directory
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	root TEXT NOT NULL,
+	name TEXT NOT NULL,
+	sanitized_name TEXT NOT NULL,
+	FOREIGN KEY (root) REFERENCES tv_root (path)
+);
+
+CREATE INDEX IF NOT EXISTS series_directory_sanitized_name ON series_directory (sanitized_name);
+	''')
+
+def revert(dbh):
+	dbh.executescript('''
+DROP TABLE IF EXISTS series_directory;
+DROP TABLE IF EXISTS tv_root;
+	''')
@@ -0,0 +1,36 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+def upgrade(dbh):
+	dbh.executescript('''
+CREATE TABLE IF NOT EXISTS seen_item
+(
+	source TEXT NOT NULL,
+	hash TEXT NOT NULL,
+	first_seen INTEGER NOT NULL,
+	last_seen INTEGER NOT NULL,
+	decision TEXT,
+	signature TEXT,
+	PRIMARY KEY (source, hash)
+);
+
+CREATE INDEX IF NOT EXISTS seen_item_last_seen ON seen_item (last_seen);
+	''')
+
+def revert(dbh):
+	dbh.executescript('''
+DROP TABLE IF EXISTS seen_item;
+	''')